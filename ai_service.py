@@ -1,69 +1,238 @@
-"""AI service for generating proposals."""
+"""AI service for generating proposals.
+
+Every profile goes through the same pool: at most
+``config.ai_max_concurrent_requests`` requests run at once, waiting in
+arrival order for a slot, and provider calls are paced by a token bucket
+of ``config.ai_calls_per_minute``, so adding accounts does not multiply the
+load on the free providers.
+
+A provider call starts only once one of the ``config.ai_max_workers`` g4f
+threads is free, and its timeout and latency are measured from then, so
+time spent queueing for a thread is not blamed on the provider. A call
+cancelled after losing a hedged race keeps its thread until g4f returns.
+"""
 
 import asyncio
-import re
-import g4f
+import time
+from concurrent.futures import ThreadPoolExecutor
 import config
+from provider_health import ranked_providers, begin_request, record_result
+from lang_detect import detect_language as detect_language_locally
+from metrics import counter, histogram
+from poll_scheduler import TokenBucket
+
+_executor = None
+_providers = {}
+_request_slots = None
+_thread_slots = None
+_call_bucket = None
+
+AI_CALLS = counter("ai_calls_total", "AI provider calls by provider label and outcome.", ("provider", "outcome"))
+AI_CALL_SECONDS = histogram("ai_call_seconds", "Duration of AI provider calls.", ("provider",))
+AI_POOL_WAIT_SECONDS = histogram("ai_pool_wait_seconds", "Time AI requests, provider calls and g4f threads wait for the shared pool.", ("stage",))
+
+def get_executor():
+    """Return the thread pool used for blocking g4f calls."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=config.ai_max_workers,
+            thread_name_prefix="g4f",
+        )
+    return _executor
+
+def _get_request_slots():
+    global _request_slots
+    if _request_slots is None:
+        _request_slots = asyncio.Semaphore(max(1, config.ai_max_concurrent_requests))
+    return _request_slots
+
+def _get_thread_slots():
+    global _thread_slots
+    if _thread_slots is None:
+        _thread_slots = asyncio.Semaphore(max(1, config.ai_max_workers))
+    return _thread_slots
+
+def _release_soon(loop, slots):
+    """Free a thread slot from the g4f thread that held it."""
+    try:
+        loop.call_soon_threadsafe(slots.release)
+    except RuntimeError:
+        # The loop is closed, nothing is waiting anymore
+        pass
+
+def _get_call_bucket():
+    global _call_bucket
+    if _call_bucket is None:
+        _call_bucket = TokenBucket(config.ai_calls_per_minute * 60, config.ai_call_burst)
+    return _call_bucket
+
+async def _take_call_token():
+    """Wait until the shared bucket allows another provider call."""
+    bucket = _get_call_bucket()
+    started = time.monotonic()
+    while not bucket.try_take():
+        await asyncio.sleep(bucket.wait_time())
+    AI_POOL_WAIT_SECONDS.observe(time.monotonic() - started, stage="call")
+
+def validate_response(response, strict):
+    """Return the cleaned response if it passes validation, otherwise None.
 
-async def send_ai_request(prompt: str, strict: bool = True):
-    """Send AI request to generate proposal or detect language.
-    
     Args:
-        prompt (str): The user prompt to send.
-        strict (bool): 
-            - True → validate with 'hello' check (proposal mode).
-            - False → validate that response is exactly one word (lang detect mode).
+        response: Raw provider output.
+        strict (bool):
+            - True → first line must contain "generated" (proposal mode).
+            - False → response must be exactly one word (lang detect mode).
     """
+    if not response or not isinstance(response, str):
+        return None
+    resp = response.strip()
+
+    if strict:
+        # Proposal mode: must start with "generated"
+        lines = resp.splitlines()
+        if len(lines) >= 1 and "generated" in lines[0].lower():
+            # Remove the word "generated" from the proposal
+            lines[0] = lines[0].lower().replace("generated", "").strip()
+            return "\n".join(lines).strip()
+    else:
+        # Lang detect mode: must be exactly one word
+        if len(resp.split()) == 1:
+            return resp
+    return None
+
+def load_provider(provider):
+    """Return the g4f provider class for the ``provider`` of a config.ai_chats entry.
+
+    g4f is imported on the first call rather than at startup, and provider
+    names are looked up in g4f.Provider once.
+    """
+    if not isinstance(provider, str):
+        return provider
+    if provider not in _providers:
+        import g4f.Provider
+        _providers[provider] = getattr(g4f.Provider, provider)
+    return _providers[provider]
+
+def _create_completion(chat, prompt):
+    """Blocking g4f call for one provider entry of config.ai_chats."""
+    import g4f
 
-    total_chats = len(config.ai_chats)
-    attempts = 0
+    kwargs = {
+        "provider": load_provider(chat["provider"]),
+        "messages": [{"role": "user", "content": prompt}],
+    }
+    if chat["model"]:
+        kwargs["model"] = chat["model"]
+    return g4f.ChatCompletion.create(**kwargs)
 
-    while attempts < total_chats:
-        current_chat = config.ai_chats[config.ai_chat_to_use]
+async def request_provider(index, prompt, strict):
+    """Ask provider ``index`` and return its validated response or None.
 
-        # Skip failed providers
-        if config.ai_chat_to_use in config.failed_ai_chats:
-            config.ai_chat_to_use = (config.ai_chat_to_use + 1) % total_chats
-            attempts += 1
-            continue
+    The latency and outcome are recorded in the provider health registry.
+    """
+    loop = asyncio.get_running_loop()
+    chat = config.ai_chats[index]
+    await _take_call_token()
+    slots = _get_thread_slots()
+    waited = time.monotonic()
+    await slots.acquire()
+    AI_POOL_WAIT_SECONDS.observe(time.monotonic() - waited, stage="thread")
+    # A slot is held until the thread returns, so the call starts right away
+    future = get_executor().submit(_create_completion, chat, prompt)
+    future.add_done_callback(lambda _: _release_soon(loop, slots))
+    begin_request(index)
+    started = time.monotonic()
+
+    def record(outcome):
+        latency = time.monotonic() - started
+        record_result(index, latency, outcome)
+        AI_CALLS.inc(provider=chat["label"], outcome=outcome)
+        AI_CALL_SECONDS.observe(latency, provider=chat["label"])
+
+    try:
+        response = await asyncio.wait_for(asyncio.wrap_future(future), timeout=config.ai_timeout)
+    except asyncio.CancelledError:
+        # Lost a hedged race; not the provider's fault
+        record("cancelled")
+        raise
+    except Exception:
+        record("error")
+        return None
+    result = validate_response(response, strict)
+    record("success" if result is not None else "invalid")
+    return result
 
+async def _send_sequential(prompt, strict):
+    """Try providers one at a time, fastest healthy first."""
+    for index in ranked_providers():
         await asyncio.sleep(config.sleep_time)
 
-        try:
-            kwargs = {
-                "provider": current_chat["provider"],
-                "messages": [{"role": "user", "content": prompt}],
-            }
-            if current_chat["model"]:
-                kwargs["model"] = current_chat["model"]
-
-            response = g4f.ChatCompletion.create(**kwargs)
-
-            if response and isinstance(response, str):
-                resp = response.strip()
-
-                if strict:
-                    # Proposal mode: must start with "hello"
-                    lines = resp.splitlines()
-                    if len(lines) >= 1 and "generated" in lines[0].lower():
-                        # Remove the word "generated" from the proposal
-                        lines[0] = lines[0].lower().replace("generated", "").strip()
-                        return "\n".join(lines).strip()
-                else:
-                    # Lang detect mode: must be exactly one word
-                    if len(resp.split()) == 1:
-                        return resp
-
-            # Mark provider as failed
-            config.failed_ai_chats.add(config.ai_chat_to_use)
-
-        except Exception:
-            config.failed_ai_chats.add(config.ai_chat_to_use)
-
-        # Move to next provider
-        config.ai_chat_to_use = (config.ai_chat_to_use + 1) % total_chats
-        attempts += 1
-
-    # All failed → reset for next cycle
-    config.failed_ai_chats.clear()
+        result = await request_provider(index, prompt, strict)
+        if result is not None:
+            return result
     return False
+
+async def _send_hedged(prompt, strict, hedge):
+    """Race the ``hedge`` fastest healthy providers and return the first valid response.
+
+    When a provider fails or returns an invalid response, the next healthy
+    provider is started so ``hedge`` requests stay in flight. The remaining
+    requests are cancelled as soon as one succeeds.
+    """
+    candidates = iter(ranked_providers())
+    in_flight = {}
+
+    def launch():
+        index = next(candidates, None)
+        if index is not None:
+            task = asyncio.create_task(request_provider(index, prompt, strict))
+            in_flight[task] = index
+
+    for _ in range(hedge):
+        launch()
+
+    try:
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                in_flight.pop(task)
+                result = task.result()
+                if result is not None:
+                    return result
+                launch()
+        return False
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+async def send_ai_request(prompt: str, strict: bool = True, hedge: int = None):
+    """Send AI request to generate proposal or detect language.
+
+    Args:
+        prompt (str): The user prompt to send.
+        strict (bool):
+            - True → validate with 'generated' check (proposal mode).
+            - False → validate that response is exactly one word (lang detect mode).
+        hedge (int): Number of providers to query at once. Defaults to
+            config.ai_hedge_count; 1 tries providers one at a time.
+    """
+    hedge = config.ai_hedge_count if hedge is None else hedge
+    started = time.monotonic()
+    async with _get_request_slots():
+        AI_POOL_WAIT_SECONDS.observe(time.monotonic() - started, stage="request")
+        if hedge > 1:
+            return await _send_hedged(prompt, strict, hedge)
+        return await _send_sequential(prompt, strict)
+
+async def detect_language(text):
+    """Return the language name of ``text`` for the proposal prompt, or False.
+
+    The offline detector answers when it is confident; the LLM is only asked
+    for short or ambiguous text.
+    """
+    language, confidence = detect_language_locally(text or "")
+    if language and confidence >= config.lang_detect_min_confidence:
+        return language
+    lang_prompt = config.description.format(text=text)
+    return await send_ai_request(lang_prompt, strict=False)
@@ -0,0 +1,253 @@
+"""Local stand-ins for freelancer.com and the Telegram Bot API.
+
+Both servers are stdlib ThreadingHTTPServers bound to 127.0.0.1 on a free
+port and run on a daemon thread. They count every request so the benchmark
+can report API calls per project.
+"""
+
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+RATE_LIMIT_MESSAGE = "You have made too many of these requests"
+
+WORDS = (
+    "need a developer to build a responsive website with a clean design and "
+    "an admin panel the project includes database integration user login "
+    "payment gateway and deployment to a cloud server experience with python "
+    "django react and rest apis is required please share similar work"
+).split()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        data = self.rfile.read(length)
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            return json.loads(data)
+        # Form data, as sent by the Telegram client
+        return {key: values[0] for key, values in parse_qs(data.decode("utf-8")).items()}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.server.fake.count(url.path)
+        status, body = self.server.fake.handle_get(url.path, parse_qs(url.query))
+        self._send_json(status, body)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        self.server.fake.count(url.path)
+        status, body = self.server.fake.handle_post(url.path, self._read_body())
+        self._send_json(status, body)
+
+
+class _FakeServer:
+    """Base class: owns the HTTP server thread and the request counters."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count(self, path):
+        with self._lock:
+            self.calls[path] += 1
+
+    def handle_get(self, path, query):
+        return 404, {"status": "error", "message": "not found", "error_code": "NOT_FOUND", "request_id": "bench"}
+
+    def handle_post(self, path, body):
+        return self.handle_get(path, {})
+
+
+class FakeFreelancer(_FakeServer):
+    """Freelancer API serving a synthetic stream of projects.
+
+    Args:
+        rate (float): New projects posted per second.
+        burst (int): Projects already posted when the stream starts.
+        jobs (list): Job ids assigned to projects round-robin.
+        rate_limit_every (int): Every n-th search request fails with the
+            rate-limit error. 0 disables it.
+        bid_latency (float): Seconds a bid request takes.
+        bid_error_rate (float): Share of bids rejected with an API error.
+        close_after (float): Seconds after which a project reports closed.
+    """
+
+    def __init__(self, rate=1.0, burst=0, jobs=(1,), rate_limit_every=0,
+                 bid_latency=0.05, bid_error_rate=0.0, close_after=60.0, seed=1):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.jobs = list(jobs)
+        self.rate_limit_every = rate_limit_every
+        self.bid_latency = bid_latency
+        self.bid_error_rate = bid_error_rate
+        self.close_after = close_after
+        self.random = random.Random(seed)
+        self.started = None
+        self.first_id = 50_000_000
+        self.projects = {}
+        self.bids = {}
+        self.search_requests = 0
+
+    def start(self):
+        self.started = time.time()
+        return super().start()
+
+    def _posted_count(self, now):
+        return self.burst + int((now - self.started) * self.rate)
+
+    def _project(self, index):
+        project_id = self.first_id + index
+        project = self.projects.get(project_id)
+        if project is None:
+            posted_at = self.started if index < self.burst else self.started + (index - self.burst + 1) / self.rate
+            budget_max = self.random.choice((25, 50, 100, 250, 500, 1000))
+            description = " ".join(self.random.choice(WORDS) for _ in range(self.random.randint(30, 120)))
+            project = {
+                "id": project_id,
+                "title": f"Bench project {index}",
+                "status": "active",
+                "type": "fixed",
+                "owner_id": 1,
+                "seo_url": f"bench/project-{index}",
+                "currency": {"code": "USD", "exchange_rate": 1.0},
+                "description": description,
+                "submitdate": int(posted_at),
+                "time_submitted": int(posted_at),
+                "time_updated": int(posted_at),
+                "budget": {"minimum": budget_max // 2, "maximum": budget_max},
+                "bid_stats": {"bid_count": 0, "bid_avg": None},
+                "jobs": [{"id": self.jobs[index % len(self.jobs)]}],
+                "posted_at": posted_at,
+            }
+            self.projects[project_id] = project
+        return project
+
+    def _visible(self, project, now):
+        project = dict(project)
+        project.pop("posted_at")
+        if now - project["time_submitted"] >= self.close_after:
+            project["status"] = "closed"
+        return project
+
+    def _error(self, status, message, code="ERROR"):
+        return status, {"status": "error", "message": message, "error_code": code, "request_id": "bench"}
+
+    def handle_get(self, path, query):
+        now = time.time()
+        if path.endswith("/users/0.1/self/"):
+            return 200, {"status": "success", "result": {"id": 1, "username": "bench"}}
+
+        if path.endswith("/projects/0.1/projects/active/"):
+            with self._lock:
+                self.search_requests += 1
+                limited = self.rate_limit_every and self.search_requests % self.rate_limit_every == 0
+            if limited:
+                return self._error(429, RATE_LIMIT_MESSAGE, "RATE_LIMITED")
+            jobs = {int(job) for job in query.get("jobs[]", [])}
+            limit = int(query.get("limit", ["10"])[0])
+            offset = int(query.get("offset", ["0"])[0])
+            with self._lock:
+                posted = [self._project(index) for index in range(self._posted_count(now))]
+            matching = [p for p in reversed(posted) if not jobs or p["jobs"][0]["id"] in jobs]
+            page = [self._visible(p, now) for p in matching[offset:offset + limit]]
+            return 200, {"status": "success", "result": {"projects": page, "total_count": len(matching)}}
+
+        if path.endswith("/projects/0.1/projects/"):
+            ids = [int(project_id) for project_id in query.get("projects[]", [])]
+            with self._lock:
+                found = [self._visible(self.projects[i], now) for i in ids if i in self.projects]
+            return 200, {"status": "success", "result": {"projects": found}}
+
+        return super().handle_get(path, query)
+
+    def handle_post(self, path, body):
+        if path.endswith("/projects/0.1/bids/"):
+            time.sleep(self.bid_latency)
+            project_id = int(body.get("project_id", 0))
+            with self._lock:
+                if project_id in self.bids:
+                    return self._error(409, "You have already bid on that project.")
+                if self.random.random() < self.bid_error_rate:
+                    return self._error(409, "You must sign the NDA before you can bid on this project.")
+                self.bids[project_id] = time.time()
+            return 200, {"status": "success", "result": {"id": len(self.bids), "project_id": project_id}}
+        return super().handle_post(path, body)
+
+    def posted(self, until):
+        """Projects posted before ``until``."""
+        with self._lock:
+            return [self._project(index) for index in range(self._posted_count(until))]
+
+    def time_to_bid(self):
+        """Seconds from posting to bid for every project bid on."""
+        with self._lock:
+            return [placed - self.projects[project_id]["posted_at"] for project_id, placed in self.bids.items()]
+
+
+class FakeBotAPI(_FakeServer):
+    """Telegram Bot API accepting sendMessage.
+
+    Args:
+        rate_limit_every (int): Every n-th call is answered with a 429 and
+            ``retry_after``. 0 disables it.
+        retry_after (int): The retry_after value sent with a 429.
+    """
+
+    def __init__(self, rate_limit_every=0, retry_after=1):
+        super().__init__()
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.messages = []
+
+    def handle_post(self, path, body):
+        if path.endswith("/sendMessage"):
+            with self._lock:
+                calls = sum(self.calls.values())
+                if self.rate_limit_every and calls % self.rate_limit_every == 0:
+                    return 429, {
+                        "ok": False,
+                        "error_code": 429,
+                        "description": "Too Many Requests",
+                        "parameters": {"retry_after": self.retry_after},
+                    }
+                self.messages.append((time.time(), body.get("text", "")))
+            return 200, {"ok": True, "result": {"message_id": len(self.messages)}}
+        return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
@@ -0,0 +1,60 @@
+"""Fake g4f providers with configurable latency and failure rates.
+
+make_provider() returns a g4f provider class, so the fakes go through the
+same g4f.ChatCompletion.create() path, thread pool, hedging and health
+tracking as the real providers listed in config.ai_chats.
+"""
+
+import random
+import time
+from g4f.providers.base_provider import AbstractProvider
+
+PROPOSAL = (
+    "Generated\n"
+    "Hello,\n"
+    "I have read the project description and have 4+ years experience building "
+    "similar solutions. I would start with a short review of the requirements, "
+    "then deliver the work in small milestones so progress is easy to follow. "
+    "Send me a message for samples of similar projects.\n"
+    "Thanks, Adegoke. M"
+)
+
+def make_provider(name, latency=1.0, jitter=0.5, failure_rate=0.0, invalid_rate=0.0, seed=None):
+    """Build a fake provider class.
+
+    Args:
+        name (str): Class name, shown in provider labels.
+        latency (float): Mean response time in seconds.
+        jitter (float): Response time varies uniformly by +/- this much.
+        failure_rate (float): Share of calls that raise.
+        invalid_rate (float): Share of calls that return a response failing
+            validation.
+    """
+    rng = random.Random(seed if seed is not None else name)
+
+    @classmethod
+    def create_completion(cls, model, messages, stream, **kwargs):
+        time.sleep(max(0.0, latency + rng.uniform(-jitter, jitter)))
+        roll = rng.random()
+        if roll < failure_rate:
+            raise RuntimeError(f"{name} failed")
+        if roll < failure_rate + invalid_rate:
+            yield "Sorry, I can't help with that request."
+            return
+        prompt = messages[-1]["content"]
+        yield "english" if "language detection system" in prompt else PROPOSAL
+
+    return type(name, (AbstractProvider,), {
+        "url": f"http://bench/{name}",
+        "working": True,
+        "supports_stream": False,
+        "create_completion": create_completion,
+    })
+
+def make_ai_chats(specs):
+    """config.ai_chats entries for a list of make_provider() keyword dicts."""
+    chats = []
+    for spec in specs:
+        provider = make_provider(**spec)
+        chats.append({"provider": provider, "model": "gpt-4", "label": f"Bench - {spec['name']}"})
+    return chats
@@ -0,0 +1,298 @@
+"""Offline end-to-end benchmark of the bidding pipelines.
+
+Runs the search poller, auto_function, semi_auto_function and
+followup_function against the local fakes in bench/fakes.py and
+bench/providers.py, and clicks "Place bid" on semi-auto alerts through the
+Quart /place_bid route. Each scenario runs
+in its own process and working directory, so databases and module state
+never leak between scenarios.
+
+Usage, from the repository root:
+
+    python -m bench.run                          # every scenario
+    python -m bench.run steady burst --duration 20
+    python -m bench.run --save                   # bench/results/<time>-<rev>.json
+    python -m bench.run --compare                # against the latest saved run
+    python -m bench.run --compare bench/results/<file>.json
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "bench", "results")
+RESULT_MARKER = "BENCH_RESULT "
+
+AUTO_JOB = 1
+SEMI_JOB = 2
+
+FAST_PROVIDERS = [
+    {"name": "Fast", "latency": 0.3, "jitter": 0.1},
+    {"name": "Medium", "latency": 1.0, "jitter": 0.3, "failure_rate": 0.05},
+    {"name": "Slow", "latency": 3.0, "jitter": 1.0, "invalid_rate": 0.1},
+]
+
+SLOW_PROVIDERS = [
+    {"name": "Flaky", "latency": 2.0, "jitter": 1.0, "failure_rate": 0.4},
+    {"name": "Sluggish", "latency": 6.0, "jitter": 2.0},
+    {"name": "Broken", "latency": 0.5, "jitter": 0.2, "failure_rate": 1.0},
+]
+
+SCENARIOS = {
+    "steady": {
+        "freelancer": {"rate": 1.0},
+        "providers": FAST_PROVIDERS,
+    },
+    "burst": {
+        "freelancer": {"rate": 0.2, "burst": 150},
+        "providers": FAST_PROVIDERS,
+    },
+    "rate_limited": {
+        "freelancer": {"rate": 1.0, "rate_limit_every": 4},
+        "telegram": {"rate_limit_every": 10, "retry_after": 1},
+        "providers": FAST_PROVIDERS,
+    },
+    "slow_ai": {
+        "freelancer": {"rate": 1.0},
+        "providers": SLOW_PROVIDERS,
+    },
+}
+
+# Config overrides for every scenario: no pacing sleeps, short poll intervals
+# and an API budget that only the rate_limited scenario runs into
+BENCH_CONFIG = {
+    "sleep_time": 0,
+    "sleep_time_semi": 0.001,
+    "exhaustion_sleep_time": 0,
+    "search_min_interval": 1,
+    "search_max_interval": 5,
+    "followup_max_interval": 10,
+    "api_requests_per_hour": 36000,
+    "api_burst": 20,
+    "ai_calls_per_minute": 6000,
+    "telegram_chat_interval": 0.05,
+    "telegram_chat_per_minute": 1000,
+    "telegram_retry_backoff": 0.1,
+    "auto_jobs": [AUTO_JOB],
+    "semi_auto_jobs": [SEMI_JOB],
+}
+
+# Seconds between simulated clicks on a semi-auto alert's "Place bid" button
+CLICK_INTERVAL = 1.0
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(p / 100 * (len(values) - 1))))
+    return round(values[index], 3)
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# --- Scenario process ---------------------------------------------------------
+
+def _configure(spec, freelancer, bot):
+    """Point config at the fakes. Must run before the bot modules are imported."""
+    os.environ.setdefault("PRODUCTION", "bench-token")
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:bench")
+    os.environ.setdefault("TELEGRAM_CHATID", "1")
+    sys.path.insert(0, REPO_ROOT)
+
+    import g4f
+    import config
+    from freelancersdk.session import Session
+    from bench.providers import make_ai_chats
+
+    # Offline: skip g4f's version check against PyPI
+    g4f.debug.version_check = False
+
+    config.base_url = freelancer.url
+    config.session = Session(oauth_token=os.environ["PRODUCTION"], url=freelancer.url)
+    config.telegram_api_url = bot.url
+    config.ai_chats = make_ai_chats(spec["providers"])
+    for key, value in {**BENCH_CONFIG, **spec.get("config", {})}.items():
+        setattr(config, key, value)
+    return config
+
+async def _click_alerts(config, freelancer, latencies):
+    """Place bids on semi-auto alerts through /place_bid, like a user would."""
+    from utils import get_store
+
+    client = config.quart_app.test_client()
+    clicked = set()
+    while True:
+        await asyncio.sleep(CLICK_INTERVAL)
+        for record in get_store().values():
+            project_id = str(record["id"])
+            if project_id in clicked or not record.get("amount") or int(project_id) in freelancer.bids:
+                continue
+            clicked.add(project_id)
+            started = time.monotonic()
+            await client.get(f"/place_bid?project_id={project_id}")
+            latencies.append(time.monotonic() - started)
+            break
+
+async def _drive(config, freelancer, bot, duration):
+    import main
+    from freelancer_service import auto_function, semi_auto_function, followup_function
+    from search_poller import search_poller
+    from proposal_prefetch import start_prefetch_workers, stop_prefetch_workers
+    from telegram_outbox import flush_outbox
+    from telegram_client import close_client
+    from freelancer_client import shutdown_executor
+    from database import close_database
+    from triage import PROJECTS_TRIAGED, SEEN, CLAIMED
+    from ai_service import AI_CALLS
+
+    route_latencies = []
+    start_prefetch_workers()
+    tasks = [
+        asyncio.create_task(search_poller()),
+        asyncio.create_task(auto_function()),
+        asyncio.create_task(semi_auto_function()),
+        asyncio.create_task(followup_function()),
+        asyncio.create_task(_click_alerts(config, freelancer, route_latencies)),
+    ]
+    started = time.time()
+    await asyncio.sleep(duration)
+    ended = time.time()
+
+    config.shutdown_flag = True
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await stop_prefetch_workers()
+    await flush_outbox(2)
+    await close_client()
+    shutdown_executor()
+    close_database()
+
+    posted = len(freelancer.posted(ended))
+    processed = sum(count for (pipeline, reason), count in PROJECTS_TRIAGED.values().items() if reason not in (SEEN, CLAIMED))
+    time_to_bid = freelancer.time_to_bid()
+    freelancer_calls = sum(freelancer.calls.values())
+    return {
+        "duration": round(ended - started, 2),
+        "projects_posted": posted,
+        "projects_processed": processed,
+        "projects_per_second": round(processed / (ended - started), 3),
+        "bids": len(time_to_bid),
+        "time_to_bid_p50": percentile(time_to_bid, 50),
+        "time_to_bid_p90": percentile(time_to_bid, 90),
+        "time_to_bid_p99": percentile(time_to_bid, 99),
+        "freelancer_calls": freelancer_calls,
+        "api_calls_per_project": round(freelancer_calls / posted, 3) if posted else None,
+        "telegram_calls": sum(bot.calls.values()),
+        "telegram_messages": len(bot.messages),
+        "ai_calls": sum(AI_CALLS.values().values()),
+        "place_bid_route_calls": len(route_latencies),
+        "place_bid_route_p50": percentile(route_latencies, 50),
+        "place_bid_route_p90": percentile(route_latencies, 90),
+    }
+
+def run_scenario(name, duration):
+    """Run one scenario in this process and return its report."""
+    from bench.fakes import FakeFreelancer, FakeBotAPI
+
+    spec = SCENARIOS[name]
+    os.chdir(tempfile.mkdtemp(prefix=f"bench-{name}-"))
+    freelancer = FakeFreelancer(jobs=(AUTO_JOB, SEMI_JOB), **spec["freelancer"]).start()
+    bot = FakeBotAPI(**spec.get("telegram", {})).start()
+    try:
+        config = _configure(spec, freelancer, bot)
+        return asyncio.run(_drive(config, freelancer, bot, duration))
+    finally:
+        freelancer.stop()
+        bot.stop()
+
+
+# --- Driver -------------------------------------------------------------------
+
+def _spawn(name, duration, verbose):
+    command = [sys.executable, "-m", "bench.run", "--scenario-process", name, "--duration", str(duration)]
+    process = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+    if verbose:
+        sys.stderr.write(process.stdout)
+    for line in reversed(process.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    sys.stderr.write(process.stdout[-4000:] + process.stderr[-4000:])
+    raise RuntimeError(f"Scenario {name} failed with exit code {process.returncode}")
+
+def _latest_result():
+    files = sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")))
+    return files[-1] if files else None
+
+def _print_report(results, baseline=None):
+    if baseline and baseline.get("duration") != results["duration"]:
+        print(f"Note: the baseline ran for {baseline.get('duration')}s per scenario, counts are not comparable")
+    for name, report in results["scenarios"].items():
+        print(f"\n== {name} ==")
+        previous = (baseline or {}).get("scenarios", {}).get(name, {})
+        for key, value in report.items():
+            line = f"  {key:<24} {value}"
+            old = previous.get(key)
+            if isinstance(value, (int, float)) and isinstance(old, (int, float)) and old:
+                line += f"  ({(value - old) / old:+.1%} vs {baseline['revision']})"
+            print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the bidding pipelines.")
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per scenario")
+    parser.add_argument("--save", action="store_true", help="Save the results under bench/results/")
+    parser.add_argument("--compare", nargs="?", const="latest", help="Saved result file to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show the bot's output")
+    parser.add_argument("--scenario-process", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    if args.scenario_process:
+        report = run_scenario(args.scenario_process, args.duration)
+        print(RESULT_MARKER + json.dumps(report), flush=True)
+        # Worker threads of the bot are not joined
+        os._exit(0)
+
+    baseline = None
+    if args.compare:
+        path = _latest_result() if args.compare == "latest" else args.compare
+        if path:
+            with open(path) as f:
+                baseline = json.load(f)
+
+    results = {
+        "revision": git_revision(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "duration": args.duration,
+        "scenarios": {},
+    }
+    for name in args.scenarios or list(SCENARIOS):
+        print(f"Running {name} for {args.duration:g}s...", flush=True)
+        results["scenarios"][name] = _spawn(name, args.duration, args.verbose)
+
+    _print_report(results, baseline)
+    if args.save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S', time.gmtime())}-{results['revision']}.json")
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved {path}")
+
+if __name__ == "__main__":
+    main()
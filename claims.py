@@ -0,0 +1,83 @@
+"""Leases on the projects this process is working on.
+
+Before a project is alerted on or sent to proposal generation it is claimed
+in the database (database.claim_projects_async), in one transaction per search
+page. Another bot process sharing the database skips projects it cannot
+claim. Claims last ``config.claim_ttl`` seconds; while this process holds
+one, a background task renews it every ``config.claim_renew_interval``
+seconds, so the claims of a process that dies expire soon after. The
+search watermark has moved past those projects by then, so an expired
+claim not yet in the ledger becomes a retry of its pipeline (see
+database.renew_claims_async), which the search poller of any process
+running that pipeline fetches again. Claims are per account (see
+profiles.py): two profiles may each work on the same project. A claim is
+renewed for at most ``config.claim_max_hold`` seconds, in case a code path
+never released it.
+"""
+
+import asyncio
+import time
+import config
+from database import claim_projects_async, renew_claims_async, release_claims_async
+
+_held = {}
+_keeper = None
+
+def _ensure_keeper():
+    global _keeper
+    if _keeper is None or _keeper.done():
+        _keeper = asyncio.get_running_loop().create_task(_keep_alive())
+
+async def claim(project_ids, pipeline, account=""):
+    """Claim projects for ``pipeline`` of ``account``. Returns the set of claimed IDs as strings."""
+    project_ids = [str(project_id) for project_id in project_ids]
+    if not project_ids:
+        return set()
+    claimed = await claim_projects_async(project_ids, pipeline, config.claim_ttl, account)
+    held = _held.setdefault((pipeline, account), {})
+    now = time.time()
+    for project_id in claimed:
+        held.setdefault(project_id, now)
+    _ensure_keeper()
+    return claimed
+
+async def confirm(project_id, pipeline, account=""):
+    """Re-claim a held project right before acting on it.
+
+    False if the project reached the ledger or the claim was lost, e.g.
+    because renewals were held up for longer than the lease.
+    """
+    return str(project_id) in await claim([project_id], pipeline, account)
+
+async def release(project_ids, pipeline, account=""):
+    """Give up claims once the projects are recorded or dropped."""
+    project_ids = [str(project_id) for project_id in project_ids]
+    if not project_ids:
+        return
+    held = _held.get((pipeline, account), {})
+    for project_id in project_ids:
+        held.pop(project_id, None)
+    await release_claims_async(project_ids, pipeline, account)
+
+async def release_all():
+    """Give up every claim of this process, e.g. on shutdown."""
+    for (pipeline, account), held in list(_held.items()):
+        await release(list(held), pipeline, account)
+
+def held_count():
+    """Number of claims this process holds."""
+    return sum(len(held) for held in _held.values())
+
+async def _keep_alive():
+    while True:
+        await asyncio.sleep(config.claim_renew_interval)
+        now = time.time()
+        for (pipeline, account), held in list(_held.items()):
+            for project_id, claimed_at in list(held.items()):
+                if now - claimed_at > config.claim_max_hold:
+                    print(f"⚠️ Claim on Project ID: {project_id} held for too long, letting it expire")
+                    del held[project_id]
+            try:
+                await renew_claims_async(list(held), pipeline, config.claim_ttl, account)
+            except Exception as e:
+                print(f"Error renewing project claims: {e}")
@@ -2,12 +2,8 @@
 
 import os
 from dotenv import load_dotenv
-from freelancersdk.session import Session
-from freelancersdk.resources.projects.helpers import create_search_projects_filter
-from telegram.ext import Application
-from quart import Quart, request
-from g4f.Provider import Yqcloud, Blackbox, PollinationsAI, OIVSCodeSer2, WeWordle, CohereForAI_C4AI_Command
 import asyncio
+from startup_timing import step
 
 # Load environment variables
 load_dotenv()
@@ -18,9 +14,15 @@ telegram_bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
 telegram_chatid = os.getenv("TELEGRAM_CHATID")
 AUTHORIZED_USER_IDS = os.getenv("AUTHORIZED_USER_IDS", "")
 host_url = os.getenv("HOST_URL")
+# Bot processes sharing this file coordinate through it (see claims.py)
+db_file = os.getenv("DB_FILE", "bidded_projects.db")
+# Seconds a write waits for another process's lock, and a caller for its write
+db_busy_timeout = 30
+db_write_timeout = 60
 
 # Global configuration
 base_url = "https://www.freelancer.com"
+telegram_api_url = "https://api.telegram.org"
 project_number = 30
 project_number_semi_auto = 70
 look_back_hours = 24
@@ -32,53 +34,212 @@ min_budget = 30
 proposal_yrs_exp = 4
 bid_period = 3
 
-# Initialize external services
-session = Session(oauth_token=token, url=base_url)
-quart_app = Quart(__name__)
-application = Application.builder().token(telegram_bot_token).build()
+# Extra Freelancer accounts, run next to the one above by the same process
+# (see profiles.py). Each entry names the env vars holding its token and,
+# optionally, its Telegram chat id; any of the job filter and pricing
+# settings can be overridden, the rest fall back to the values in here:
+# profiles = [
+#     {"name": "design", "token_env": "PRODUCTION_DESIGN", "chat_id_env": "TELEGRAM_CHATID_DESIGN",
+#      "auto_jobs": [], "semi_auto_jobs": [20, 32], "min_budget": 50, "proposal_yrs_exp": 6},
+# ]
+profiles = []
+
+# External services are built on first access (see __getattr__ below), so
+# importing config does not import freelancersdk, telegram or quart
+def _build_session():
+    from freelancersdk.session import Session
+    return Session(oauth_token=token, url=base_url)
+
+def _build_quart_app():
+    from quart import Quart
+    return Quart(__name__)
+
+def _build_application():
+    from telegram.ext import Application
+    return Application.builder().token(telegram_bot_token).build()
+
+def _build_request():
+    from quart import request
+    return request
+
+_services = {
+    "session": _build_session,
+    "quart_app": _build_quart_app,
+    "application": _build_application,
+    "request": _build_request,
+}
+
+def __getattr__(name):
+    build = _services.get(name)
+    if build is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with step(f"init config.{name}"):
+        value = build()
+    globals()[name] = value
+    return value
 
 # Global flags and settings
-id_flag = True
 shutdown_flag = False
 sleep_time = 0.0625
 sleep_time_semi = 0.166
 shutdown_event = asyncio.Event()
 
+# freelancersdk thread pool and per-call timeouts (seconds)
+freelancer_max_workers = 4
+freelancer_timeout = 30
+freelancer_bid_timeout = 60
+
+# Telegram Bot API client settings
+telegram_timeout = 10
+telegram_connect_timeout = 5
+telegram_pool_size = 10
+telegram_keepalive_expiry = 60
+telegram_max_retries = 3
+telegram_retry_backoff = 0.5
+
+# Telegram outbound queue pacing (per chat) and alert digest settings
+telegram_chat_interval = 1.0
+telegram_chat_per_minute = 20
+telegram_digest_threshold = 5
+telegram_digest_max = 15
+telegram_flush_timeout = 10
+
 # Service control flags
 auto_paused = False
 semi_auto_paused = False
 
-# Search filter configuration
+# Search filter configuration. One shared search fetches the union of both
+# job lists and each pipeline receives only the projects matching its own.
 auto_jobs = [3131,3033,3030] # eg. 3131,3033,3030,3931,333,3032
-search_filter_auto = create_search_projects_filter(
-    jobs=auto_jobs
-)
-
-# Project detail configuration
 semi_auto_jobs = [3131,3033,3030] # eg. 3131,3033,3030,3931,333,3032
-search_filter_semi_auto = create_search_projects_filter(
-    jobs=semi_auto_jobs
-)
+
+# Freelancer API budget shared by all pollers, and how the poll cadence
+# adapts: intervals shrink by poll_speedup while new projects arrive, grow
+# by poll_slowdown when they don't, and double on rate-limit errors, which
+# also cut the budget (never below api_min_rate_fraction of it) until it
+# recovers by api_rate_recovery per successful poll
+api_requests_per_hour = 360
+api_burst = 5
+api_min_rate_fraction = 0.25
+api_rate_recovery = 1.05
+poll_speedup = 0.75
+poll_slowdown = 1.25
+search_min_interval = 30
+search_max_interval = 900
+followup_max_interval = 3600
+
+# Follow-up tracking: projects checked per get_projects call, calls per
+# follow-up cycle, and how long a project is followed at most (seconds)
+followup_chunk_size = 50
+followup_chunks = 2
+followup_max_age = 30 * 86400
+
+# Skipped projects older than this (seconds) are reduced to bare ids in the
+# bid ledger
+ledger_skipped_retention = 7 * 86400
+
+# Search pages buffered per pipeline before the oldest is dropped, and how
+# many pages the poller may walk back to reach the last seen project
+search_queue_size = 5
+search_max_pages = 5
 
 project_detail = {
     "full_description": True,
     "job_details": True
 }
 
-# AI providers and models configuration
+# AI providers and models configuration. Providers are g4f.Provider class
+# names (or provider classes), loaded when they are first asked
 ai_chats = [
-    {"provider": CohereForAI_C4AI_Command, "model": "command-a-03-2025", "label": "Cohere - Command A 03-2025"},
-    {"provider": CohereForAI_C4AI_Command, "model": "command-r7b-12-2024", "label": "Cohere - Command R7B"},
-    {"provider": Yqcloud, "model": "gpt-4", "label": "Yqcloud - GPT-4"},
-    {"provider": Blackbox, "model": "gpt-4", "label": "Blackbox - GPT-4"},
-    {"provider": PollinationsAI, "model": None, "label": "PollinationsAI - DEFAULT"},
-    {"provider": OIVSCodeSer2, "model": "gpt-4o-mini", "label": "OIVSCodeSer2 - gpt-4o-mini"},
-    {"provider": WeWordle, "model": "gpt-4", "label": "WeWordle - GPT-4"},
+    {"provider": "CohereForAI_C4AI_Command", "model": "command-a-03-2025", "label": "Cohere - Command A 03-2025"},
+    {"provider": "CohereForAI_C4AI_Command", "model": "command-r7b-12-2024", "label": "Cohere - Command R7B"},
+    {"provider": "Yqcloud", "model": "gpt-4", "label": "Yqcloud - GPT-4"},
+    {"provider": "Blackbox", "model": "gpt-4", "label": "Blackbox - GPT-4"},
+    {"provider": "PollinationsAI", "model": None, "label": "PollinationsAI - DEFAULT"},
+    {"provider": "OIVSCodeSer2", "model": "gpt-4o-mini", "label": "OIVSCodeSer2 - gpt-4o-mini"},
+    {"provider": "WeWordle", "model": "gpt-4", "label": "WeWordle - GPT-4"},
 ]
 
-# AI service global variables
-failed_ai_chats = set()
-ai_chat_to_use = 0
+# AI request settings: providers raced per request (1 = one at a time),
+# g4f worker threads and per-call timeout in seconds. Calls wait for a free
+# thread; with ai_max_concurrent_requests * ai_hedge_count threads a request
+# never waits behind another
+ai_hedge_count = 3
+ai_max_workers = 15
+ai_timeout = 90
+
+# AI worker pool shared by all profiles: requests generating at once, and
+# provider calls started per minute (a hedged request counts every provider
+# it starts) with the burst allowed after a quiet spell
+ai_max_concurrent_requests = 5
+ai_calls_per_minute = 120
+ai_call_burst = 15
+
+# Proposal cache lifetime and how often expired entries are swept (seconds)
+proposal_cache_ttl = 6 * 3600
+proposal_cache_prune_interval = 600
+
+# Auto pipeline: concurrent proposal generators (bids are always placed one
+# at a time) and the size of each queue between the pipeline stages
+auto_generate_workers = 3
+auto_queue_size = 10
+
+# Background proposal drafts for semi-auto alerts: worker count (0 disables),
+# max queued drafts and max age of a queued draft in seconds
+prefetch_workers = 2
+prefetch_max_pending = 20
+prefetch_max_age = 3600
+
+# Offline language detection: below this confidence the LLM is asked instead
+lang_detect_min_confidence = 0.25
+
+# Relevance scoring before proposal generation (see relevance.py). Biddable
+# projects scoring below relevance_threshold (0 to 1; 0 turns scoring off)
+# are skipped without asking the AI. relevance_keywords names lists of
+# keywords for the work wanted, e.g. {"web": ["wordpress", "php", "website"]};
+# past bids count once relevance_min_documents of them are indexed, the
+# relevance_top_k most similar ones are averaged and won projects weigh
+# relevance_won_boost times more. At most relevance_max_documents bids are
+# kept per profile, won ones first. New bids reach the index when it is
+# rebuilt, at most every relevance_rebuild_interval seconds.
+relevance_threshold = 0.05
+relevance_keywords = {}
+relevance_top_k = 3
+relevance_min_documents = 20
+relevance_won_boost = 1.5
+relevance_max_documents = 2000
+relevance_rebuild_interval = 300
+
+# AI provider health registry and circuit breaker settings
+ai_health_file = "provider_health.json"
+ai_health_alpha = 0.3
+ai_health_save_interval = 30
+ai_breaker_failures = 3
+ai_breaker_cooldown = 300
+
+# Project claims shared with other bot processes using the same database:
+# lease length, how often held leases are renewed, and the longest a
+# project is held before its lease is left to expire (seconds)
+claim_ttl = 120
+claim_renew_interval = 30
+claim_max_hold = 2 * 3600
+
+# Projects a pipeline could not finish (failed proposal generation, bid
+# timeouts, undelivered alerts, dropped search pages, expired claims of a
+# process that died) are fetched again retry_delay seconds later, at most
+# retry_max_attempts times and retry_batch_size per search poll
+retry_delay = 300
+retry_max_attempts = 3
+retry_batch_size = 20
+
+# Print the timing of each import and init step once the bot is up
+startup_report = True
+
+# Pipeline tracing: number of recent traces kept for /debug/traces and an
+# optional JSON lines file every finished trace is appended to
+trace_enabled = True
+trace_buffer_size = 200
+trace_export_file = None
 
 # config.py
 
@@ -1,35 +1,587 @@
-"""Database operations for freelancer bot."""
+"""Database operations for freelancer bot.
 
+The database runs in WAL mode. Every write goes through one writer thread,
+which commits whatever has queued up meanwhile in a single transaction
+(group commit), so a burst of processed projects costs one fsync instead of
+one per project. Reads use a connection per thread and never wait for the
+writer. Operations are coroutines (the ``_async`` functions), so callers
+never block the event loop on SQLite.
+
+Several bot processes can share the database file on one host: the claims
+table holds short leases on the projects each process is working on (see
+claim_projects), and every write transaction takes SQLite's write lock.
+"""
+
+import asyncio
+import os
+import queue
+import socket
 import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import config
+
+DB_FILE = config.db_file
+
+# Most writes committed in one transaction
+WRITE_BATCH = 256
+
+# Bid ledger outcomes
+PLACED = "placed"
+ALREADY_BID = "already_bid"
+NDA = "nda"
+ERROR = "error"
+SKIPPED = "skipped"
+ALERTED = "alerted"
+PROPOSAL_SENT = "proposal_sent"
+WON = "won"
+
+# Bid ledger sources
+AUTO = "auto"
+SEMI = "semi"
+
+# Owner of the claims taken by this process
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+def _connect():
+    conn = sqlite3.connect(DB_FILE, isolation_level=None, timeout=config.db_busy_timeout)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # With WAL, NORMAL only syncs at checkpoints and stays crash safe
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class _Writer(threading.Thread):
+    """Owns the write connection and applies queued writes in batches."""
+
+    def __init__(self):
+        super().__init__(name="sqlite-writer", daemon=True)
+        self.queue = queue.Queue()
+
+    def submit(self, op, *args):
+        """Queue ``op(cursor, *args)`` and return a Future for its result."""
+        future = Future()
+        if not self.is_alive():
+            future.set_exception(RuntimeError("The database writer is not running"))
+            return future
+        self.queue.put((op, args, future))
+        return future
+
+    def stop(self):
+        """Apply the writes queued so far, then stop the thread."""
+        self.queue.put(None)
+        self.join()
+
+    def run(self):
+        try:
+            conn = _connect()
+        except Exception as e:
+            self._fail_queued(e)
+            return
+        c = conn.cursor()
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < WRITE_BATCH:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._commit(c, [write for write in batch if write is not None])
+            if None in batch:
+                break
+        conn.close()
+
+    def _fail_queued(self, error):
+        while True:
+            try:
+                write = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if write is not None and write[2].set_running_or_notify_cancel():
+                write[2].set_exception(error)
+
+    @staticmethod
+    def _commit(c, writes):
+        # Writes whose caller gave up waiting (see _write_async) are dropped
+        writes = [write for write in writes if write[2].set_running_or_notify_cancel()]
+        if not writes:
+            return
+        try:
+            results = _Writer._apply(c, writes)
+        except Exception as e:
+            # BEGIN or COMMIT failed, e.g. "database is locked" while another
+            # process held the lock for longer than the busy timeout: the whole
+            # batch fails, and the thread goes on with the next one
+            if c.connection.in_transaction:
+                try:
+                    c.execute("ROLLBACK")
+                except Exception:
+                    pass
+            results = [(future, None, e) for _, _, future in writes]
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+    @staticmethod
+    def _apply(c, writes):
+        results = []
+        c.execute("BEGIN IMMEDIATE")
+        for op, args, future in writes:
+            # A failing write only rolls back itself, not the whole batch
+            c.execute("SAVEPOINT write")
+            try:
+                results.append((future, op(c, *args), None))
+            except Exception as e:
+                c.execute("ROLLBACK TO write")
+                results.append((future, None, e))
+            c.execute("RELEASE write")
+        c.execute("COMMIT")
+        return results
+
+
+_writer = _Writer()
+_local = threading.local()
+_read_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sqlite-reader")
+
+def _cursor():
+    """Read cursor on this thread's own connection."""
+    if getattr(_local, "conn", None) is None:
+        _local.conn = _connect()
+    return _local.conn.cursor()
+
+def _write(op, *args):
+    return _writer.submit(op, *args).result(timeout=config.db_write_timeout)
+
+async def _write_async(op, *args):
+    return await asyncio.wait_for(asyncio.wrap_future(_writer.submit(op, *args)), config.db_write_timeout)
+
+def _read(op, *args):
+    return op(_cursor(), *args)
+
+async def _read_async(op, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_read_executor, _read, op, *args)
+
+def close_database():
+    """Flush pending writes and stop the writer thread."""
+    if _writer.is_alive():
+        _writer.stop()
+    _read_executor.shutdown(wait=False)
+
+
+def _table_exists(c, name):
+    c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+    return c.fetchone() is not None
+
+def _has_column(c, table, column):
+    return _column_type(c, table, column) is not None
+
+def _column_type(c, table, column):
+    c.execute(f"PRAGMA table_info({table})")
+    return next((row[2] for row in c.fetchall() if row[1] == column), None)
+
+# Tables keyed by project and account (see profiles.py), with the columns
+# copied over when a table from before accounts is migrated
+_ACCOUNT_TABLES = {
+    "bids": "project_id, outcome, amount, currency, source, message, created_at, updated_at",
+    "seen_ids": "project_id",
+    "claims": "project_id, owner, pipeline, expires_at",
+    "followups": "project_id, added_at, checked_at",
+}
+
+def _init_schema(c):
+    # Tables created before the account column existed are rebuilt: their
+    # rows belong to the default account ""
+    legacy = [table for table in _ACCOUNT_TABLES
+            if _table_exists(c, table) and not _has_column(c, table, "account")]
+    for table in legacy:
+        c.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+    # One row per processed project and account. The primary key starts with
+    # project_id, so lookups by id need no extra index.
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS bids (
+            project_id INTEGER NOT NULL,
+            account TEXT NOT NULL DEFAULT '',
+            outcome TEXT NOT NULL,
+            amount REAL,
+            currency TEXT,
+            source TEXT,
+            message TEXT,
+            created_at INTEGER NOT NULL,
+            updated_at INTEGER NOT NULL,
+            PRIMARY KEY (project_id, account)
+        )
+    """)
+    # Bare ids of old skipped projects, kept only for dedup
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS seen_ids (
+            project_id INTEGER NOT NULL,
+            account TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (project_id, account)
+        )
+    """)
+    # Leases on projects being worked on, so processes sharing the database
+    # never handle the same project twice for the same account
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS claims (
+            project_id INTEGER NOT NULL,
+            account TEXT NOT NULL DEFAULT '',
+            owner TEXT NOT NULL,
+            pipeline TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (project_id, account)
+        )
+    """)
+    # Projects to fetch again for a pipeline that could not finish them
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS retries (
+            project_id INTEGER NOT NULL,
+            pipeline TEXT NOT NULL,
+            account TEXT NOT NULL DEFAULT '',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            due_at REAL NOT NULL,
+            PRIMARY KEY (project_id, pipeline)
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS poll_state (
+            key TEXT PRIMARY KEY,
+            watermark INTEGER NOT NULL
+        )
+    """)
+    followups_exist = _table_exists(c, "followups") or "followups" in legacy
+    # Follow-ups kept project ids as text at first; rebuilt with integer ids
+    text_ids = _table_exists(c, "followups") and _column_type(c, "followups", "project_id") == "TEXT"
+    if text_ids:
+        c.execute("ALTER TABLE followups RENAME TO followups_text")
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS followups (
+            project_id INTEGER NOT NULL,
+            account TEXT NOT NULL DEFAULT '',
+            added_at INTEGER NOT NULL,
+            checked_at INTEGER NOT NULL DEFAULT 0,
+            draft_only INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (project_id, account)
+        )
+    """)
+    if text_ids:
+        columns = "project_id, account, added_at, checked_at"
+        if _has_column(c, "followups_text", "draft_only"):
+            columns += ", draft_only"
+        c.execute(f"""
+            INSERT OR IGNORE INTO followups ({columns}) SELECT {columns} FROM followups_text
+            WHERE project_id GLOB '[0-9]*' AND project_id NOT GLOB '*[^0-9]*'
+        """)
+        print(f"Migrated {c.rowcount} follow-up(s) to integer project ids")
+        c.execute("DROP TABLE followups_text")
+    for table in legacy:
+        columns = _ACCOUNT_TABLES[table]
+        c.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_legacy")
+        print(f"Migrated {c.rowcount} row(s) of the {table} table to the default account")
+        # Dropping the old table also drops its indexes, so the names below are free
+        c.execute(f"DROP TABLE {table}_legacy")
+    c.execute("CREATE INDEX IF NOT EXISTS bids_outcome_created_at ON bids (outcome, created_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS bids_created_at ON bids (created_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS bids_account_outcome ON bids (account, outcome)")
+    c.execute("CREATE INDEX IF NOT EXISTS followups_account_checked_at ON followups (account, checked_at)")
+    c.execute("DROP INDEX IF EXISTS followups_checked_at")
+    if not followups_exist and _table_exists(c, "keys"):
+        # Start by tracking every project processed so far; closed ones drop
+        # out after their first check
+        c.execute("""
+            INSERT OR IGNORE INTO followups (project_id, added_at)
+            SELECT project_id, CAST(strftime('%s', 'now') AS INTEGER) FROM keys
+            WHERE project_id GLOB '[0-9]*' AND project_id NOT GLOB '*[^0-9]*'
+        """)
+    if _table_exists(c, "keys"):
+        # The legacy keys table only recorded that an id was processed, not how
+        c.execute("""
+            INSERT OR IGNORE INTO seen_ids (project_id)
+            SELECT CAST(project_id AS INTEGER) FROM keys
+            WHERE project_id GLOB '[0-9]*' AND project_id NOT GLOB '*[^0-9]*'
+        """)
+        print(f"Migrated {c.rowcount} project id(s) from the keys table to the bid ledger")
+        c.execute("DROP TABLE keys")
 
 # Initialize database
-conn = sqlite3.connect("bidded_projects.db")
-c = conn.cursor()
-c.execute("""
-    CREATE TABLE IF NOT EXISTS keys (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        project_id TEXT UNIQUE
-    )
-""")
-conn.commit()
-
-def project_id_exists(project_id):
-    """Check if project ID exists in database."""
-    c.execute("SELECT 1 FROM keys WHERE project_id = ?", (project_id,))
+_writer.start()
+_write(_init_schema)
+
+
+def _project_id_exists(c, project_id, account=""):
+    c.execute("""
+        SELECT 1 FROM bids WHERE project_id = ? AND account = ?
+        UNION ALL
+        SELECT 1 FROM seen_ids WHERE project_id = ? AND account = ?
+        LIMIT 1
+    """, (int(project_id), account, int(project_id), account))
     return c.fetchone() is not None
 
-def store_project_keys(project_id):
-    """Store project ID in database."""
-    c.execute("INSERT OR IGNORE INTO keys (project_id) VALUES (?)",
-            (project_id,))
-    conn.commit()
-
-def get_all_project_ids():
-    """Retrieve all project IDs from the database."""
-    c.execute("SELECT project_id FROM keys")
-    return [row[0] for row in c.fetchall()]
-
-def delete_project_by_id(project_id):
-    """Delete a project from the database by its project ID."""
-    c.execute("DELETE FROM keys WHERE project_id = ?", (project_id,))
-    conn.commit()
+def _store_project_keys(c, project_id, outcome, amount, currency, source, message, account):
+    now = int(time.time())
+    c.execute("""
+        INSERT INTO bids (project_id, account, outcome, amount, currency, source, message, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (project_id, account) DO UPDATE SET
+            outcome = excluded.outcome,
+            amount = COALESCE(excluded.amount, amount),
+            currency = COALESCE(excluded.currency, currency),
+            source = COALESCE(excluded.source, source),
+            message = excluded.message,
+            updated_at = excluded.updated_at
+    """, (int(project_id), account, outcome, amount, currency, source, message, now, now))
+
+async def store_project_keys_async(project_id, outcome=PLACED, amount=None, currency=None, source=None, message=None, account=""):
+    """Record the outcome of processing a project.
+
+    Args:
+        project_id: The project ID.
+        outcome (str): One of the ledger outcomes, e.g. PLACED or NDA.
+        amount (float): Bid amount in the project's currency, if any.
+        currency (str): Currency code of the amount.
+        source (str): AUTO or SEMI.
+        message (str): Error message returned by the API, if any.
+        account (str): Profile account the project was processed for.
+    """
+    await _write_async(_store_project_keys, project_id, outcome, amount, currency, source, message, account)
+
+def _existing_project_ids(c, project_ids, account=""):
+    project_ids = [int(project_id) for project_id in project_ids]
+    if not project_ids:
+        return set()
+    placeholders = ",".join("?" * len(project_ids))
+    c.execute(f"""
+        SELECT project_id FROM bids WHERE account = ? AND project_id IN ({placeholders})
+        UNION
+        SELECT project_id FROM seen_ids WHERE account = ? AND project_id IN ({placeholders})
+    """, [account] + project_ids + [account] + project_ids)
+    return {str(row[0]) for row in c.fetchall()}
+
+async def existing_project_ids_async(project_ids, account=""):
+    """Return the subset of project IDs already in the account's ledger."""
+    return await _read_async(_existing_project_ids, list(project_ids), account)
+
+def _store_many_project_keys(c, project_ids, outcome, source, account):
+    now = int(time.time())
+    c.executemany("""
+        INSERT OR IGNORE INTO bids (project_id, account, outcome, source, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [(int(project_id), account, outcome, source, now, now) for project_id in project_ids])
+
+async def store_many_project_keys_async(project_ids, outcome=SKIPPED, source=None, account=""):
+    """Record several projects with the same outcome in a single commit."""
+    await _write_async(_store_many_project_keys, list(project_ids), outcome, source, account)
+
+def _bid_project_ids(c, outcomes, account):
+    placeholders = ",".join("?" * len(outcomes))
+    c.execute(f"SELECT project_id FROM bids WHERE account = ? AND outcome IN ({placeholders})",
+            [account] + list(outcomes))
+    return [str(row[0]) for row in c.fetchall()]
+
+async def bid_project_ids_async(outcomes, account=""):
+    """Return the IDs of the account's projects with one of the given outcomes."""
+    return await _read_async(_bid_project_ids, list(outcomes), account)
+
+def _compact_ledger(c, skipped_before):
+    c.execute("""
+        INSERT OR IGNORE INTO seen_ids (project_id, account)
+        SELECT project_id, account FROM bids WHERE outcome = ? AND created_at < ?
+    """, (SKIPPED, int(skipped_before)))
+    c.execute("DELETE FROM bids WHERE outcome = ? AND created_at < ?", (SKIPPED, int(skipped_before)))
+    return c.rowcount
+
+async def compact_ledger_async(skipped_before):
+    """Move skipped rows created before ``skipped_before`` (epoch seconds) to seen_ids.
+
+    Only the id is needed to skip a project again, so old skipped rows are
+    reduced to it. Returns the number of rows compacted.
+    """
+    return await _write_async(_compact_ledger, skipped_before)
+
+def _get_watermark(c, key):
+    c.execute("SELECT watermark FROM poll_state WHERE key = ?", (key,))
+    row = c.fetchone()
+    return row[0] if row else None
+
+async def get_watermark_async(key):
+    """Return the highest project ID seen for a search key, or None."""
+    return await _read_async(_get_watermark, key)
+
+def _set_watermark(c, key, watermark):
+    # Never moves back, e.g. when a slower process finishes an older poll
+    c.execute("""
+        INSERT INTO poll_state (key, watermark) VALUES (?, ?)
+        ON CONFLICT (key) DO UPDATE SET watermark = MAX(watermark, excluded.watermark)
+    """, (key, watermark))
+
+async def set_watermark_async(key, watermark):
+    """Persist the highest project ID seen for a search key, unless a higher one is stored."""
+    await _write_async(_set_watermark, key, watermark)
+
+def _add_retries(c, project_ids, pipeline, account, delay):
+    due_at = time.time() + delay
+    # A project failing again keeps its attempt count
+    c.executemany("""
+        INSERT INTO retries (project_id, pipeline, account, due_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT (project_id, pipeline) DO UPDATE SET due_at = excluded.due_at
+    """, [(int(project_id), pipeline, account, due_at) for project_id in project_ids])
+
+async def add_retries_async(project_ids, pipeline, account="", delay=None):
+    """Fetch projects again for ``pipeline`` after ``delay`` seconds (``config.retry_delay``)."""
+    delay = config.retry_delay if delay is None else delay
+    await _write_async(_add_retries, list(project_ids), pipeline, account, delay)
+
+def _take_retries(c, pipelines, limit):
+    now = time.time()
+    # Finished since, or given up on
+    c.execute("""
+        DELETE FROM retries WHERE attempts >= ?
+        OR EXISTS (SELECT 1 FROM bids WHERE bids.project_id = retries.project_id AND bids.account = retries.account)
+        OR EXISTS (SELECT 1 FROM seen_ids WHERE seen_ids.project_id = retries.project_id AND seen_ids.account = retries.account)
+    """, (config.retry_max_attempts,))
+    if not pipelines:
+        return []
+    placeholders = ",".join("?" * len(pipelines))
+    c.execute(f"""
+        SELECT project_id, pipeline FROM retries WHERE due_at <= ? AND pipeline IN ({placeholders})
+        ORDER BY due_at LIMIT ?
+    """, [now] + list(pipelines) + [limit])
+    due = [(str(row[0]), row[1]) for row in c.fetchall()]
+    # Due again later in case this attempt does not finish either
+    c.executemany("""
+        UPDATE retries SET attempts = attempts + 1, due_at = ? WHERE project_id = ? AND pipeline = ?
+    """, [(now + config.retry_delay, int(project_id), pipeline) for project_id, pipeline in due])
+    return due
+
+async def take_retries_async(pipelines, limit):
+    """Return up to ``limit`` due retries of the given pipelines as (project_id, pipeline).
+
+    Each returned retry counts as an attempt. Projects that reached the
+    ledger since or ran out of attempts are dropped first.
+    """
+    return await _write_async(_take_retries, list(pipelines), limit)
+
+def _track_followup(c, project_id, account):
+    c.execute("""
+        INSERT INTO followups (project_id, account, added_at) VALUES (?, ?, ?)
+        ON CONFLICT (project_id, account) DO UPDATE SET draft_only = 0
+    """, (int(project_id), account, int(time.time())))
+
+async def track_followup_async(project_id, account=""):
+    """Start watching a project for follow-up alerts."""
+    await _write_async(_track_followup, project_id, account)
+
+def _track_drafts(c, project_ids, account):
+    c.executemany("""
+        INSERT OR IGNORE INTO followups (project_id, account, added_at, draft_only) VALUES (?, ?, ?, 1)
+    """, [(int(project_id), account, int(time.time())) for project_id in project_ids])
+
+async def track_drafts_async(project_ids, account=""):
+    """Watch alerted projects with a proposal draft, only to discard the draft once they close.
+
+    A project that is bid on later becomes a regular follow-up
+    (track_followup_async).
+    """
+    await _write_async(_track_drafts, list(project_ids), account)
+
+def _untrack_followups(c, project_ids, account):
+    c.executemany("DELETE FROM followups WHERE project_id = ? AND account = ?",
+            [(int(project_id), account) for project_id in project_ids])
+
+async def untrack_followups_async(project_ids, account=""):
+    """Stop watching the given projects."""
+    await _write_async(_untrack_followups, list(project_ids), account)
+
+def _due_followups(c, limit, account):
+    c.execute("""
+        SELECT project_id, draft_only FROM followups WHERE account = ?
+        ORDER BY checked_at, project_id LIMIT ?
+    """, (account, limit))
+    return [(str(row[0]), bool(row[1])) for row in c.fetchall()]
+
+async def due_followups_async(limit, account=""):
+    """Return up to ``limit`` watched projects as (project_id, draft_only), least recently checked first."""
+    return await _read_async(_due_followups, limit, account)
+
+def _mark_followups_checked(c, project_ids, checked_at, account):
+    checked_at = int(time.time()) if checked_at is None else int(checked_at)
+    c.executemany("UPDATE followups SET checked_at = ? WHERE project_id = ? AND account = ?",
+            [(checked_at, int(project_id), account) for project_id in project_ids])
+
+async def mark_followups_checked_async(project_ids, checked_at=None, account=""):
+    """Record that the given projects were just checked."""
+    await _write_async(_mark_followups_checked, list(project_ids), checked_at, account)
+
+def _expire_followups(c, added_before, drafts_added_before):
+    c.execute("DELETE FROM followups WHERE added_at < ? OR (draft_only = 1 AND added_at < ?)",
+            (int(added_before), int(drafts_added_before)))
+    return c.rowcount
+
+async def expire_followups_async(added_before, drafts_added_before=None):
+    """Stop watching projects tracked before ``added_before`` (epoch seconds).
+
+    Draft-only projects (track_drafts_async) are dropped once tracked before
+    ``drafts_added_before`` instead, if that is later.
+    """
+    drafts_added_before = added_before if drafts_added_before is None else drafts_added_before
+    return await _write_async(_expire_followups, added_before, drafts_added_before)
+
+def _claim_projects(c, project_ids, pipeline, ttl, account):
+    now = time.time()
+    claimed = set()
+    for project_id in project_ids:
+        if _project_id_exists(c, project_id, account):
+            continue
+        # Taken over only once the other lease has expired; our own is renewed
+        c.execute("""
+            INSERT INTO claims (project_id, account, owner, pipeline, expires_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (project_id, account) DO UPDATE SET
+                owner = excluded.owner,
+                pipeline = excluded.pipeline,
+                expires_at = excluded.expires_at
+            WHERE claims.expires_at < ? OR (claims.owner = excluded.owner AND claims.pipeline = excluded.pipeline)
+        """, (int(project_id), account, INSTANCE_ID, pipeline, now + ttl, now))
+        if c.rowcount:
+            claimed.add(str(project_id))
+    return claimed
+
+async def claim_projects_async(project_ids, pipeline, ttl, account=""):
+    """Claim projects for ``pipeline`` of this process for ``ttl`` seconds.
+
+    A project is claimed unless it is already in the account's ledger or
+    another process or pipeline holds an unexpired claim on it for the same
+    account. The whole list is claimed in one transaction. Returns the set
+    of claimed IDs as strings.
+    """
+    return await _write_async(_claim_projects, list(project_ids), pipeline, ttl, account)
+
+def _renew_claims(c, project_ids, pipeline, ttl, account):
+    now = time.time()
+    c.executemany("""
+        UPDATE claims SET expires_at = ?
+        WHERE project_id = ? AND account = ? AND owner = ? AND pipeline = ?
+    """, [(now + ttl, int(project_id), account, INSTANCE_ID, pipeline) for project_id in project_ids])
+    # The owner stopped renewing, most likely it died: the projects it had
+    # not finished are fetched again by whichever process runs the pipeline
+    c.execute("""
+        INSERT OR IGNORE INTO retries (project_id, pipeline, account, due_at)
+        SELECT project_id, pipeline, account, ? FROM claims WHERE expires_at < ?
+    """, (now, now))
+    c.execute("DELETE FROM claims WHERE expires_at < ?", (now,))
+
+async def renew_claims_async(project_ids, pipeline, ttl, account=""):
+    """Extend this process's claims by ``ttl`` seconds and turn expired claims into retries."""
+    await _write_async(_renew_claims, list(project_ids), pipeline, ttl, account)
+
+def _release_claims(c, project_ids, pipeline, account):
+    c.executemany("""
+        DELETE FROM claims WHERE project_id = ? AND account = ? AND owner = ? AND pipeline = ?
+    """, [(int(project_id), account, INSTANCE_ID, pipeline) for project_id in project_ids])
+
+async def release_claims_async(project_ids, pipeline, account=""):
+    """Give up this process's claims on the given projects."""
+    await _write_async(_release_claims, list(project_ids), pipeline, account)
@@ -0,0 +1,72 @@
+"""Async adapter for the blocking freelancersdk resources.
+
+Each call runs on a bounded thread pool so the event loop keeps serving
+Telegram commands and Quart routes while Freelancer responds, and several
+calls (auto poller, semi-auto poller, /place_bid) can be in flight at once.
+Every call has a timeout and raises asyncio.TimeoutError when it expires.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from freelancersdk.resources.projects import search_projects, place_project_bid
+from freelancersdk.resources.projects.projects import get_projects
+from freelancersdk.resources.users import get_self
+import config
+
+_executor = None
+
+def get_executor():
+    """Return the shared thread pool used for freelancersdk calls."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=config.freelancer_max_workers,
+            thread_name_prefix="freelancersdk",
+        )
+    return _executor
+
+def shutdown_executor():
+    """Stop the thread pool without waiting for calls still in flight.
+
+    Queued calls need no cancelling here: cancelling the task that awaits
+    run_sdk_call also cancels its pool future if it has not started.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+async def run_sdk_call(func, *args, timeout=None, **kwargs):
+    """Run a blocking freelancersdk function on the pool and await its result.
+
+    The timeout only stops the wait: a request that is already on the wire
+    keeps its worker thread until requests returns.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    return await asyncio.wait_for(
+        loop.run_in_executor(get_executor(), call),
+        timeout=timeout or config.freelancer_timeout,
+    )
+
+async def search_projects_async(session=None, **kwargs):
+    """Async search_projects on ``session`` (default: the configured session)."""
+    return await run_sdk_call(search_projects, session=session or config.session, **kwargs)
+
+async def get_projects_async(query, session=None):
+    """Async get_projects on ``session`` (default: the configured session)."""
+    return await run_sdk_call(get_projects, session or config.session, query)
+
+async def get_self_async(session=None):
+    """Async get_self on ``session`` (default: the configured session)."""
+    return await run_sdk_call(get_self, session=session or config.session)
+
+async def place_project_bid_async(session=None, **bid_data):
+    """Async place_project_bid on ``session`` (default: the configured session)."""
+    return await run_sdk_call(
+        place_project_bid,
+        session=session or config.session,
+        timeout=config.freelancer_bid_timeout,
+        **bid_data
+    )
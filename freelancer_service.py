@@ -1,422 +1,575 @@
 """Freelancer API operations."""
 
 import asyncio
-from datetime import datetime, timedelta, timezone
+import time
 from freelancersdk.resources.projects.exceptions import ProjectsNotFoundException, BidNotPlacedException
-from freelancersdk.resources.projects import search_projects, place_project_bid
 from freelancersdk.resources.users.exceptions import SelfNotRetrievedException
-from freelancersdk.resources.projects.projects import (
-    get_projects, get_project_by_id
-)
 from freelancersdk.resources.projects.helpers import (
     create_get_projects_object, create_get_projects_project_details_object,
     create_get_projects_user_details_object
 )
-from freelancersdk.resources.users import get_self
 import config
-from database import project_id_exists, store_project_keys, get_all_project_ids, delete_project_by_id
-from ai_service import send_ai_request
+from freelancer_client import get_projects_async, get_self_async, place_project_bid_async
+from search_poller import next_batch
+from poll_scheduler import get_bucket, followup_scheduler
+from database import (
+    store_project_keys_async, store_many_project_keys_async, add_retries_async,
+    track_followup_async, track_drafts_async, untrack_followups_async, due_followups_async, mark_followups_checked_async,
+    expire_followups_async, compact_ledger_async,
+    PLACED, ALREADY_BID, NDA, ERROR, SKIPPED, ALERTED, WON, AUTO, SEMI
+)
+from claims import confirm, release
+from proposal_cache import get_or_generate_proposal, evict
+from proposal_prefetch import schedule_draft, discard_draft
 from telegram_service import send_auto_telegram_message, send_semi_auto_telegram_message, send_project_followup_alert
-from utils import interruptible_sleep, load_projects, save_projects, add_project, delete_project, get_project
+from utils import interruptible_sleep, load_projects, save_projects, add_project, add_projects, delete_project, get_project
+from triage import triage_projects, is_relevant, SEEN, CLAIMED, STALE, INACTIVE, NO_BUDGET, INVALID, BELOW_MIN_BUDGET, HOURLY, LOW_RELEVANCE
+from project_record import ProjectRecord
 from lookup_utils import lookup_load_projects, lookup_save_projects, lookup_add_project, lookup_delete_project, lookup_get_project
+from metrics import counter, histogram
+from tracing import start_trace, use_trace, current_trace, span, finish_trace
+from profiles import default_profile
+from relevance import add_bid, mark_won
+
+BIDS_PLACED = counter("freelancer_bids_placed_total", "Bids placed, by source.", ("source",))
+BIDS_REJECTED = counter("freelancer_bids_rejected_total", "Bids not placed, by source and API error message.", ("source", "message"))
+BID_SECONDS = histogram("freelancer_bid_seconds", "Duration of place_project_bid calls.")
+
+# Auto pipeline stages: triage -> generate -> bid -> notify. The stages are
+# connected by bounded queues, so a slow stage backs up into the one before
+# it instead of piling up work. Proposals are generated concurrently; bids
+# go through a single worker to respect Freelancer's bid pacing. Each
+# biddable project carries its trace and the time it was queued through the
+# stages, so the trace shows queue waits next to the work of every stage.
+# Every profile runs its own stages; _in_flight holds profile keys.
+_stage_queues = {}
+_in_flight = set()
+
+def _stage_queue(profile, name):
+    key = f"{profile.pipeline('auto')}_{name}"
+    if key not in _stage_queues:
+        _stage_queues[key] = asyncio.Queue(maxsize=config.auto_queue_size)
+    return _stage_queues[key]
+
+def stage_queue_depths():
+    """Number of items waiting in each auto pipeline stage, e.g. "auto_generate"."""
+    return {name: queue.qsize() for name, queue in _stage_queues.items()}
+
+async def _notify(profile, *message, trace=None):
+    """Hand an auto alert to the notify stage, which finishes ``trace`` once it is sent."""
+    await _stage_queue(profile, "notify").put((message, trace, time.monotonic()))
+
+def _dequeued(trace, stage, queued_at):
+    """Record the queue wait before ``stage`` and make ``trace`` current."""
+    if trace is not None:
+        trace.add_span("queue_" + stage, queued_at, time.monotonic())
+    return use_trace(trace)
+
+async def _finished(profile, result):
+    """The auto pipeline is done with a project: forget it and release its claim."""
+    _in_flight.discard(profile.key(result.id))
+    try:
+        await release([result.id], profile.pipeline("auto"), profile.account)
+    except Exception as e:
+        print(f"Error releasing claim on Project ID: {result.id}: {e}")
+
+async def _retry(profile, result):
+    """Fetch a project the auto pipeline could not finish again later (see search_poller)."""
+    try:
+        await add_retries_async([result.id], profile.pipeline("auto"), profile.account)
+    except Exception as e:
+        print(f"Error queueing a retry of Project ID: {result.id}: {e}")
+
+async def _generate_worker(profile):
+    """Generate stage: draft the proposal of each biddable project."""
+    queue = _stage_queue(profile, "generate")
+    while not config.shutdown_flag:
+        result, trace, queued_at = await queue.get()
+        _dequeued(trace, "generate", queued_at)
+        data = result.data
+        try:
+            with span("proposal"):
+                lang, proposal = await get_or_generate_proposal(data.id, data.title, data.description, profile)
+            if lang == False or proposal == False:
+                if lang == False:
+                    print(f"Failed to detect language for Project ID: {data.id}, sleeping for {config.exhaustion_sleep_time} hour(s)")
+                else:
+                    print(f"Failed to generate proposal for Project ID: {data.id}, sleeping for {config.exhaustion_sleep_time} hour(s)")
+                await _retry(profile, result)
+                await _finished(profile, result)
+                finish_trace(trace, outcome="generation_failed")
+                await _notify(profile, str(data.title), "gen_proposal", data.id, data.seo_url)
+                await interruptible_sleep(
+                    hours=config.sleep_time,
+                    check_interval=5,
+                    shut_down_flag=lambda: config.shutdown_flag
+                )
+                continue
+            await _stage_queue(profile, "bid").put((result, proposal, trace, time.monotonic()))
+        except KeyboardInterrupt:
+            break
+        except Exception as e:
+            print(f"Error generating proposal for Project ID: {data.id}: {e}")
+            await _retry(profile, result)
+            await _finished(profile, result)
+            finish_trace(trace, outcome="error", error=str(e))
+        finally:
+            queue.task_done()
+
+async def _bid_worker(profile):
+    """Bid stage: place bids one at a time, paced by ``config.sleep_time``."""
+    queue = _stage_queue(profile, "bid")
+    while not config.shutdown_flag:
+        result, proposal, trace, queued_at = await queue.get()
+        _dequeued(trace, "bid", queued_at)
+        # Set to None once the trace is handed to the notify stage
+        outcome = "error"
+        # Whether the project ends without a ledger row and is fetched again
+        retry = False
+        data = result.data
+        amount = result.amount
+        bid_data = {
+            'project_id': int(data.id),
+            'bidder_id': profile.user_id,
+            'amount': amount,
+            'period': profile.bid_period,
+            'milestone_percentage': 100,
+            'description': proposal,
+        }
+        try:
+            with span("pacing_sleep"):
+                await interruptible_sleep(
+                    hours=config.sleep_time,
+                    check_interval=1,
+                    shut_down_flag=lambda: config.shutdown_flag
+                )
+            # Still ours and not bid on, by this or another process
+            with span("claim"):
+                held = await confirm(result.id, profile.pipeline("auto"), profile.account)
+            if not held:
+                outcome = "duplicate"
+                continue
+            started = time.monotonic()
+            try:
+                with span("place_bid"):
+                    response = await place_project_bid_async(session=profile.session, **bid_data)
+            finally:
+                BID_SECONDS.observe(time.monotonic() - started)
+            BIDS_PLACED.inc(source=AUTO)
+            with span("store_write"):
+                await store_project_keys_async(str(data.id), outcome=PLACED, amount=amount, currency=data.currency_code, source=AUTO, account=profile.account)
+                await track_followup_async(data.id, profile.account)
+                evict(data.id, profile)
+                add_bid(profile, data)
+            outcome = None
+            await _notify(profile, str(data.title), "proposal", proposal, data.seo_url, trace=trace)
 
-async def auto_function():
-    """Main auto bidding function."""
-    global user_id
+        except KeyboardInterrupt:
+            break
+        except asyncio.TimeoutError:
+            # The bid may still land; the retry then gets "already bid" and stores the key
+            print(f"Placing bid on Project ID: {data.id} timed out, retrying in {config.retry_delay} seconds")
+            BIDS_REJECTED.inc(source=AUTO, message="timeout")
+            outcome = "timeout"
+            retry = True
+        except BidNotPlacedException as e:
+            BIDS_REJECTED.inc(source=AUTO, message=str(e))
+            outcome = "rejected"
+            if trace is not None:
+                trace.set(message=str(e))
+            try:
+                if str(e) == "You have used all of your bids.":
+                    retry = True
+                    await interruptible_sleep(
+                        hours=config.exhaustion_sleep_time,
+                        check_interval=5,
+                        shut_down_flag=lambda: config.shutdown_flag
+                    )
+                elif str(e) == "You have already bid on that project.":
+                    await store_project_keys_async(str(data.id), outcome=ALREADY_BID, source=AUTO, account=profile.account)
+                    await track_followup_async(data.id, profile.account)
+                elif str(e) == "You must sign the NDA before you can bid on this project.":
+                    proposal_data = {
+                        'title': data.title,
+                        'amount': amount,
+                        'currency_exchange_rate': data.currency_exchange_rate
+                    }
+                    await _notify(profile, proposal_data, "nda", proposal, data.seo_url)
+                    await store_project_keys_async(str(data.id), outcome=NDA, amount=amount, currency=data.currency_code, source=AUTO, account=profile.account)
+                elif str(e) == "You appear to be bidding too fast. Please take the time to write a quality bid. Improve your trust score by getting Verified by Freelancer.":
+                    await _notify(profile, str(e), "error", proposal, data.seo_url)
+                    retry = True
+                    await interruptible_sleep(
+                        hours=config.sleep_time * 3,
+                        check_interval=1,
+                        shut_down_flag=lambda: config.shutdown_flag
+                    )
+                else:
+                    print('Server response: {}'.format(str(e)))
+                    proposal_data = {
+                        'title': data.title,
+                        'amount': amount,
+                        'currency_exchange_rate': data.currency_exchange_rate,
+                        'error_message': str(e),
+                        'id': data.id
+                    }
+                    await _notify(profile, proposal_data, "error", proposal, data.seo_url or "")
+                    await store_project_keys_async(str(data.id), outcome=ERROR, amount=amount, currency=data.currency_code, source=AUTO, message=str(e), account=profile.account)
+            except KeyboardInterrupt:
+                break
+        except Exception as e:
+            print(f"Error placing bid on Project ID: {data.id}: {e}")
+            retry = True
+        finally:
+            if retry:
+                await _retry(profile, result)
+            await _finished(profile, result)
+            if outcome is not None:
+                finish_trace(trace, outcome=outcome)
+            queue.task_done()
+
+async def _notify_worker(profile):
+    """Notify stage: send auto alerts without holding up the bid stage."""
+    queue = _stage_queue(profile, "notify")
+    while True:
+        message, trace, queued_at = await queue.get()
+        _dequeued(trace, "notify", queued_at)
+        try:
+            with span("telegram"):
+                await send_auto_telegram_message(*message, profile=profile)
+        except Exception as e:
+            print(f"Error sending auto alert: {e}")
+        finally:
+            finish_trace(trace, outcome="placed")
+            queue.task_done()
+
+async def _delivered(alerts):
+    """Wait for queued alerts [(result, amount, future)]. Returns (delivered, failed) lists of them."""
+    with span("telegram_delivery", alerts=len(alerts)):
+        sent = await asyncio.gather(*(future for _, _, future in alerts))
+    delivered = [alert for alert, ok in zip(alerts, sent) if ok]
+    failed = [alert for alert, ok in zip(alerts, sent) if not ok]
+    return delivered, failed
+
+def _project_trace(profile, result, triage_started, triage_ended):
+    """Start the trace of a biddable project, beginning with its batch's triage."""
+    trace = start_trace("auto_bid", started=triage_started, project_id=result.id, profile=profile.name)
+    if trace is not None:
+        trace.add_span("triage", triage_started, triage_ended)
+        trace.set(posted_age=round(time.time() - (result.data.time_submitted or 0), 1))
+    return trace
+
+def _start_stage_workers(profile):
+    workers = [asyncio.create_task(_generate_worker(profile)) for _ in range(max(1, config.auto_generate_workers))]
+    workers.append(asyncio.create_task(_bid_worker(profile)))
+    workers.append(asyncio.create_task(_notify_worker(profile)))
+    return workers
+
+async def auto_function(profile=None):
+    """Main auto bidding function: the triage stage of the auto pipeline of ``profile``."""
+    profile = profile or default_profile()
+    pipeline = profile.pipeline("auto")
+    workers = _start_stage_workers(profile)
     try:
         while not config.shutdown_flag:
             try:
-                if config.id_flag:
+                if profile.user_id is None:
                     try:
-                        response = get_self(session=config.session)
-                        user_id = response.get("id")
+                        response = await get_self_async(session=profile.session)
+                        profile.user_id = response.get("id")
                         username = response.get("username")
-                        print("Starting FREELANCERDOTCOM Assistant...")
+                        print(f"Starting FREELANCERDOTCOM Assistant ({profile.name} profile)...")
                         print(f"Username={username}")
-                        print(f"UserID={user_id}")
+                        print(f"UserID={profile.user_id}")
                         print("running...")
-                        config.id_flag = False
-                    except SelfNotRetrievedException as e:
-                        print('Server response: {}'.format(str(e)))
+                    except (SelfNotRetrievedException, asyncio.TimeoutError) as e:
+                        print('Server response: {}'.format(str(e) or "get_self timed out"))
                         await asyncio.sleep(config.sleep_time)
                         continue
-                if len(config.auto_jobs) < 1:
+                if len(profile.auto_jobs) < 1:
                     await asyncio.sleep(config.sleep_time)
                     continue
                 if config.auto_paused:
                     await asyncio.sleep(config.sleep_time)
                     continue
-                try:
-                    try:
-                        await interruptible_sleep(
-                            hours=config.sleep_time,
-                            check_interval=1,
-                            shut_down_flag=lambda: config.shutdown_flag
-                        )
-                    except KeyboardInterrupt:
-                        break
-                    
-                    response = search_projects(
-                        session=config.session,
-                        query=None,
-                        search_filter=config.search_filter_auto,
-                        project_details=config.project_detail,
-                        limit=config.project_number,
-                        offset=0,
-                        active_only=True
-                    )
-                except ProjectsNotFoundException as e:
-                    if str(e) == "You have made too many of these requests":
-                        print("You have made too many of these requests")
-                        try:
-                            await interruptible_sleep(
-                                hours=config.sleep_time,
-                                check_interval=1,
-                                shut_down_flag=lambda: config.shutdown_flag
-                            )
-                        except KeyboardInterrupt:
-                            break
-                    else:
-                        print('Server response: {}'.format(str(e)))
-                        await send_auto_telegram_message(str(e), "error", proposal="", seo_url="")
-                    await asyncio.sleep(config.sleep_time)
-                    continue
+                projects = await next_batch(pipeline)
+                batch = use_trace(start_trace("auto_batch", projects=len(projects), profile=profile.name))
 
-                for project in reversed(response.get("projects", [])):
-                    data = {
-                        "id": project.get("id"),
-                        "title": project.get("title"),
-                        "status": project.get("status"),
-                        "type": project.get("type"),
-						"owner_id": project.get("owner_id", 0),
-                        "seo_url": project.get("seo_url"),
-                        "currency_exchange_rate": project.get("currency", {}).get("exchange_rate"),
-                        "description": project.get("description"),
-                        "submit_date": datetime.fromtimestamp(project.get("submitdate", 0), tz=timezone.utc).isoformat(),
-                        "nonpublic": project.get("nonpublic"),
-                        "budget_min": project.get("budget", {}).get("minimum"),
-                        "budget_max": project.get("budget", {}).get("maximum"),
-                        "urgent": project.get("urgent"),
-                        "bid_count": project.get("bid_stats", {}).get("bid_count"),
-                        "bid_avg": project.get("bid_stats", {}).get("bid_avg"),
-                        "time_submitted": datetime.fromtimestamp(project.get("time_submitted", 0), tz=timezone.utc).isoformat(),
-                        "time_updated": datetime.fromtimestamp(project.get("time_updated", 0), tz=timezone.utc).isoformat()
-                    }
-                    
-                    if project_id_exists(str(data["id"])) or get_project(str(data["id"])):
-                        continue
+                triage_started = time.monotonic()
+                with span("triage"):
+                    triaged = await triage_projects(projects, pipeline, profile=profile)
+                triage_ended = time.monotonic()
 
-                    time_submitted = data["time_submitted"]
-                    budget_min = data["budget_min"]
-                    budget_max = data["budget_max"]
-                    bid_avg = data["bid_avg"]
-                    bid_status = data["status"]
-                    currency_exchange_rate = data["currency_exchange_rate"]
-                    type = data["type"]
-                    owner_id = data["owner_id"]
-
-                    time_submitted_dt = datetime.fromisoformat(data["time_submitted"])
-                    now = datetime.now(timezone.utc)
-                    if now - time_submitted_dt >= timedelta(hours=config.look_back_hours):
-                        print(f"Project {data['id']} is older than {config.look_back_hours} hours, skipping...")
-                        add_project(str(data["id"]), data, 0)
-                        await asyncio.sleep(config.sleep_time)
-                        continue
-                    
-                    if bid_status != "active":
-                        print(f"Project {data['id']} is not active, skipping...")
-                        add_project(str(data["id"]), data, 0)
-                        await asyncio.sleep(config.sleep_time)
+                records = []
+                skipped = []
+                alerted = []
+                alerts = []
+                drafted = []
+                biddable = []
+                for result in triaged:
+                    data = result.data
+                    if result.reason in (SEEN, CLAIMED):
                         continue
-                    
-                    if budget_max is None or budget_min is None:
-                        print(f"⚠️ Project {data['id']} has missing budget info, skipping...")
-                        response = await send_semi_auto_telegram_message(data, 0)
-                        add_project(str(data["id"]), data, 0)
-                        await asyncio.sleep(config.sleep_time)
-                        continue
-						
-                    if str(type) == "fixed":
-                        budget = float(budget_max) * float(currency_exchange_rate)
-                        if budget < config.min_budget:
+                    if result.reason == STALE:
+                        print(f"Project {data.id} is older than {profile.look_back_hours} hours, skipping...")
+                        records.append((profile.key(result.id), data, 0))
+                        skipped.append(result.id)
+                    elif result.reason == INACTIVE:
+                        print(f"Project {data.id} is not active, skipping...")
+                        records.append((profile.key(result.id), data, 0))
+                        skipped.append(result.id)
+                    elif result.reason == INVALID:
+                        # Already reported by triage; not a missing budget
+                        records.append((profile.key(result.id), data, 0))
+                        skipped.append(result.id)
+                    elif result.reason == LOW_RELEVANCE:
+                        print(f"Project {data.id} scored {result.relevance} for relevance, skipping...")
+                        records.append((profile.key(result.id), data, result.amount))
+                        skipped.append(result.id)
+                    elif result.reason == NO_BUDGET:
+                        print(f"⚠️ Project {data.id} has missing budget info, skipping...")
+                        with span("telegram", project_id=result.id):
+                            alerts.append((result, 0, await send_semi_auto_telegram_message(data, 0, profile)))
+                    elif result.reason in (BELOW_MIN_BUDGET, HOURLY):
+                        if result.reason == BELOW_MIN_BUDGET:
                             print("Project budget is lower than minimum budget, skipping...")
-                            amount = round(float(budget_max) * float(config.bid_avg_percent))
-                            if amount < (float(config.min_budget) / float(currency_exchange_rate)):
-                                amount = (float(config.min_budget) / float(currency_exchange_rate))
-                            response = await send_semi_auto_telegram_message(data, amount)
-                            add_project(str(data["id"]), data, amount)
-                            await asyncio.sleep(config.sleep_time)
-                            continue
-                    elif config.only_fixed:
-                        amount = round(float(budget_max) * float(config.bid_avg_percent))
-                        if amount < float(budget_min):
-                            amount = max(round(float(budget_max) * (float(config.bid_avg_percent) / 2)), budget_min)
-                        response = await send_semi_auto_telegram_message(data, amount)
-                        add_project(str(data["id"]), data, amount)
-                        await asyncio.sleep(config.sleep_time)
-                        continue
+                        with span("telegram", project_id=result.id):
+                            alerts.append((result, result.amount, await send_semi_auto_telegram_message(data, result.amount, profile)))
+                    elif profile.key(result.id) not in _in_flight:
+                        biddable.append(result)
 
-                    lang_prompt = config.description.format(text=data["description"])
-                    lang = await send_ai_request(lang_prompt, strict=False)
-                    if lang == False:
-                        print(f"Failed to detect language for Project ID: {data['id']}, sleeping for {config.exhaustion_sleep_time} hour(s)")
-                        proposal = data['id']
-                        await send_auto_telegram_message(str(data["title"]), "gen_proposal", proposal, data["seo_url"])
-                        try:
-                            await interruptible_sleep(
-                                hours=config.sleep_time,
-                                check_interval=5,
-                                shut_down_flag=lambda: config.shutdown_flag
-                            )
-                        except KeyboardInterrupt:
-                            break
-                        continue
+                # Only delivered alerts are recorded; the others are retried
+                delivered, failed = await _delivered(alerts)
+                for result, amount, _ in delivered:
+                    records.append((profile.key(result.id), result.data, amount))
+                    alerted.append(result.id)
+                    if result.reason != NO_BUDGET and is_relevant(result, profile) and schedule_draft(result.data, profile):
+                        drafted.append(result.id)
+                failed = [result.id for result, _, _ in failed]
+                # One store write and one database commit for the whole page;
+                # the ledger rows keep other processes from alerting again
+                with span("store_write", projects=len(records)):
+                    add_projects(records)
+                    await store_many_project_keys_async(skipped, outcome=SKIPPED, source=AUTO, account=profile.account)
+                    await store_many_project_keys_async(alerted, outcome=ALERTED, source=AUTO, account=profile.account)
+                    await track_drafts_async(drafted, profile.account)
+                    await add_retries_async(failed, pipeline, profile.account)
+                await release(skipped + alerted + failed, pipeline, profile.account)
 
-                    prompt = config.PROPOSAL_PROMPT_TEMPLATE.format(language=lang,title=data["title"],description=data["description"],proposal_yrs_exp=config.proposal_yrs_exp)
-                    proposal = await send_ai_request(prompt)
-                    if proposal != False:
-                        amount = round(float(budget_max) * float(config.bid_avg_percent))
-                        if str(type) == "fixed":
-                            if amount < (float(config.min_budget) / float(currency_exchange_rate)):
-                                amount = (float(config.min_budget) / float(currency_exchange_rate))
-                        if amount < float(budget_min):
-                            amount = max(round(float(budget_max) * (float(config.bid_avg_percent) / 2)), budget_min)
-                        
-                        bid_data = {
-                            'project_id': int(data["id"]),
-                            'bidder_id': user_id,
-                            'amount': amount,
-                            'period': config.bid_period,
-                            'milestone_percentage': 100,
-                            'description': proposal,
-                        }
-                        
-                        try:
-                            try:
-                                await interruptible_sleep(
-                                    hours=config.sleep_time,
-                                    check_interval=1,
-                                    shut_down_flag=lambda: config.shutdown_flag
-                                )
-                            except KeyboardInterrupt:
-                                break
-                            if project_id_exists(str(data["id"])):
-                                continue
-                            response = place_project_bid(session=config.session, **bid_data)
-                            store_project_keys(str(data['id']))
-                            await send_auto_telegram_message(str(data["title"]), "proposal", proposal, data["seo_url"])
-                            
-                        except BidNotPlacedException as e:
-                            if str(e) == "You have used all of your bids.":
-                                try:
-                                    await interruptible_sleep(
-                                        hours=config.exhaustion_sleep_time,
-                                        check_interval=5,
-                                        shut_down_flag=lambda: config.shutdown_flag
-                                    )
-                                except KeyboardInterrupt:
-                                    break
-                                continue
-                            
-                            if str(e) == "You have already bid on that project.":
-                                store_project_keys(str(data['id']))
-                                continue
-                            
-                            if str(e) == "You must sign the NDA before you can bid on this project.":
-                                proposal_data = {
-                                    'title': data["title"],
-                                    'amount': amount,
-									'currency_exchange_rate': data["currency_exchange_rate"]
-                                }
-                                await send_auto_telegram_message(proposal_data, "nda", proposal, data["seo_url"])
-                                store_project_keys(str(data['id']))
-                                continue
-                            if str(e) == "You appear to be bidding too fast. Please take the time to write a quality bid. Improve your trust score by getting Verified by Freelancer.":
-                                await send_auto_telegram_message(str(e), "error", proposal, data["seo_url"])
-                                try:
-                                    await interruptible_sleep(
-                                        hours=config.sleep_time * 3,
-                                        check_interval=1,
-                                        shut_down_flag=lambda: config.shutdown_flag
-                                    )
-                                except KeyboardInterrupt:
-                                    break
-                                continue
-                            else:
-                                print('Server response: {}'.format(str(e)))
-                                proposal_data = {
-                                    'title': data["title"],
-                                    'amount': amount,
-									'currency_exchange_rate': data["currency_exchange_rate"],
-                                    'error_message': str(e),
-				                    'id': data['id']
-                                }
-                                await send_auto_telegram_message(proposal_data, "error", proposal, data["seo_url"] or "")
-                                store_project_keys(str(data['id']))
-                                continue
-                    else:
-                        print(f"Failed to generate proposal for Project ID: {data['id']}, sleeping for {config.exhaustion_sleep_time} hour(s)")
-                        proposal = data['id']
-                        await send_auto_telegram_message(str(data["title"]), "gen_proposal", proposal, data["seo_url"])
-                        try:
-                            await interruptible_sleep(
-                                hours=config.sleep_time,
-                                check_interval=5,
-                                shut_down_flag=lambda: config.shutdown_flag
-                            )
-                        except KeyboardInterrupt:
-                            break
-                        continue
-                
-                await asyncio.sleep(config.sleep_time)
+                # Blocks while the generate stage is full
+                with span("enqueue", projects=len(biddable)):
+                    for result in biddable:
+                        _in_flight.add(profile.key(result.id))
+                        trace = _project_trace(profile, result, triage_started, triage_ended)
+                        await _stage_queue(profile, "generate").put((result, trace, time.monotonic()))
+                finish_trace(batch, biddable=len(biddable))
             except Exception as e:
+                # Logged only: the failure is not about one project, and the
+                # pipeline must go on with the next page
                 print(f"Error processing projects: {e}")
-                await send_semi_auto_telegram_message(data, 0)
+                finish_trace(current_trace(), error=str(e))
                 continue
     except Exception as e:
         print(f"⚠️ Unexpected error: {e}")
     finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
         print("[🚨🚨🚨🚨🚨🚨🚨🚨🚨🚨]")
 
-async def semi_auto_function():
-    """Semi-automatic function placeholder."""
+def _won_by(project, user_id):
+    """True if one of the project's selected bids is by ``user_id``."""
+    if user_id is None:
+        return False
+    return any(bid.get("bidder_id") == user_id for bid in project.get("selected_bids") or [])
+
+async def check_followups(profile=None):
+    """Alert on watched projects of ``profile`` that were awarded or closed.
+
+    Only projects still open are watched (see database.track_followup_async).
+    Alerted projects with a proposal draft are watched too, without an alert:
+    once they close their draft is discarded. Each cycle checks up to ``config.followup_chunks`` chunks of
+    ``config.followup_chunk_size`` of them, least recently checked first, so
+    the cost of a cycle does not grow with the bid history.
+    """
+    profile = profile or default_profile()
+    scheduler = followup_scheduler(profile.pipeline("followup"))
+    if profile.user_id is None:
+        # Needed to tell won projects apart, e.g. when auto bidding is off
+        try:
+            await profile.get_user_id()
+        except (SelfNotRetrievedException, asyncio.TimeoutError) as e:
+            print('Server response: {}'.format(str(e) or "get_self timed out"))
+    with span("store_io"):
+        # Drafts are gone after the cache TTL, so are their projects
+        expired = await expire_followups_async(time.time() - config.followup_max_age, time.time() - config.proposal_cache_ttl)
+        await compact_ledger_async(time.time() - config.ledger_skipped_retention)
+        due = await due_followups_async(config.followup_chunk_size * config.followup_chunks, profile.account)
+    if expired:
+        print(f"Stopped following {expired} project(s) past their follow-up age")
+    drafts = {project_id for project_id, draft_only in due if draft_only}
+    project_ids = [project_id for project_id, _ in due]
+
+    # Already alerted, e.g. before the tracker existed
+    alerted = [project_id for project_id in project_ids if lookup_get_project(profile.key(project_id))]
+    if alerted:
+        await untrack_followups_async(alerted, profile.account)
+    project_ids = [project_id for project_id in project_ids if project_id not in alerted]
+
+    for start in range(0, len(project_ids), config.followup_chunk_size):
+        chunk = project_ids[start:start + config.followup_chunk_size]
+        if start:
+            get_bucket().charge()
+        q = create_get_projects_object(
+            project_ids=[int(project_id) for project_id in chunk],
+            project_details=create_get_projects_project_details_object(
+                selected_bids=True,
+            ),
+            limit=len(chunk)
+        )
+        try:
+            with span("get_projects", projects=len(chunk)):
+                p = await get_projects_async(q, session=profile.session)
+        except ProjectsNotFoundException as e:
+            print('Error message: {}'.format(str(e)))
+            print('Server response: {}'.format(e.error_code))
+            if str(e) == "You have made too many of these requests":
+                scheduler.record_rate_limited()
+            return
+        except asyncio.TimeoutError:
+            print("Follow-up project lookup timed out")
+            return
+
+        scheduler.record_poll()
+        projects = p.get("projects", []) if p else []
+        returned = {str(project.get("id")) for project in projects}
+        # Deleted projects are not returned, nothing left to follow
+        closed = [project_id for project_id in chunk if project_id not in returned]
+        for project_id in closed:
+            discard_draft(project_id, profile)
+        for project in reversed(projects):
+            data = ProjectRecord.from_api(project)
+            if data.status == "active":
+                continue
+            if str(data.id) in drafts:
+                # Only alerted, nothing to report; the draft is of no use now
+                discard_draft(data.id, profile)
+                closed.append(str(data.id))
+                continue
+            if _won_by(project, profile.user_id):
+                # Projects like this one should score higher from now on
+                mark_won(profile, data)
+                await store_project_keys_async(str(data.id), outcome=WON, account=profile.account)
+            with span("telegram", project_id=data.id):
+                sent = await send_project_followup_alert(data, profile)
+            if sent:
+                lookup_add_project(profile.key(data.id))
+                discard_draft(data.id, profile)
+                closed.append(str(data.id))
+        with span("store_write"):
+            await untrack_followups_async(closed, profile.account)
+            await mark_followups_checked_async([project_id for project_id in chunk if project_id not in closed], account=profile.account)
+
+async def followup_function(profile=None):
+    """Follow-up loop of ``profile``, on its own ``followup_scheduler`` cadence.
+
+    It runs in its own task rather than in the semi-auto pipeline, which
+    waits for search pages: award checks go on when no new projects come in.
+    Like the semi-auto pipeline, it is off while semi-auto is paused or has
+    no job filter.
+    """
+    profile = profile or default_profile()
+    scheduler = followup_scheduler(profile.pipeline("followup"))
+    while not config.shutdown_flag:
+        if len(profile.semi_auto_jobs) < 1 or config.semi_auto_paused:
+            await asyncio.sleep(config.sleep_time)
+            continue
+        try:
+            await scheduler.wait()
+        except KeyboardInterrupt:
+            break
+        trace = use_trace(start_trace("followups", profile=profile.name))
+        try:
+            await check_followups(profile)
+            finish_trace(trace)
+        except Exception as e:
+            print(f"Error checking follow-ups: {e}")
+            finish_trace(trace, error=str(e))
+
+async def semi_auto_function(profile=None):
+    """Semi-auto pipeline of ``profile``: alert on new projects (see followup_function for follow-ups)."""
+    profile = profile or default_profile()
+    pipeline = profile.pipeline("semi_auto")
     try:
         while not config.shutdown_flag:
-            if len(config.semi_auto_jobs) < 1:
+            if len(profile.semi_auto_jobs) < 1:
                 await asyncio.sleep(config.sleep_time)
                 continue
             if config.semi_auto_paused:
                 await asyncio.sleep(config.sleep_time)
                 continue
 
-            bidden_projects = get_all_project_ids()
-            q = create_get_projects_object(
-                project_ids=[bidden_projects],
-                project_details=create_get_projects_project_details_object(
-                    selected_bids=True,
-                ),
-                limit=50
-             )
             try:
-                p = get_projects(config.session, q)
-            except ProjectsNotFoundException as e:
-                print('Error message: {}'.format(e.message))
-                print('Server response: {}'.format(e.error_code))
-            else:
-                if p:
-                    for project in reversed(p.get("projects", [])):
-                        data = {
-                            "id": project.get("id"),
-                            "title": project.get("title"),
-                            "status": project.get("status"),
-                            "seo_url": project.get("seo_url")
-                        }
-                        if lookup_get_project(str(data["id"])):
-                            continue
-                        if await send_project_followup_alert(data):
-                            lookup_add_project(str(data["id"]))
-            try:
-                try:
-                    response = search_projects(
-                        session=config.session,
-                        query=None,
-                        search_filter=config.search_filter_semi_auto,
-                        project_details=config.project_detail,
-                        limit=config.project_number_semi_auto,
-                        offset=0,
-                        active_only=True
-                    )
-                except ProjectsNotFoundException as e:
-                    if str(e) == "You have made too many of these requests":
-                        print("You have made too many of these requests")
-                        try:
-                            await interruptible_sleep(
-                                hours=config.sleep_time_semi,
-                                check_interval=1,
-                                shut_down_flag=lambda: config.shutdown_flag
-                            )
-                        except KeyboardInterrupt:
-                            break
-                    else:
-                        print('Server response: {}'.format(str(e)))
-                        await send_auto_telegram_message(str(e), "error", proposal="", seo_url="")
-                    await asyncio.sleep(config.sleep_time)
-                    continue
+                projects = await next_batch(pipeline)
+                batch = use_trace(start_trace("semi_auto_batch", projects=len(projects), profile=profile.name))
 
-                for project in reversed(response.get("projects", [])):
-                    data = {
-                        "id": project.get("id"),
-                        "title": project.get("title"),
-                        "status": project.get("status"),
-                        "type": project.get("type"),
-                        "owner_id": project.get("owner_id", 0),
-                        "seo_url": project.get("seo_url"),
-                        "currency_exchange_rate": project.get("currency", {}).get("exchange_rate"),
-                        "description": project.get("description"),
-                        "submit_date": datetime.fromtimestamp(project.get("submitdate", 0), tz=timezone.utc).isoformat(),
-                        "nonpublic": project.get("nonpublic"),
-                        "budget_min": project.get("budget", {}).get("minimum"),
-                        "budget_max": project.get("budget", {}).get("maximum"),
-                        "urgent": project.get("urgent"),
-                        "bid_count": project.get("bid_stats", {}).get("bid_count"),
-                        "bid_avg": project.get("bid_stats", {}).get("bid_avg"),
-                        "time_submitted": datetime.fromtimestamp(project.get("time_submitted", 0), tz=timezone.utc).isoformat(),
-                        "time_updated": datetime.fromtimestamp(project.get("time_updated", 0), tz=timezone.utc).isoformat()
-                    }
-                    
-                    if project_id_exists(str(data["id"])) or get_project(str(data["id"])):
+                skipped = []
+                records = []
+                alerts = []
+                drafted = []
+                with span("triage"):
+                    triaged = await triage_projects(projects, pipeline, profile=profile)
+                claimed = [result.id for result in triaged if result.reason not in (SEEN, CLAIMED)]
+                for result in triaged:
+                    data = result.data
+                    if result.reason in (SEEN, CLAIMED):
                         continue
-
-                    time_submitted = data["time_submitted"]
-                    budget_min = data["budget_min"]
-                    budget_max = data["budget_max"]
-                    bid_avg = data["bid_avg"]
-                    bid_status = data["status"]
-                    currency_exchange_rate = data["currency_exchange_rate"]
-                    type = data["type"]
-
-                    time_submitted_dt = datetime.fromisoformat(data["time_submitted"])
-                    now = datetime.now(timezone.utc)
-                    if now - time_submitted_dt >= timedelta(hours=config.look_back_hours):
-                        print(f"Project {data['id']} is older than {config.look_back_hours} hours, skipping...")
-                        store_project_keys(str(data['id']))
-                        await asyncio.sleep(config.sleep_time)
+                    if result.reason == STALE:
+                        print(f"Project {data.id} is older than {profile.look_back_hours} hours, skipping...")
+                        skipped.append(result.id)
                         continue
-                    
-                    if bid_status != "active":
-                        print(f"Project {data['id']} is not active, skipping...")
-                        store_project_keys(str(data['id']))
-                        await asyncio.sleep(config.sleep_time)
+                    if result.reason == INACTIVE:
+                        print(f"Project {data.id} is not active, skipping...")
+                        skipped.append(result.id)
                         continue
-                    
-                    if budget_max is None or budget_min is None:
-                        print(f"⚠️ Project {data['id']} has missing budget info, skipping...")
-                        await send_semi_auto_telegram_message(data, 0)
-                        store_project_keys(str(data['id']))
-                        await asyncio.sleep(config.sleep_time)
+                    if result.reason == INVALID:
+                        # Already reported by triage; not a missing budget
+                        skipped.append(result.id)
                         continue
+                    if result.reason == NO_BUDGET:
+                        print(f"⚠️ Project {data.id} has missing budget info, skipping...")
+                        with span("telegram", project_id=result.id):
+                            alerts.append((result, 0, await send_semi_auto_telegram_message(data, 0, profile)))
+                        continue
+
+                    with span("telegram", project_id=result.id):
+                        alerts.append((result, result.amount, await send_semi_auto_telegram_message(data, result.amount, profile)))
 
-                    amount = round(float(budget_max) * float(config.bid_avg_percent))
-                    if str(type) == "fixed":
-                        if amount < (float(config.min_budget) / float(currency_exchange_rate)):
-                            amount = (float(config.min_budget) / float(currency_exchange_rate))
-                    if amount < float(budget_min):
-                        amount = max(round(float(budget_max) * (float(config.bid_avg_percent) / 2)), budget_min)
-                    response = await send_semi_auto_telegram_message(data, amount)
-                    if response:
-                        add_project(str(data["id"]), data, amount)
+                # Only delivered alerts are recorded; the others are retried
+                delivered, failed = await _delivered(alerts)
+                for result, amount, _ in delivered:
+                    if result.reason == NO_BUDGET:
+                        skipped.append(result.id)
                         continue
-                try:
-                    await interruptible_sleep(
-                        hours=config.sleep_time_semi,
-                        check_interval=1,
-                        shut_down_flag=lambda: config.shutdown_flag
-                    )
-                except KeyboardInterrupt:
-                    break
+                    records.append((profile.key(result.id), result.data, amount))
+                    # Drafted only if it may be worth a proposal
+                    if is_relevant(result, profile) and schedule_draft(result.data, profile):
+                        drafted.append(result.id)
+                # One database commit and one store write for the whole page;
+                # the ledger rows keep other processes from alerting again
+                with span("store_write", projects=len(skipped) + len(records)):
+                    await store_many_project_keys_async(skipped, outcome=SKIPPED, source=SEMI, account=profile.account)
+                    await store_many_project_keys_async([str(record[1].id) for record in records], outcome=ALERTED, source=SEMI, account=profile.account)
+                    await track_drafts_async(drafted, profile.account)
+                    await add_retries_async([result.id for result, _, _ in failed], pipeline, profile.account)
+                    add_projects(records)
+                await release(claimed, pipeline, profile.account)
+                finish_trace(batch, alerts=len(records))
             except Exception as e:
+                # Logged only: the failure is not about one project, and the
+                # pipeline must go on with the next page
                 print(f"Error processing projects: {e}")
-                await send_semi_auto_telegram_message(data, 0)
+                finish_trace(current_trace(), error=str(e))
                 continue
     except Exception as e:
         print(f"⚠️ Unexpected error: {e}")
@@ -0,0 +1,128 @@
+"""Offline language identification for project descriptions.
+
+Non-Latin scripts are identified from their Unicode ranges. Latin-script
+text is compared against character n-gram profiles built from the samples
+in lang_profiles.py using cosine similarity. The result is a lowercase
+language name, the same form the proposal prompt expects, plus a confidence
+score so callers can fall back to the LLM when the match is weak.
+
+Short Latin-script text, such as a one-line project title, shares too few
+n-grams with any profile for the ranking to mean much: "Convert PSD to HTML
+responsive template" is closer to Portuguese than to English. Text with
+fewer than MIN_NGRAMS n-grams, or whose best similarity is below
+MIN_SIMILARITY, is left to the LLM.
+"""
+
+import math
+import re
+from collections import Counter
+from lang_profiles import (
+    SAMPLES, SCRIPT_LANGUAGES, CYRILLIC, CYRILLIC_MARKERS, CYRILLIC_DEFAULT,
+    ARABIC, ARABIC_MARKERS, ARABIC_DEFAULT,
+)
+
+NGRAM_SIZES = (3, 4)
+MIN_NGRAMS = 100
+MIN_SIMILARITY = 0.2
+_NON_LETTERS = re.compile(r"[^\w]+|[\d_]+")
+
+_profiles = None
+
+def _ngrams(text):
+    """Count padded character n-grams of every word in ``text``."""
+    counts = Counter()
+    for word in _NON_LETTERS.sub(" ", text.lower()).split():
+        padded = f" {word} "
+        for size in NGRAM_SIZES:
+            for i in range(len(padded) - size + 1):
+                gram = padded[i:i + size]
+                if gram != " ":
+                    counts[gram] += 1
+    return counts
+
+def _norm(counts):
+    return math.sqrt(sum(v * v for v in counts.values())) or 1.0
+
+def get_profiles():
+    """Return {language: (ngram counts, vector norm)}, built on first use."""
+    global _profiles
+    if _profiles is None:
+        _profiles = {}
+        for language, sample in SAMPLES.items():
+            counts = _ngrams(sample)
+            _profiles[language] = (counts, _norm(counts))
+    return _profiles
+
+def _in_ranges(char, ranges):
+    code = ord(char)
+    return any(first <= code <= last for first, last in ranges)
+
+def _script_language(text, letters):
+    """Return (language, share of letters) for the dominant non-Latin script, if any."""
+    counts = Counter()
+    for char in letters:
+        if ord(char) < 0x0250:
+            continue
+        if _in_ranges(char, [CYRILLIC]):
+            counts["cyrillic"] += 1
+        elif _in_ranges(char, [ARABIC]):
+            counts["arabic"] += 1
+        else:
+            for language, ranges in SCRIPT_LANGUAGES:
+                if _in_ranges(char, ranges):
+                    counts[language] += 1
+                    break
+    if not counts:
+        return None, 0.0
+
+    # Japanese mixes kana with Han characters
+    if counts.get("japanese") and counts.get("chinese"):
+        counts["japanese"] += counts.pop("chinese")
+
+    script, count = counts.most_common(1)[0]
+    share = count / len(letters)
+    if script == "cyrillic":
+        return _pick_marked(text, CYRILLIC_MARKERS, CYRILLIC_DEFAULT), share
+    if script == "arabic":
+        return _pick_marked(text, ARABIC_MARKERS, ARABIC_DEFAULT), share
+    return script, share
+
+def _pick_marked(text, markers, default):
+    for language, chars in markers:
+        if any(char in text for char in chars):
+            return language
+    return default
+
+def detect_language(text, min_chars=20):
+    """Detect the language of ``text``.
+
+    Returns:
+        tuple: (language, confidence). ``language`` is a lowercase name such
+        as "english", or None if the text is too short or too unlike every
+        profile to judge. Confidence is between 0 and 1.
+    """
+    if not text:
+        return None, 0.0
+    letters = [char for char in text if char.isalpha()]
+    if len(letters) < min_chars:
+        return None, 0.0
+
+    language, share = _script_language(text, letters)
+    if language and share >= 0.5:
+        return language, share
+
+    counts = _ngrams(text)
+    if sum(counts.values()) < MIN_NGRAMS:
+        return None, 0.0
+    norm = _norm(counts)
+    scores = []
+    for language, (profile, profile_norm) in get_profiles().items():
+        dot = sum(count * profile.get(gram, 0) for gram, count in counts.items())
+        scores.append((dot / (norm * profile_norm), language))
+    scores.sort(reverse=True)
+
+    best, language = scores[0]
+    second = scores[1][0] if len(scores) > 1 else 0.0
+    if best < MIN_SIMILARITY:
+        return None, 0.0
+    return language, (best - second) / best
@@ -0,0 +1,186 @@
+"""Seed text for the character n-gram language profiles used by lang_detect.
+
+Each sample is ordinary prose in the style of a project description, heavy
+on the function words that dominate real text. Profiles are built from these
+at first use; add a language by adding a sample keyed by the language name
+exactly as it should appear in the proposal prompt.
+"""
+
+SAMPLES = {
+    "english": """
+        We are looking for an experienced developer to build a new website for our
+        small business. The site should have a clean design, a contact form and a
+        page where customers can see our products and prices. You will also need to
+        connect it with our payment system and make sure that it works well on
+        mobile phones. Please tell us about your previous work and how long the
+        project will take. We would like to start as soon as possible and we have a
+        fixed budget for this job. If you have any questions about the requirements,
+        send me a message and I will answer them. The right person should be able to
+        communicate clearly, follow the instructions and deliver the work on time.
+        This is the first part of a bigger project, so there could be more work
+        for you in the future if we are happy with the results.
+    """,
+    "spanish": """
+        Estamos buscando un desarrollador con experiencia para crear un nuevo sitio
+        web para nuestra pequeña empresa. El sitio debe tener un diseño limpio, un
+        formulario de contacto y una página donde los clientes puedan ver nuestros
+        productos y precios. También necesitas conectarlo con nuestro sistema de pago
+        y asegurarte de que funcione bien en los teléfonos móviles. Por favor,
+        cuéntanos sobre tu trabajo anterior y cuánto tiempo tomará el proyecto.
+        Queremos empezar lo antes posible y tenemos un presupuesto fijo para este
+        trabajo. Si tienes alguna pregunta sobre los requisitos, envíame un mensaje y
+        te responderé. La persona adecuada debe comunicarse con claridad, seguir las
+        instrucciones y entregar el trabajo a tiempo. Esta es la primera parte de un
+        proyecto más grande, así que podría haber más trabajo en el futuro.
+    """,
+    "portuguese": """
+        Estamos procurando um desenvolvedor com experiência para criar um novo site
+        para a nossa pequena empresa. O site deve ter um design limpo, um formulário
+        de contato e uma página onde os clientes possam ver os nossos produtos e
+        preços. Você também precisa conectá-lo ao nosso sistema de pagamento e
+        garantir que funcione bem nos celulares. Por favor, conte-nos sobre o seu
+        trabalho anterior e quanto tempo o projeto vai levar. Queremos começar o mais
+        rápido possível e temos um orçamento fixo para este trabalho. Se você tiver
+        alguma dúvida sobre os requisitos, envie uma mensagem e eu vou responder. A
+        pessoa certa deve se comunicar com clareza, seguir as instruções e entregar o
+        trabalho no prazo. Esta é a primeira parte de um projeto maior, então poderá
+        haver mais trabalho no futuro se ficarmos satisfeitos com os resultados.
+    """,
+    "french": """
+        Nous recherchons un développeur expérimenté pour créer un nouveau site web
+        pour notre petite entreprise. Le site doit avoir un design épuré, un
+        formulaire de contact et une page où les clients peuvent voir nos produits et
+        nos prix. Vous devrez aussi le connecter à notre système de paiement et vous
+        assurer qu'il fonctionne bien sur les téléphones mobiles. Merci de nous parler
+        de vos travaux précédents et du temps nécessaire pour le projet. Nous
+        voulons commencer le plus tôt possible et nous avons un budget fixe pour ce
+        travail. Si vous avez des questions sur les exigences, envoyez-moi un message
+        et je vous répondrai. La bonne personne doit communiquer clairement, suivre
+        les instructions et livrer le travail dans les délais. C'est la première
+        partie d'un projet plus grand, donc il pourrait y avoir plus de travail.
+    """,
+    "german": """
+        Wir suchen einen erfahrenen Entwickler, der eine neue Webseite für unser
+        kleines Unternehmen erstellt. Die Seite sollte ein sauberes Design, ein
+        Kontaktformular und eine Seite haben, auf der die Kunden unsere Produkte und
+        Preise sehen können. Außerdem musst du sie mit unserem Zahlungssystem
+        verbinden und sicherstellen, dass sie auf Mobiltelefonen gut funktioniert.
+        Bitte erzähl uns von deinen bisherigen Arbeiten und wie lange das Projekt
+        dauern wird. Wir möchten so schnell wie möglich anfangen und haben ein festes
+        Budget für diese Arbeit. Wenn du Fragen zu den Anforderungen hast, schick mir
+        eine Nachricht und ich werde sie beantworten. Die richtige Person sollte klar
+        kommunizieren, die Anweisungen befolgen und die Arbeit pünktlich liefern.
+        Das ist der erste Teil eines größeren Projekts, es kann also mehr Arbeit geben.
+    """,
+    "italian": """
+        Stiamo cercando uno sviluppatore esperto per creare un nuovo sito web per la
+        nostra piccola azienda. Il sito deve avere un design pulito, un modulo di
+        contatto e una pagina dove i clienti possono vedere i nostri prodotti e i
+        prezzi. Dovrai anche collegarlo al nostro sistema di pagamento e assicurarti
+        che funzioni bene sui telefoni cellulari. Per favore, parlaci dei tuoi lavori
+        precedenti e di quanto tempo richiederà il progetto. Vorremmo iniziare il
+        prima possibile e abbiamo un budget fisso per questo lavoro. Se hai domande
+        sui requisiti, mandami un messaggio e ti risponderò. La persona giusta deve
+        comunicare in modo chiaro, seguire le istruzioni e consegnare il lavoro nei
+        tempi previsti. Questa è la prima parte di un progetto più grande, quindi
+        potrebbe esserci altro lavoro per te in futuro se saremo soddisfatti.
+    """,
+    "dutch": """
+        Wij zijn op zoek naar een ervaren ontwikkelaar om een nieuwe website te maken
+        voor ons kleine bedrijf. De site moet een strak ontwerp hebben, een
+        contactformulier en een pagina waar klanten onze producten en prijzen kunnen
+        zien. Je moet het ook koppelen aan ons betaalsysteem en ervoor zorgen dat het
+        goed werkt op mobiele telefoons. Vertel ons alsjeblieft over je eerdere werk
+        en hoe lang het project gaat duren. We willen zo snel mogelijk beginnen en we
+        hebben een vast budget voor deze opdracht. Als je vragen hebt over de eisen,
+        stuur me dan een bericht en ik zal ze beantwoorden. De juiste persoon moet
+        duidelijk communiceren, de instructies volgen en het werk op tijd opleveren.
+        Dit is het eerste deel van een groter project, dus er kan in de toekomst
+        meer werk voor je zijn als we tevreden zijn met het resultaat.
+    """,
+    "polish": """
+        Szukamy doświadczonego programisty, który stworzy nową stronę internetową dla
+        naszej małej firmy. Strona powinna mieć czysty projekt, formularz kontaktowy
+        oraz stronę, na której klienci mogą zobaczyć nasze produkty i ceny. Trzeba
+        będzie także połączyć ją z naszym systemem płatności i upewnić się, że działa
+        dobrze na telefonach komórkowych. Prosimy o informacje o poprzednich pracach
+        i o tym, ile czasu zajmie projekt. Chcemy zacząć jak najszybciej i mamy stały
+        budżet na to zlecenie. Jeśli masz pytania dotyczące wymagań, wyślij mi
+        wiadomość, a ja na nie odpowiem. Odpowiednia osoba powinna jasno się
+        komunikować, przestrzegać instrukcji i dostarczyć pracę na czas. To jest
+        pierwsza część większego projektu, więc w przyszłości może być więcej pracy.
+    """,
+    "turkish": """
+        Küçük işletmemiz için yeni bir web sitesi oluşturacak deneyimli bir
+        geliştirici arıyoruz. Sitenin temiz bir tasarımı, bir iletişim formu ve
+        müşterilerin ürünlerimizi ve fiyatlarımızı görebileceği bir sayfası olmalı.
+        Ayrıca siteyi ödeme sistemimize bağlamanız ve cep telefonlarında iyi
+        çalıştığından emin olmanız gerekiyor. Lütfen bize önceki çalışmalarınızdan ve
+        projenin ne kadar süreceğinden bahsedin. Mümkün olan en kısa sürede başlamak
+        istiyoruz ve bu iş için sabit bir bütçemiz var. Gereksinimler hakkında
+        sorularınız varsa bana bir mesaj gönderin, cevaplayacağım. Doğru kişi açık
+        bir şekilde iletişim kurmalı, talimatlara uymalı ve işi zamanında teslim
+        etmelidir. Bu daha büyük bir projenin ilk bölümü, bu yüzden gelecekte daha
+        fazla iş olabilir.
+    """,
+    "indonesian": """
+        Kami sedang mencari pengembang yang berpengalaman untuk membuat situs web
+        baru untuk usaha kecil kami. Situs ini harus memiliki desain yang bersih,
+        formulir kontak dan halaman di mana pelanggan dapat melihat produk dan harga
+        kami. Anda juga perlu menghubungkannya dengan sistem pembayaran kami dan
+        memastikan bahwa situs tersebut berjalan dengan baik di ponsel. Tolong
+        ceritakan kepada kami tentang pekerjaan Anda sebelumnya dan berapa lama
+        proyek ini akan selesai. Kami ingin mulai secepat mungkin dan kami memiliki
+        anggaran tetap untuk pekerjaan ini. Jika Anda memiliki pertanyaan tentang
+        persyaratan, kirimkan pesan kepada saya dan saya akan menjawabnya. Orang yang
+        tepat harus dapat berkomunikasi dengan jelas, mengikuti petunjuk dan
+        menyelesaikan pekerjaan tepat waktu.
+    """,
+    "romanian": """
+        Căutăm un dezvoltator cu experiență care să creeze un site web nou pentru
+        mica noastră afacere. Site-ul trebuie să aibă un design curat, un formular de
+        contact și o pagină unde clienții pot vedea produsele și prețurile noastre.
+        De asemenea, va trebui să îl conectezi la sistemul nostru de plată și să te
+        asiguri că funcționează bine pe telefoanele mobile. Te rugăm să ne spui despre
+        lucrările tale anterioare și cât timp va dura proiectul. Vrem să începem cât
+        mai curând posibil și avem un buget fix pentru această lucrare. Dacă ai
+        întrebări despre cerințe, trimite-mi un mesaj și îți voi răspunde. Persoana
+        potrivită trebuie să comunice clar, să urmeze instrucțiunile și să livreze
+        lucrarea la timp. Aceasta este prima parte a unui proiect mai mare.
+    """,
+}
+
+# Scripts that identify a single language on their own. Ranges are
+# (first, last) code points; checked in order, first match wins.
+SCRIPT_LANGUAGES = [
+    ("greek", [(0x0370, 0x03FF)]),
+    ("hebrew", [(0x0590, 0x05FF)]),
+    ("hindi", [(0x0900, 0x097F)]),
+    ("bengali", [(0x0980, 0x09FF)]),
+    ("punjabi", [(0x0A00, 0x0A7F)]),
+    ("gujarati", [(0x0A80, 0x0AFF)]),
+    ("tamil", [(0x0B80, 0x0BFF)]),
+    ("telugu", [(0x0C00, 0x0C7F)]),
+    ("thai", [(0x0E00, 0x0E7F)]),
+    ("georgian", [(0x10A0, 0x10FF)]),
+    ("korean", [(0xAC00, 0xD7AF), (0x1100, 0x11FF)]),
+    ("japanese", [(0x3040, 0x30FF)]),
+    ("chinese", [(0x4E00, 0x9FFF)]),
+]
+
+# Scripts shared by several languages, told apart by characters that only
+# some of them use. The first entry whose marker characters appear wins,
+# otherwise the script's default language is used.
+CYRILLIC = (0x0400, 0x04FF)
+CYRILLIC_MARKERS = [
+    ("ukrainian", "іїєґІЇЄҐ"),
+    ("serbian", "ђћџљњЂЋЏЉЊ"),
+]
+CYRILLIC_DEFAULT = "russian"
+
+ARABIC = (0x0600, 0x06FF)
+ARABIC_MARKERS = [
+    ("urdu", "ٹڈڑںے"),
+    ("persian", "پچژگ"),
+]
+ARABIC_DEFAULT = "arabic"
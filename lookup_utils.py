@@ -1,44 +1,40 @@
 """Utility functions for the freelancer bot."""
 
-import asyncio
-import config
-import json
-import os
+from project_store import ProjectStore
 
 PROJECTS_FILE = "lookup_projects.json"
+PROJECTS_LOG = "lookup_projects.jsonl"
+
+_store = None
+
+def lookup_get_store():
+    """Return the shared lookup store, migrating lookup_projects.json on first use."""
+    global _store
+    if _store is None:
+        _store = ProjectStore(PROJECTS_LOG, legacy_path=PROJECTS_FILE)
+    return _store
 
 def lookup_load_projects():
-    """Load projects from JSON file."""
-    if not os.path.exists(PROJECTS_FILE):
-        return []
-    with open(PROJECTS_FILE, "r") as f:
-        return json.load(f)
+    """Load all stored lookup entries."""
+    return lookup_get_store().values()
 
 def lookup_save_projects(projects):
-    """Save projects list back to JSON file."""
-    with open(PROJECTS_FILE, "w") as f:
-        json.dump(projects, f, indent=4)
+    """Replace the stored lookup entries with the given list."""
+    lookup_get_store().replace_all(projects)
 
 def lookup_add_project(project_id):
-    """Add a project to JSON store."""
-    projects = lookup_load_projects()
+    """Add a project to the lookup store."""
+    store = lookup_get_store()
     # Avoid duplicates
-    if any(p["id"] == project_id for p in projects):
+    if project_id in store:
         return False
-    projects.append({"id": project_id})
-    lookup_save_projects(projects)
+    store.put(project_id, {"id": project_id})
     return True
 
 def lookup_delete_project(project_id):
     """Delete a project by ID."""
-    projects = lookup_load_projects()
-    projects = [p for p in projects if p["id"] != project_id]
-    lookup_save_projects(projects)
+    lookup_get_store().delete(project_id)
 
 def lookup_get_project(project_id):
     """Retrieve a project by ID."""
-    projects = lookup_load_projects()
-    for p in projects:
-        if p["id"] == project_id:
-            return p
-    return None
\ No newline at end of file
+    return lookup_get_store().get(project_id)
@@ -2,16 +2,39 @@
 
 import asyncio
 import signal
-from telegram.ext import CommandHandler
-import config
-from freelancer_service import auto_function, semi_auto_function
-from bot_commands import start, start_auto, start_semi, stop, stop_auto, stop_semi, status
-from database import project_id_exists, store_project_keys
-from utils import interruptible_sleep, load_projects, save_projects, add_project, delete_project, get_project
-from ai_service import send_ai_request
-from freelancersdk.resources.projects import place_project_bid
-from freelancersdk.resources.projects.exceptions import ProjectsNotFoundException, BidNotPlacedException
-from telegram_service import send_auto_telegram_message, send_semi_auto_telegram_message, send_generated_proposal_message
+import time
+from startup_timing import step, mark, report
+
+# Grouped so the startup report shows what each part of the bot costs
+with step("import config"):
+    import config
+with step("import storage"):
+    from database import (
+        store_project_keys_async, track_followup_async, close_database,
+        PLACED, ALREADY_BID, NDA, ERROR, PROPOSAL_SENT, SEMI
+    )
+    from utils import interruptible_sleep, load_projects, save_projects, add_project, delete_project, get_project
+with step("import freelancer client"):
+    from freelancersdk.resources.projects.exceptions import ProjectsNotFoundException, BidNotPlacedException
+    from freelancer_client import place_project_bid_async, shutdown_executor
+with step("import telegram"):
+    from telegram.ext import CommandHandler
+    from bot_commands import start, start_auto, start_semi, stop, stop_auto, stop_semi, status
+    from telegram_service import send_auto_telegram_message, send_semi_auto_telegram_message, send_generated_proposal_message
+    from telegram_client import close_client
+    from telegram_outbox import flush_outbox, pending_count
+with step("import pipelines"):
+    from freelancer_service import auto_function, semi_auto_function, followup_function, stage_queue_depths, BIDS_PLACED, BIDS_REJECTED
+    from search_poller import search_poller, queue_depths
+    from proposal_cache import get_or_generate_proposal, evict
+    from proposal_prefetch import start_prefetch_workers, stop_prefetch_workers, pending_drafts
+    from poll_scheduler import get_schedulers
+    from provider_health import save_registry, get_health, OPEN
+    from metrics import gauge, render, CONTENT_TYPE
+    from tracing import start_trace, use_trace, span, finish_trace, recent_traces
+    from claims import release_all, held_count
+    from profiles import get_profiles, get_profile
+    from relevance import add_bid
 
 def handle_exit(signum, frame):
     """Handle exit signals."""
@@ -21,34 +44,76 @@ def handle_exit(signum, frame):
 signal.signal(signal.SIGINT, handle_exit)   # Ctrl+C
 signal.signal(signal.SIGTERM, handle_exit)  # kill command
 
+def _queue_depths():
+    depths = {("search_" + name,): size for name, size in queue_depths().items()}
+    depths.update({(name,): size for name, size in stage_queue_depths().items()})
+    depths[("prefetch",)] = pending_drafts()
+    depths[("telegram_outbox",)] = pending_count()
+    return depths
+
+def _seconds_since_last_poll():
+    now = time.time()
+    return {
+        (name,): now - scheduler.last_success
+        for name, scheduler in get_schedulers().items() if scheduler.last_success is not None
+    }
+
+def _provider_health(field):
+    def collect():
+        values = {}
+        for index, chat in enumerate(config.ai_chats):
+            health = get_health(index)
+            values[(chat["label"],)] = int(health.state == OPEN) if field == "open" else getattr(health, field)
+        return values
+    return collect
+
+gauge("bot_queue_depth", "Items waiting in each internal queue.", ("queue",), function=_queue_depths)
+gauge("freelancer_seconds_since_last_poll", "Seconds since each poller last succeeded.", ("poller",), function=_seconds_since_last_poll)
+gauge("ai_provider_success_rate", "Smoothed success rate of each AI provider.", ("provider",), function=_provider_health("success_rate"))
+gauge("ai_provider_latency_seconds", "Smoothed latency of each AI provider.", ("provider",), function=_provider_health("latency"))
+gauge("bot_project_claims", "Project claims held by this process.", function=held_count)
+gauge("ai_provider_breaker_open", "1 while an AI provider's circuit breaker is open.", ("provider",), function=_provider_health("open"))
+
 @config.quart_app.route("/")
 async def home():
     """Home route for the web server."""
     return "✅ Freelancer bot is running!"
 
+@config.quart_app.route("/metrics", methods=["GET"])
+async def metrics():
+    """Prometheus metrics."""
+    return render(), 200, {"Content-Type": CONTENT_TYPE}
+
+@config.quart_app.route("/debug/traces", methods=["GET"])
+async def debug_traces():
+    """Recent pipeline traces, newest first. Optional ?name= and ?limit=."""
+    limit = config.request.args.get("limit", 50, type=int)
+    name = config.request.args.get("name")
+    return {"traces": recent_traces(limit, name)}
+
 @config.quart_app.route("/gen_proposal", methods=["GET"])
 async def gen_proposal():
     """Generate Proposal"""
-    from freelancer_service import user_id
-
     project_id = config.request.args.get("project_id")  
+    profile = get_profile(config.request.args.get("profile"))
+    if profile is None:
+        return {"status": "error", "message": "unknown profile"}
     if project_id:
-        project = get_project(str(project_id))
+        project = get_project(profile.key(project_id))
         if project == None:
             return {"status": "null", "message": "project not found in storage"}
 
-        project_title = project['data']['title']
-        project_description = project['data']['description']
-        lang_prompt = config.description.format(text=project_description)
-        lang = await send_ai_request(lang_prompt, strict=False)
+        project_title = project['data'].title
+        project_description = project['data'].description
+        lang, proposal = await get_or_generate_proposal(project_id, project_title, project_description, profile)
         if lang == False:
             return {"status": "error", "message": "Failed to detect language"}
 
-        prompt = config.PROPOSAL_PROMPT_TEMPLATE.format(language=lang,title=project_title,description=project_description,proposal_yrs_exp=config.proposal_yrs_exp)
-        proposal = await send_ai_request(prompt)
         if proposal != False:
-            if await send_generated_proposal_message(proposal):
-                store_project_keys(project_id)
+            if await send_generated_proposal_message(proposal, profile):
+                await store_project_keys_async(project_id, outcome=PROPOSAL_SENT, source=SEMI, account=profile.account)
+                await track_followup_async(project_id, profile.account)
+                add_bid(profile, project['data'])
                 return {"status": "ok", "message": "proposal sent to telegram"}
             else:
                 return {"status": "error", "message": "failed to send proposal to telegram"}
@@ -59,48 +124,72 @@ async def gen_proposal():
 
 @config.quart_app.route("/place_bid", methods=["GET"])
 async def place_bid():
-    from freelancer_service import user_id
+    """Place a bid from a semi-auto alert, traced as "place_bid"."""
+    project_id = config.request.args.get("project_id")
+    profile = get_profile(config.request.args.get("profile"))
+    if profile is None:
+        return {"status": "error", "message": "unknown profile"}
+    trace = use_trace(start_trace("place_bid", project_id=project_id, profile=profile.name))
+    response = {"status": "error", "message": "unexpected error"}
+    try:
+        response = await _place_bid(project_id, profile)
+        return response
+    finally:
+        finish_trace(trace, status=response.get("status"))
 
-    project_id = config.request.args.get("project_id")  
+async def _place_bid(project_id, profile):
     if project_id:
-        project = get_project(str(project_id))
+        with span("store_lookup"):
+            project = get_project(profile.key(project_id))
         if project == None:
             return {"status": "null", "message": "project not found in storage"}
 
-        project_title = project['data']['title']
-        project_description = project['data']['description']
-        lang_prompt = config.description.format(text=project_description)
-        lang = await send_ai_request(lang_prompt, strict=False)
+        project_title = project['data'].title
+        project_description = project['data'].description
+        with span("proposal"):
+            lang, proposal = await get_or_generate_proposal(project_id, project_title, project_description, profile)
         if lang == False:
             return {"status": "error", "message": "Failed to detect language"}
 
-        prompt = config.PROPOSAL_PROMPT_TEMPLATE.format(language=lang,title=project_title,description=project_description,proposal_yrs_exp=config.proposal_yrs_exp)
-        proposal = await send_ai_request(prompt)
         if proposal != False:
             bid_data = {
                 'project_id': int(project_id),
-                'bidder_id': user_id,
+                'bidder_id': profile.user_id,
                 'amount': project['amount'],
-                'period': config.bid_period,
+                'period': profile.bid_period,
                 'milestone_percentage': 100,
                 'description': proposal,
             }
             
             try:
-                response = place_project_bid(session=config.session, **bid_data)
-                store_project_keys(project_id)
-                await send_auto_telegram_message(str(project_title), "proposal", proposal, project['data']['seo_url'])
+                if bid_data['bidder_id'] is None:
+                    bid_data['bidder_id'] = await profile.get_user_id()
+                with span("place_bid"):
+                    response = await place_project_bid_async(session=profile.session, **bid_data)
+                BIDS_PLACED.inc(source=SEMI)
+                with span("store_write"):
+                    await store_project_keys_async(project_id, outcome=PLACED, amount=project['amount'], currency=project['data'].currency_code, source=SEMI, account=profile.account)
+                    await track_followup_async(project_id, profile.account)
+                    evict(project_id, profile)
+                    add_bid(profile, project['data'])
+                with span("telegram"):
+                    await send_auto_telegram_message(str(project_title), "proposal", proposal, project['data'].seo_url, profile)
+            except asyncio.TimeoutError:
+                print(f"Placing bid on Project ID: {project_id} timed out")
+                BIDS_REJECTED.inc(source=SEMI, message="timeout")
+                return {"status": "error", "message": "bid request timed out"}
             except BidNotPlacedException as e:
+                BIDS_REJECTED.inc(source=SEMI, message=str(e))
                 if str(e) == "You have already bid on that project.":
-                    store_project_keys(str(project_id))
-
-                if str(e) == "You must sign the NDA before you can bid on this project.":
+                    await store_project_keys_async(str(project_id), outcome=ALREADY_BID, source=SEMI, account=profile.account)
+                    await track_followup_async(project_id, profile.account)
+                elif str(e) == "You must sign the NDA before you can bid on this project.":
                     proposal_data = {
                         'title': project_title,
                         'amount': project['amount'],
                     }
-                    await send_auto_telegram_message(proposal_data, "nda", proposal, project['data']['seo_url'])
-                    store_project_keys(str(project_id))
+                    await send_auto_telegram_message(proposal_data, "nda", proposal, project['data'].seo_url, profile)
+                    await store_project_keys_async(str(project_id), outcome=NDA, amount=project['amount'], currency=project['data'].currency_code, source=SEMI, account=profile.account)
                 else:
                     print('Server response: {}'.format(str(e)))
                     proposal_data = {
@@ -108,56 +197,72 @@ async def place_bid():
                         'amount': project['amount'],
                         'error_message': str(e)
                     }
-                    await send_auto_telegram_message(proposal_data, "error", proposal, project['data']['seo_url'] or "")
-                    store_project_keys(str(project_id))
+                    await send_auto_telegram_message(proposal_data, "error", proposal, project['data'].seo_url or "", profile)
+                    await store_project_keys_async(str(project_id), outcome=ERROR, amount=project['amount'], currency=project['data'].currency_code, source=SEMI, message=str(e), account=profile.account)
         else:
             print(f"Failed to generate proposal for Project ID: {project_id}")
             proposal = "N/A"
-            await send_auto_telegram_message(str(project_title), "gen_proposal", proposal, project['data']['seo_url'])
+            await send_auto_telegram_message(str(project_title), "gen_proposal", proposal, project['data'].seo_url, profile)
         return {"status": "ok", "project_id": project_id}
     return {"status": "error", "message": "missing project_id"}
 
 async def run_bot():
     """Run the bot with all services."""
-    # Add command handlers
-    config.application.add_handler(CommandHandler("start", start))
-    config.application.add_handler(CommandHandler("start_auto", start_auto))
-    config.application.add_handler(CommandHandler("start_semi", start_semi))
-    config.application.add_handler(CommandHandler("stop", stop))
-    config.application.add_handler(CommandHandler("stop_auto", stop_auto))
-    config.application.add_handler(CommandHandler("stop_semi", stop_semi))
-    config.application.add_handler(CommandHandler("status", status))
-    
-    # Initialize and start telegram bot
-    await config.application.initialize()
-    await config.application.start()
-    await config.application.updater.start_polling()
-
-    # Start web server
-    server = asyncio.create_task(
-        config.quart_app.run_task(
-            host="0.0.0.0",
-            port=5000,
-            debug=False,
-            shutdown_trigger=config.shutdown_event.wait
-        )
-    )
-    task_auto = asyncio.create_task(auto_function())
-    task_semi_auto = asyncio.create_task(semi_auto_function())
+    # Polling does not depend on the Telegram bot or the web server, so
+    # the pipelines start first and get back to work right after a restart
+    start_prefetch_workers()
+    task_poller = asyncio.create_task(search_poller())
+    pipeline_tasks = []
+    for profile in get_profiles():
+        pipeline_tasks.append(asyncio.create_task(auto_function(profile)))
+        pipeline_tasks.append(asyncio.create_task(semi_auto_function(profile)))
+        pipeline_tasks.append(asyncio.create_task(followup_function(profile)))
+    mark("pipelines started")
+    server = None
 
     try:
+        with step("init telegram bot"):
+            # Add command handlers
+            config.application.add_handler(CommandHandler("start", start))
+            config.application.add_handler(CommandHandler("start_auto", start_auto))
+            config.application.add_handler(CommandHandler("start_semi", start_semi))
+            config.application.add_handler(CommandHandler("stop", stop))
+            config.application.add_handler(CommandHandler("stop_auto", stop_auto))
+            config.application.add_handler(CommandHandler("stop_semi", stop_semi))
+            config.application.add_handler(CommandHandler("status", status))
+
+            # Initialize and start telegram bot
+            await config.application.initialize()
+            await config.application.start()
+            await config.application.updater.start_polling()
+
+        # Start web server
+        server = asyncio.create_task(
+            config.quart_app.run_task(
+                host="0.0.0.0",
+                port=5000,
+                debug=False,
+                shutdown_trigger=config.shutdown_event.wait
+            )
+        )
+        if config.startup_report:
+            print(report())
+
         await config.shutdown_event.wait()
     finally:
         print("🛑 Shutting down freelancer bot...")
-        task_auto.cancel()
-        task_semi_auto.cancel()
-        server.cancel()
-        try:
-            await task_auto
-            await task_semi_auto
-            await server
-        except asyncio.CancelledError:
-            pass
+        tasks = [task_poller] + pipeline_tasks + ([server] if server else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await stop_prefetch_workers()
+        # Let other processes take over the projects this one was working on
+        await release_all()
+        await flush_outbox(config.telegram_flush_timeout)
+        await close_client()
+        shutdown_executor()
+        close_database()
+        save_registry()
         print("✅ shutdown complete.")
 
 if __name__ == "__main__":
@@ -0,0 +1,168 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Metrics are created once at import time of the module that updates them
+(``counter()``, ``gauge()`` and ``histogram()`` return the already
+registered metric when called again with the same name) and rendered by
+the ``/metrics`` route with render(). Gauges can also be computed at
+render time from a callback, e.g. for queue depths.
+"""
+
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers fast Telegram sends up to slow AI providers
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def values(self):
+        """Current values by label value tuple."""
+        with self._lock:
+            return dict(self._values)
+
+    def _samples(self):
+        with self._lock:
+            return [(self.name, key, None, value) for key, value in self._values.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, key, extra, value in self._samples():
+            lines.append(f"{name}{_format_labels(self.labels, key, extra)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonic count, e.g. of polls or bids."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down.
+
+    With ``function`` the value is computed at render time: the callback
+    returns a number, or for labelled gauges a dict of label value tuples
+    to numbers.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help, labels=(), function=None):
+        super().__init__(name, help, labels)
+        self.function = function
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self):
+        if self.function is None:
+            return super()._samples()
+        values = self.function()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [
+            (self.name, tuple(str(value) for value in key), None, value)
+            for key, value in values.items() if value is not None
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values, e.g. latencies in seconds."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                for bound, bucket_count in zip(self.buckets, counts):
+                    extra = f'le="{_format_value(float(bound))}"'
+                    samples.append((self.name + "_bucket", key, extra, bucket_count))
+                samples.append((self.name + "_sum", key, None, total))
+                samples.append((self.name + "_count", key, None, count))
+        return samples
+
+
+def _register(cls, name, *args, **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"{name} is already registered as a {metric.kind}")
+        return metric
+
+def counter(name, help, labels=()):
+    """Return the counter ``name``, registering it on first use."""
+    return _register(Counter, name, help, labels)
+
+def gauge(name, help, labels=(), function=None):
+    """Return the gauge ``name``, registering it on first use."""
+    return _register(Gauge, name, help, labels, function)
+
+def histogram(name, help, labels=(), buckets=DEFAULT_BUCKETS):
+    """Return the histogram ``name``, registering it on first use."""
+    return _register(Histogram, name, help, labels, buckets)
+
+def render():
+    """Render every registered metric in the Prometheus text format."""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    return "\n".join(metric.render() for metric in metrics) + "\n"
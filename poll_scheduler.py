@@ -0,0 +1,158 @@
+"""Adaptive cadence for the Freelancer API pollers.
+
+All pollers draw from one token bucket sized to the account's API quota
+(``config.api_requests_per_hour``, bursts up to ``config.api_burst``). On
+top of that each poller has its own interval:
+
+- it shrinks by ``config.poll_speedup`` after a poll that found new
+  projects and grows by ``config.poll_slowdown`` after one that did not,
+  staying between the poller's min and max interval;
+- a rate-limit error doubles the interval, empties the bucket and lowers
+  the bucket's refill rate, which then recovers slowly on successful polls.
+"""
+
+import asyncio
+import time
+import config
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens per second."""
+
+    def __init__(self, rate_per_hour, capacity):
+        self.max_rate = rate_per_hour / 3600.0
+        self.rate = self.max_rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self):
+        """Take a token if one is available."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def charge(self):
+        """Take a token even if none is free, e.g. for extra search pages.
+
+        The debt delays the next poll instead of blocking this one.
+        """
+        self._refill()
+        self.tokens -= 1
+
+    def wait_time(self):
+        """Seconds until a token is available."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def throttle(self):
+        """React to a rate-limit error: drain the bucket and slow the refill."""
+        self.tokens = 0.0
+        self.rate = max(self.max_rate * config.api_min_rate_fraction, self.rate / 2)
+
+    def recover(self):
+        """Creep the refill rate back towards the configured quota."""
+        self.rate = min(self.max_rate, self.rate * config.api_rate_recovery)
+
+
+class PollScheduler:
+    """Adaptive interval for one poller, backed by the shared token bucket."""
+
+    def __init__(self, name, interval, min_interval, max_interval, bucket):
+        self.name = name
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.bucket = bucket
+        self.last_poll = 0.0
+        self.last_success = None
+
+    def _clamp(self, interval):
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def _next_poll_in(self):
+        due = self.last_poll + self.interval - time.monotonic()
+        return max(due, self.bucket.wait_time(), 0.0)
+
+    async def wait(self):
+        """Sleep until the next poll is due and a token is free, then take it.
+
+        Raises KeyboardInterrupt if shutdown is requested while waiting.
+        """
+        while True:
+            if config.shutdown_flag:
+                raise KeyboardInterrupt("Shutdown requested")
+            delay = self._next_poll_in()
+            if delay <= 0 and self.bucket.try_take():
+                self.last_poll = time.monotonic()
+                return
+            await asyncio.sleep(min(max(delay, 0.05), 1))
+
+    def record_poll(self, new_items=None):
+        """Adapt the interval after a successful poll.
+
+        Args:
+            new_items (int): Number of new projects found, or None for
+                pollers whose interval should not follow the arrival rate.
+        """
+        self.last_success = time.time()
+        self.bucket.recover()
+        if new_items is None:
+            return
+        if new_items > 0:
+            self.interval = self._clamp(self.interval * config.poll_speedup)
+        else:
+            self.interval = self._clamp(self.interval * config.poll_slowdown)
+
+    def record_rate_limited(self):
+        """Back off after a rate-limit error."""
+        self.interval = self._clamp(self.interval * 2)
+        self.bucket.throttle()
+        print(f"⏳ {self.name} rate limited, next poll in {round(self.interval)}s")
+
+
+_bucket = None
+_schedulers = {}
+
+def get_bucket():
+    """The token bucket shared by every Freelancer API poller."""
+    global _bucket
+    if _bucket is None:
+        _bucket = TokenBucket(config.api_requests_per_hour, config.api_burst)
+    return _bucket
+
+def get_scheduler(name, interval, min_interval, max_interval):
+    """Return the scheduler for poller ``name``, creating it on first use."""
+    if name not in _schedulers:
+        _schedulers[name] = PollScheduler(name, interval, min_interval, max_interval, get_bucket())
+    return _schedulers[name]
+
+def get_schedulers():
+    """Return the schedulers created so far, by poller name."""
+    return dict(_schedulers)
+
+def search_scheduler():
+    return get_scheduler(
+        "search",
+        config.sleep_time * 3600,
+        config.search_min_interval,
+        config.search_max_interval,
+    )
+
+def followup_scheduler(name="followup"):
+    """Follow-up cadence; each profile passes its own ``name``."""
+    return get_scheduler(
+        name,
+        config.sleep_time_semi * 3600,
+        config.sleep_time_semi * 3600,
+        config.followup_max_interval,
+    )
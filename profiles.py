@@ -0,0 +1,116 @@
+"""Freelancer accounts the bot works for.
+
+The default profile is the account configured at the top of config.py and
+.env; ``config.profiles`` adds more. Each profile has its own session, user
+id, Telegram chat, job filters and pricing, and runs its own auto and
+semi-auto pipelines. The project search, the AI providers and the API
+budget are shared by all profiles.
+
+A profile setting not given in its ``config.profiles`` entry falls back to
+the global value in config, read at the time it is used. The default
+profile keeps the names used before profiles existed: its pipelines are
+"auto" and "semi_auto", its store keys are bare project ids and its ledger
+account is "".
+"""
+
+import os
+import config
+from freelancer_client import get_self_async
+
+# Settings a config.profiles entry can override
+PROFILE_SETTINGS = (
+    "auto_jobs", "semi_auto_jobs", "project_number", "project_number_semi_auto",
+    "look_back_hours", "bid_avg_percent", "min_budget", "only_fixed", "bid_period",
+    "proposal_yrs_exp", "relevance_threshold", "relevance_keywords",
+)
+
+DEFAULT = "default"
+
+_profiles = None
+
+
+class Profile:
+    """One Freelancer account and its settings."""
+
+    def __init__(self, name, token=None, chat_id=None, settings=None):
+        self.name = name
+        self.is_default = name == DEFAULT
+        self.account = "" if self.is_default else name
+        self.token = token
+        self._chat_id = chat_id
+        self.settings = settings or {}
+        self.user_id = None
+        self._session = None
+
+    def __getattr__(self, name):
+        # Only called for attributes not set in __init__
+        if name in PROFILE_SETTINGS:
+            return self.settings.get(name, getattr(config, name))
+        raise AttributeError(f"Profile has no attribute {name!r}")
+
+    @property
+    def session(self):
+        if self.is_default:
+            return config.session
+        if self._session is None:
+            from freelancersdk.session import Session
+            self._session = Session(oauth_token=self.token, url=config.base_url)
+        return self._session
+
+    @property
+    def chat_id(self):
+        return self._chat_id or config.telegram_chatid
+
+    def pipeline(self, name):
+        """Name of this profile's pipeline ``name`` ("auto" or "semi_auto")."""
+        return name if self.is_default else f"{self.name}:{name}"
+
+    def key(self, project_id):
+        """Key of a project in the per-profile JSON stores and caches."""
+        return str(project_id) if self.is_default else f"{self.name}:{project_id}"
+
+    def query(self):
+        """Query string suffix that selects this profile in web API links."""
+        return "" if self.is_default else f"&profile={self.name}"
+
+    async def get_user_id(self):
+        """The account's user id, fetched once with get_self."""
+        if self.user_id is None:
+            response = await get_self_async(session=self.session)
+            self.user_id = response.get("id")
+        return self.user_id
+
+    def __repr__(self):
+        return f"Profile({self.name!r})"
+
+
+def _load():
+    profiles = {DEFAULT: Profile(DEFAULT)}
+    for entry in config.profiles:
+        entry = dict(entry)
+        name = entry.pop("name")
+        if name in profiles:
+            raise ValueError(f"Duplicate profile name {name!r}")
+        token = os.getenv(entry.pop("token_env"))
+        chat_id_env = entry.pop("chat_id_env", None)
+        chat_id = os.getenv(chat_id_env) if chat_id_env else None
+        unknown = set(entry) - set(PROFILE_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown setting(s) in profile {name!r}: {', '.join(sorted(unknown))}")
+        profiles[name] = Profile(name, token=token, chat_id=chat_id, settings=entry)
+    return profiles
+
+def get_profiles():
+    """Every profile, the default one first."""
+    global _profiles
+    if _profiles is None:
+        _profiles = _load()
+    return list(_profiles.values())
+
+def get_profile(name=None):
+    """The profile called ``name``; the default profile for None or ""."""
+    get_profiles()
+    return _profiles.get(name or DEFAULT)
+
+def default_profile():
+    return get_profile(DEFAULT)
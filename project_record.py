@@ -0,0 +1,106 @@
+"""Compact record of a project, shared by the pipelines, alerts and store.
+
+ProjectRecord keeps the fields the bot uses in slots: raw epoch timestamps
+and numeric budgets straight from the API, no ISO strings. In the project
+store a record is a positional JSON array (to_row()/from_row()) without the
+description, which is by far its largest field; the description lives in
+its own store and a record read back from the project store loads it on
+first access.
+"""
+
+from datetime import datetime, timezone
+
+# Order of the values in a stored row. New fields go at the end, so older
+# rows still load (missing trailing values read as None).
+FIELDS = (
+    "id", "title", "status", "type", "owner_id", "seo_url",
+    "currency_code", "currency_exchange_rate", "budget_min", "budget_max",
+    "bid_count", "bid_avg", "urgent", "nonpublic",
+    "submitdate", "time_submitted", "time_updated",
+)
+
+_NOT_LOADED = object()
+
+
+class ProjectRecord:
+    """One project, as triaged, alerted on and stored."""
+
+    __slots__ = FIELDS + ("_description",)
+
+    def __init__(self, description=_NOT_LOADED, **fields):
+        for name in FIELDS:
+            setattr(self, name, fields.get(name))
+        self._description = description
+
+    @classmethod
+    def from_api(cls, project):
+        """Build a record from a project returned by the search or projects API."""
+        currency = project.get("currency") or {}
+        budget = project.get("budget") or {}
+        bid_stats = project.get("bid_stats") or {}
+        return cls(
+            id=project.get("id"),
+            title=project.get("title"),
+            status=project.get("status"),
+            type=project.get("type"),
+            owner_id=project.get("owner_id", 0),
+            seo_url=project.get("seo_url"),
+            currency_code=currency.get("code"),
+            currency_exchange_rate=currency.get("exchange_rate"),
+            budget_min=budget.get("minimum"),
+            budget_max=budget.get("maximum"),
+            bid_count=bid_stats.get("bid_count"),
+            bid_avg=bid_stats.get("bid_avg"),
+            urgent=project.get("urgent"),
+            nonpublic=project.get("nonpublic"),
+            submitdate=project.get("submitdate", 0),
+            time_submitted=project.get("time_submitted", 0),
+            time_updated=project.get("time_updated", 0),
+            description=project.get("description"),
+        )
+
+    @classmethod
+    def from_row(cls, row):
+        """Rebuild a stored record; the description is loaded when first read."""
+        return cls(**dict(zip(FIELDS, row)))
+
+    @classmethod
+    def from_legacy(cls, data):
+        """Rebuild a record stored as the old 17-key dict with ISO timestamps."""
+        fields = {name: data.get(name) for name in FIELDS}
+        fields["submitdate"] = _epoch(data.get("submit_date"))
+        fields["time_submitted"] = _epoch(data.get("time_submitted"))
+        fields["time_updated"] = _epoch(data.get("time_updated"))
+        return cls(description=data.get("description"), **fields)
+
+    def to_row(self):
+        """Positional values for the project store, without the description."""
+        return [getattr(self, name) for name in FIELDS]
+
+    @property
+    def description(self):
+        if self._description is _NOT_LOADED:
+            from utils import get_description
+            self._description = get_description(self.id)
+        return self._description
+
+    @description.setter
+    def description(self, value):
+        self._description = value
+
+    @property
+    def submit_date(self):
+        """Submission time as an ISO 8601 string, for display."""
+        return datetime.fromtimestamp(self.submitdate or 0, tz=timezone.utc).isoformat()
+
+    def __repr__(self):
+        return f"ProjectRecord(id={self.id!r}, title={self.title!r})"
+
+
+def _epoch(value):
+    if not value:
+        return 0
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except (TypeError, ValueError):
+        return 0
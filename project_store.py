@@ -0,0 +1,188 @@
+"""Append-only keyed record store used for the JSON project files."""
+
+import json
+import os
+import threading
+
+
+class ProjectStore:
+    """Keyed store backed by an append-only JSON lines log.
+
+    Every write appends one line: either a record ``{"id": ..., ...}`` or a
+    tombstone ``{"id": ..., "deleted": true}``. An in-memory index maps each
+    id to the byte offset of its latest line, so lookups are a dict hit plus
+    one seek, and writes never rewrite the file. The log is compacted once
+    dead lines outnumber live ones by ``compact_ratio``.
+
+    A record's key is its ``"id"``: compaction and reloading index lines by
+    it, so ``put`` refuses a record stored under any other key.
+    """
+
+    def __init__(self, path, legacy_path=None, compact_ratio=2.0, compact_min=1000):
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        self._lock = threading.RLock()
+        self._index = {}
+        self._dead = 0
+        if legacy_path:
+            self._migrate(legacy_path)
+        self._file = open(self.path, "a+b")
+        self._load_index()
+
+    def _migrate(self, legacy_path):
+        """One-time import of a legacy JSON list file into the log."""
+        if os.path.exists(self.path) or not os.path.exists(legacy_path):
+            return
+        with open(legacy_path, "r") as f:
+            try:
+                records = json.load(f)
+            except ValueError:
+                records = []
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for record in records:
+                f.write(self._encode(record))
+        os.replace(tmp_path, self.path)
+        os.replace(legacy_path, legacy_path + ".migrated")
+        print(f"Migrated {len(records)} record(s) from {legacy_path} to {self.path}")
+
+    @staticmethod
+    def _encode(record):
+        return (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+
+    def _load_index(self):
+        """Scan the log once to rebuild the id -> offset index."""
+        self._file.seek(0)
+        offset = 0
+        for line in self._file:
+            length = len(line)
+            if not line.endswith(b"\n"):
+                # Torn write from a crash, drop the partial line
+                self._file.truncate(offset)
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                offset += length
+                self._dead += 1
+                continue
+            key = str(record.get("id"))
+            if key in self._index:
+                self._dead += 1
+            if record.get("deleted"):
+                self._index.pop(key, None)
+                self._dead += 1
+            else:
+                self._index[key] = offset
+            offset += length
+
+    def _append(self, record):
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(self._encode(record))
+        self._file.flush()
+        return offset
+
+    @staticmethod
+    def _checked_key(key, record):
+        key = str(key)
+        if str(record.get("id")) != key:
+            raise ValueError(f"Record id {record.get('id')!r} does not match its key {key!r}")
+        return key
+
+    def _read_at(self, offset):
+        self._file.seek(offset)
+        return json.loads(self._file.readline())
+
+    def __contains__(self, key):
+        return str(key) in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def get(self, key):
+        """Return the record stored under ``key`` or None."""
+        with self._lock:
+            offset = self._index.get(str(key))
+            if offset is None:
+                return None
+            return self._read_at(offset)
+
+    def put(self, key, record):
+        """Insert or replace the record stored under ``key``, which must be its id."""
+        key = self._checked_key(key, record)
+        with self._lock:
+            if key in self._index:
+                self._dead += 1
+            self._index[key] = self._append(record)
+            self._maybe_compact()
+
+    def put_many(self, records):
+        """Insert or replace several ``(key, record)`` pairs with a single write."""
+        records = [(self._checked_key(key, record), record) for key, record in records]
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            chunks = []
+            for key, record in records:
+                if key in self._index:
+                    self._dead += 1
+                line = self._encode(record)
+                self._index[key] = offset
+                offset += len(line)
+                chunks.append(line)
+            self._file.write(b"".join(chunks))
+            self._file.flush()
+            self._maybe_compact()
+
+    def delete(self, key):
+        """Remove ``key`` from the store. Returns False if it was missing."""
+        key = str(key)
+        with self._lock:
+            if key not in self._index:
+                return False
+            self._append({"id": key, "deleted": True})
+            del self._index[key]
+            self._dead += 2
+            self._maybe_compact()
+            return True
+
+    def values(self):
+        """Return every live record in insertion order."""
+        with self._lock:
+            return [self._read_at(offset) for offset in sorted(self._index.values())]
+
+    def replace_all(self, records):
+        """Replace the whole store with ``records``."""
+        with self._lock:
+            self._rewrite(records)
+
+    def _maybe_compact(self):
+        if self._dead >= self.compact_min and self._dead > len(self._index) * self.compact_ratio:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the log keeping only the latest version of each live record."""
+        with self._lock:
+            self._rewrite(self.values())
+
+    def _rewrite(self, records):
+        tmp_path = self.path + ".tmp"
+        index = {}
+        with open(tmp_path, "wb") as f:
+            for record in records:
+                key = str(record.get("id"))
+                if key in index:
+                    continue
+                index[key] = f.tell()
+                f.write(self._encode(record))
+        self._file.close()
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "a+b")
+        self._index = index
+        self._dead = 0
+
+    def close(self):
+        with self._lock:
+            self._file.close()
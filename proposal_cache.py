@@ -0,0 +1,109 @@
+"""Persistent cache of generated proposals.
+
+Entries are keyed by project id and profile (profiles.Profile.key), since
+each account's prompt differs, and validated against a hash of the
+description, so an edited description is regenerated. Entries older than
+``config.proposal_cache_ttl`` seconds are evicted. Concurrent requests for
+the same project share one generation instead of each calling the LLM.
+"""
+
+import asyncio
+import hashlib
+import time
+import config
+from project_store import ProjectStore
+from ai_service import send_ai_request, detect_language
+from tracing import span
+from profiles import default_profile
+
+CACHE_FILE = "proposal_cache.jsonl"
+
+_store = None
+_in_flight = {}
+_last_prune = 0.0
+
+def get_store():
+    """Return the shared cache store."""
+    global _store
+    if _store is None:
+        _store = ProjectStore(CACHE_FILE)
+    return _store
+
+def description_hash(description):
+    return hashlib.sha1((description or "").encode("utf-8")).hexdigest()
+
+def _key(project_id, profile):
+    return (profile or default_profile()).key(project_id)
+
+def get_cached(project_id, description, profile=None):
+    """Return the cached entry for a project, or None if missing, stale or expired."""
+    key = _key(project_id, profile)
+    entry = get_store().get(key)
+    if entry is None:
+        return None
+    if entry["hash"] != description_hash(description) or time.time() - entry["created_at"] > config.proposal_cache_ttl:
+        get_store().delete(key)
+        return None
+    return entry
+
+def put_cached(project_id, description, language, proposal, profile=None):
+    """Store a generated proposal."""
+    key = _key(project_id, profile)
+    get_store().put(key, {
+        "id": key,
+        "hash": description_hash(description),
+        "language": language,
+        "proposal": proposal,
+        "created_at": time.time(),
+    })
+    prune_expired()
+
+def evict(project_id, profile=None):
+    """Drop a project's cached proposal, e.g. once the bid is placed."""
+    get_store().delete(_key(project_id, profile))
+
+def prune_expired(force=False):
+    """Remove expired entries, at most once per ``config.proposal_cache_prune_interval``."""
+    global _last_prune
+    now = time.time()
+    if not force and now - _last_prune < config.proposal_cache_prune_interval:
+        return
+    _last_prune = now
+    store = get_store()
+    for entry in store.values():
+        if now - entry["created_at"] > config.proposal_cache_ttl:
+            store.delete(entry["id"])
+
+async def _generate(project_id, title, description, profile):
+    with span("detect_language"):
+        lang = await detect_language(description)
+    if lang == False:
+        return False, False
+
+    prompt = config.PROPOSAL_PROMPT_TEMPLATE.format(language=lang,title=title,description=description,proposal_yrs_exp=profile.proposal_yrs_exp)
+    with span("generate"):
+        proposal = await send_ai_request(prompt)
+    if proposal != False:
+        with span("cache_write"):
+            put_cached(project_id, description, lang, proposal, profile)
+    return lang, proposal
+
+async def get_or_generate_proposal(project_id, title, description, profile=None):
+    """Return (language, proposal) for a project, generating it if not cached.
+
+    Either value is False if that step failed. A generation already running
+    for the same project and profile is awaited rather than started again.
+    """
+    profile = profile or default_profile()
+    project_id = str(project_id)
+    entry = get_cached(project_id, description, profile)
+    if entry is not None:
+        return entry["language"], entry["proposal"]
+
+    key = profile.key(project_id)
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_generate(project_id, title, description, profile))
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    return await asyncio.shield(task)
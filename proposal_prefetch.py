@@ -0,0 +1,87 @@
+"""Background drafting of proposals for projects sent as semi-auto alerts.
+
+When an alert goes out, the project is queued here and a small pool of
+workers generates its proposal into the proposal cache, so the "Place bid"
+and "Generate Proposal" buttons find a draft ready. The queue is bounded:
+when ``config.prefetch_max_pending`` drafts are waiting, new ones are
+dropped and will be generated on click instead. The pipelines watch each
+drafted project (database.track_drafts_async), and the follow-up check
+discards its draft once it is awarded or closed.
+"""
+
+import asyncio
+import time
+import config
+from proposal_cache import get_cached, get_or_generate_proposal, evict
+from profiles import default_profile
+
+_queue = None
+_queued = set()
+_workers = []
+
+def _get_queue():
+    global _queue
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=config.prefetch_max_pending)
+    return _queue
+
+def schedule_draft(project, profile=None):
+    """Queue a draft for an alerted ProjectRecord. Returns False if it was not queued."""
+    if not config.prefetch_workers:
+        return False
+    profile = profile or default_profile()
+    project_id = str(project.id)
+    key = profile.key(project_id)
+    if key in _queued or get_cached(project_id, project.description, profile) is not None:
+        return False
+    try:
+        _get_queue().put_nowait((project_id, profile, project.title, project.description, time.time()))
+    except asyncio.QueueFull:
+        print(f"Draft queue full, Project ID: {project_id} will be generated on demand")
+        return False
+    _queued.add(key)
+    return True
+
+def pending_drafts():
+    """Number of drafts waiting for a worker."""
+    return _queue.qsize() if _queue is not None else 0
+
+def discard_draft(project_id, profile=None):
+    """Forget a project's draft, e.g. once it is awarded or closed."""
+    profile = profile or default_profile()
+    _queued.discard(profile.key(project_id))
+    evict(project_id, profile)
+
+async def _worker():
+    queue = _get_queue()
+    while True:
+        project_id, profile, title, description, queued_at = await queue.get()
+        key = profile.key(project_id)
+        try:
+            if key not in _queued:
+                continue
+            if time.time() - queued_at > config.prefetch_max_age:
+                continue
+            lang, proposal = await get_or_generate_proposal(project_id, title, description, profile)
+            if proposal == False:
+                print(f"Failed to draft proposal for Project ID: {project_id}")
+            elif key not in _queued:
+                # Discarded while it was being generated
+                evict(project_id, profile)
+        except Exception as e:
+            print(f"Error drafting proposal for Project ID: {project_id}: {e}")
+        finally:
+            _queued.discard(key)
+            queue.task_done()
+
+def start_prefetch_workers():
+    """Start ``config.prefetch_workers`` draft workers."""
+    for _ in range(config.prefetch_workers):
+        _workers.append(asyncio.create_task(_worker()))
+
+async def stop_prefetch_workers():
+    """Cancel the draft workers."""
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
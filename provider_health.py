@@ -0,0 +1,189 @@
+"""Health registry and circuit breakers for the AI providers in config.ai_chats.
+
+Each provider entry, keyed by its label, keeps exponentially weighted
+moving averages of latency, success rate and validation-failure rate plus
+a circuit breaker:
+
+- closed: the provider is used normally.
+- open: after ``config.ai_breaker_failures`` consecutive failures the
+  provider is skipped for ``config.ai_breaker_cooldown`` seconds.
+- half-open: after the cooldown a single probe request is let through.
+  Success closes the breaker again, failure re-opens it.
+
+The registry is saved to ``config.ai_health_file`` so a restart keeps what
+was learned.
+"""
+
+import json
+import os
+import time
+import config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ProviderHealth:
+    """Moving averages and breaker state for one provider."""
+
+    __slots__ = ("label", "latency", "success_rate", "invalid_rate", "calls",
+                 "consecutive_failures", "state", "opened_at", "probing")
+
+    def __init__(self, label):
+        self.label = label
+        self.latency = None
+        self.success_rate = 1.0
+        self.invalid_rate = 0.0
+        self.calls = 0
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+
+    def to_dict(self):
+        return {
+            "latency": self.latency,
+            "success_rate": self.success_rate,
+            "invalid_rate": self.invalid_rate,
+            "calls": self.calls,
+            "consecutive_failures": self.consecutive_failures,
+            "state": self.state,
+            "opened_at": self.opened_at,
+        }
+
+    @classmethod
+    def from_dict(cls, label, data):
+        health = cls(label)
+        for key, value in data.items():
+            if key in cls.__slots__ and key != "probing":
+                setattr(health, key, value)
+        # A probe in flight when we stopped never finished
+        if health.state == HALF_OPEN:
+            health.state = OPEN
+        return health
+
+    def available(self, now):
+        """True if a request may be sent to this provider right now."""
+        if self.state == OPEN and now - self.opened_at >= config.ai_breaker_cooldown:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            return not self.probing
+        return self.state == CLOSED
+
+    def score(self):
+        """Expected seconds per useful response; lower is better.
+
+        Providers without a latency sample score 0 so they get measured.
+        """
+        if self.latency is None:
+            return 0.0
+        return self.latency / max(self.success_rate, 0.05)
+
+
+_registry = {}
+_last_save = 0.0
+
+def _ewma(previous, sample):
+    alpha = config.ai_health_alpha
+    if previous is None:
+        return sample
+    return alpha * sample + (1 - alpha) * previous
+
+def load_registry():
+    """Load saved health data for the providers currently configured."""
+    _registry.clear()
+    saved = {}
+    if os.path.exists(config.ai_health_file):
+        try:
+            with open(config.ai_health_file, "r") as f:
+                saved = json.load(f)
+        except ValueError:
+            print(f"⚠️ Ignoring unreadable {config.ai_health_file}")
+    for chat in config.ai_chats:
+        label = chat["label"]
+        if label in saved:
+            _registry[label] = ProviderHealth.from_dict(label, saved[label])
+        else:
+            _registry[label] = ProviderHealth(label)
+
+def save_registry():
+    """Write the registry to disk."""
+    global _last_save
+    if not _registry:
+        return
+    tmp_path = config.ai_health_file + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({label: h.to_dict() for label, h in _registry.items()}, f, indent=4)
+    os.replace(tmp_path, config.ai_health_file)
+    _last_save = time.monotonic()
+
+def _maybe_save():
+    if time.monotonic() - _last_save >= config.ai_health_save_interval:
+        save_registry()
+
+def get_health(index):
+    """Return the health entry for provider ``index`` of config.ai_chats."""
+    if not _registry:
+        load_registry()
+    label = config.ai_chats[index]["label"]
+    if label not in _registry:
+        _registry[label] = ProviderHealth(label)
+    return _registry[label]
+
+def ranked_providers():
+    """Indexes of usable providers, fastest expected response first.
+
+    If every breaker is open, the providers are returned in the order their
+    breakers opened so requests still have something to try.
+    """
+    now = time.time()
+    healths = [(index, get_health(index)) for index in range(len(config.ai_chats))]
+    usable = [(h.score(), index) for index, h in healths if h.available(now)]
+    if usable:
+        return [index for _, index in sorted(usable)]
+    return [index for index, h in sorted(healths, key=lambda item: item[1].opened_at)]
+
+def begin_request(index):
+    """Mark a request as started; half-open providers allow one at a time."""
+    health = get_health(index)
+    if health.state == HALF_OPEN:
+        health.probing = True
+
+def record_result(index, latency, outcome):
+    """Record the outcome of one provider call.
+
+    Args:
+        index (int): Provider index in config.ai_chats.
+        latency (float): Seconds the call took.
+        outcome (str): "success", "invalid" (response failed validation),
+            "error" (exception or timeout) or "cancelled" (lost a hedged race).
+    """
+    health = get_health(index)
+    if outcome == "cancelled":
+        # Only a lower bound on latency, and not a failure
+        health.probing = False
+        if health.latency is None or latency > health.latency:
+            health.latency = _ewma(health.latency, latency)
+        return
+
+    success = outcome == "success"
+    health.calls += 1
+    health.latency = _ewma(health.latency, latency)
+    health.success_rate = _ewma(health.success_rate, 1.0 if success else 0.0)
+    health.invalid_rate = _ewma(health.invalid_rate, 1.0 if outcome == "invalid" else 0.0)
+    health.probing = False
+
+    if success:
+        health.consecutive_failures = 0
+        if health.state != CLOSED:
+            print(f"✅ AI provider {health.label} recovered")
+        health.state = CLOSED
+    else:
+        health.consecutive_failures += 1
+        if health.state == HALF_OPEN or health.consecutive_failures >= config.ai_breaker_failures:
+            if health.state != OPEN:
+                print(f"⚠️ AI provider {health.label} circuit opened after {health.consecutive_failures} failure(s)")
+            health.state = OPEN
+            health.opened_at = time.time()
+    _maybe_save()
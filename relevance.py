@@ -0,0 +1,251 @@
+"""Local relevance scoring of projects, before any proposal is generated.
+
+Every profile has a TF-IDF index of the projects it bid on and of the
+keyword lists in its ``relevance_keywords`` setting. A project's score is
+the cosine similarity of its title and description to that index, between
+0 and 1: the best match among the keyword lists, or the mean of the
+``config.relevance_top_k`` most similar past bids if that is higher. Won
+projects count ``config.relevance_won_boost`` times as much. Triage skips
+projects scoring below the profile's ``relevance_threshold`` (see
+triage.LOW_RELEVANCE), so they never reach the AI providers.
+
+Until a profile has ``config.relevance_min_documents`` bids indexed and no
+keyword lists, there is nothing to compare against and every project
+passes. The first index of a profile is seeded from the bids in its ledger
+whose description is still stored.
+
+Documents are kept in relevance_corpus.jsonl. Once documents were added,
+the index is rebuilt in a worker thread on the next score, at most once per
+``config.relevance_rebuild_interval`` seconds; until then the previous
+index is used. Scoring walks only the postings of the project's own terms
+and takes a few milliseconds. Document counts per account are kept in
+memory, so adding a bid reads nothing back; the corpus is read only to
+trim an account past ``config.relevance_max_documents``.
+"""
+
+import asyncio
+import math
+import re
+import time
+from collections import Counter
+import config
+from project_store import ProjectStore
+
+CORPUS_FILE = "relevance_corpus.jsonl"
+
+_WORDS = re.compile(r"[^\W\d_]{2,}")
+_STOPWORDS = frozenset("""
+    a an and are as at be been but by can do for from has have i if in is it its me my
+    need needs not of on or our so that the their them then there these this to us was
+    we were will with you your looking project work would should also any all who what
+    """.split())
+
+# Share of relevance_max_documents an account is trimmed down to, so the
+# corpus is not read back on every bid once the cap is reached
+TRIM_TO = 0.9
+
+_store = None
+_counts = None
+_indexes = {}
+_built_at = {}
+_stale = set()
+_builds = {}
+
+
+class RelevanceIndex:
+    """TF-IDF vectors of one profile's documents, with an inverted index."""
+
+    def __init__(self, documents, keywords):
+        # documents: [(text, weight)]; keywords: {name: [keyword, ...]}
+        bags = [(_terms(text), weight, None) for text, weight in documents]
+        bags += [(_terms(" ".join(words)), 1.0, name) for name, words in keywords.items()]
+        bags = [bag for bag in bags if bag[0]]
+        self.bids = sum(1 for _, _, name in bags if name is None)
+        self.keyword_lists = sum(1 for _, _, name in bags if name is not None)
+        self.size = len(bags)
+        df = Counter()
+        for terms, _, _ in bags:
+            df.update(terms.keys())
+        self.idf = {term: math.log((self.size + 1) / (count + 1)) + 1 for term, count in df.items()}
+        self.default_idf = math.log(self.size + 1) + 1
+        self.weights = []
+        self.names = []
+        self.postings = {}
+        for doc, (terms, weight, name) in enumerate(bags):
+            vector = self._vector(terms)
+            self.weights.append(weight)
+            self.names.append(name)
+            for term, value in vector.items():
+                self.postings.setdefault(term, []).append((doc, value))
+
+    def _vector(self, terms):
+        vector = {term: (1 + math.log(count)) * self.idf.get(term, self.default_idf) for term, count in terms.items()}
+        norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+        return {term: value / norm for term, value in vector.items()}
+
+    @property
+    def usable(self):
+        return self.keyword_lists > 0 or self.bids >= config.relevance_min_documents
+
+    def score(self, text):
+        """Similarity of ``text`` to the index, 0 to 1, or None if the index is not usable."""
+        if not self.usable:
+            return None
+        similarities = Counter()
+        for term, value in self._vector(_terms(text)).items():
+            for doc, doc_value in self.postings.get(term, ()):
+                similarities[doc] += value * doc_value
+        keyword_best = 0.0
+        bid_scores = []
+        for doc, similarity in similarities.items():
+            if self.names[doc] is not None:
+                keyword_best = max(keyword_best, similarity)
+            else:
+                bid_scores.append(min(1.0, similarity * self.weights[doc]))
+        bid_scores.sort(reverse=True)
+        top = bid_scores[:config.relevance_top_k]
+        bid_score = sum(top) / config.relevance_top_k if self.bids >= config.relevance_min_documents else 0.0
+        return round(max(keyword_best, bid_score), 4)
+
+
+def _terms(text):
+    return Counter(word for word in _WORDS.findall((text or "").lower()) if word not in _STOPWORDS)
+
+def document_text(data):
+    """Indexed text of a ProjectRecord: its title and description."""
+    return f"{data.title or ''}\n{data.description or ''}"
+
+def get_store():
+    """Return the shared corpus store."""
+    global _store
+    if _store is None:
+        _store = ProjectStore(CORPUS_FILE)
+    return _store
+
+def _document_counts():
+    """Number of documents of each account, counted once from the store."""
+    global _counts
+    if _counts is None:
+        _counts = Counter(entry.get("account", "") for entry in get_store().values())
+    return _counts
+
+def _documents(account):
+    return [
+        (entry["text"], config.relevance_won_boost if entry.get("won") else 1.0)
+        for entry in get_store().values() if entry.get("account", "") == account
+    ]
+
+async def _seed(profile):
+    """Index the profile's past bids whose description is still stored."""
+    from database import bid_project_ids_async, PLACED, ALREADY_BID, PROPOSAL_SENT, WON
+    from utils import get_project
+
+    store = get_store()
+    entries = []
+    for project_id in await bid_project_ids_async((PLACED, ALREADY_BID, PROPOSAL_SENT, WON), profile.account):
+        project = get_project(profile.key(project_id))
+        if project is None or not project["data"].description:
+            continue
+        entries.append(_entry(profile, project["data"]))
+    if entries:
+        store.put_many((entry["id"], entry) for entry in entries)
+        _document_counts()[profile.account] += len(entries)
+        print(f"Seeded the relevance index of the {profile.name} profile with {len(entries)} past bid(s)")
+
+def _build(account, keywords):
+    return RelevanceIndex(_documents(account), keywords)
+
+async def _rebuild(profile):
+    loop = asyncio.get_running_loop()
+    try:
+        counts = await loop.run_in_executor(None, _document_counts)
+        if not counts[profile.account]:
+            await _seed(profile)
+        # Documents added while building mark the new index stale again
+        _stale.discard(profile.name)
+        index = await loop.run_in_executor(None, _build, profile.account, profile.relevance_keywords)
+        _indexes[profile.name] = index
+        _built_at[profile.name] = time.monotonic()
+        return index
+    finally:
+        _builds.pop(profile.name, None)
+
+async def get_index(profile):
+    """Return the profile's index, built off the event loop.
+
+    An index with documents added since is rebuilt once it is
+    ``config.relevance_rebuild_interval`` seconds old; concurrent callers
+    share one build.
+    """
+    index = _indexes.get(profile.name)
+    if index is not None and (
+        profile.name not in _stale
+        or time.monotonic() - _built_at[profile.name] < config.relevance_rebuild_interval
+    ):
+        return index
+    build = _builds.get(profile.name)
+    if build is None:
+        build = asyncio.ensure_future(_rebuild(profile))
+        _builds[profile.name] = build
+    return await asyncio.shield(build)
+
+async def score_projects(records, profile):
+    """Score a list of ProjectRecords for ``profile``. Returns a list of scores (None: not scored)."""
+    index = await get_index(profile)
+    if not index.usable:
+        return [None] * len(records)
+    return [index.score(document_text(data)) for data in records]
+
+def _entry(profile, data, won=False):
+    return {
+        "id": profile.key(data.id),
+        "account": profile.account,
+        "text": document_text(data),
+        "won": won,
+        "added_at": time.time(),
+    }
+
+def add_bid(profile, data):
+    """Index a project the profile just bid on."""
+    if not data.description and not data.title:
+        return
+    store = get_store()
+    key = profile.key(data.id)
+    if key in store:
+        return
+    store.put(key, _entry(profile, data))
+    _added(profile)
+
+def mark_won(profile, data):
+    """Count a won project more; indexed from ``data`` if it was not indexed yet."""
+    store = get_store()
+    key = profile.key(data.id)
+    entry = store.get(key)
+    if entry is None:
+        if not data.description and not data.title:
+            return
+        store.put(key, dict(_entry(profile, data), won=True))
+        _added(profile)
+        return
+    entry["won"] = True
+    store.put(key, entry)
+    _stale.add(profile.name)
+
+def _added(profile):
+    """Count a new document of ``profile`` and trim its account past the cap."""
+    counts = _document_counts()
+    counts[profile.account] += 1
+    if counts[profile.account] > config.relevance_max_documents:
+        _trim(profile.account)
+    _stale.add(profile.name)
+
+def _trim(account):
+    """Drop the oldest bids that were not won, down to TRIM_TO of ``config.relevance_max_documents``."""
+    store = get_store()
+    entries = [entry for entry in store.values() if entry.get("account", "") == account]
+    excess = len(entries) - int(config.relevance_max_documents * TRIM_TO)
+    lost = sorted((entry for entry in entries if not entry.get("won")), key=lambda entry: entry["added_at"])
+    dropped = lost[:max(excess, 0)]
+    for entry in dropped:
+        store.delete(entry["id"])
+    _document_counts()[account] = len(entries) - len(dropped)
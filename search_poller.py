@@ -0,0 +1,261 @@
+"""Shared project search for the auto and semi-auto pipelines.
+
+One poller fetches the union of the job filters of every running pipeline
+of every profile, with the largest of their limits as page size, and
+publishes each project once. Every pipeline receives the projects matching
+its own job filter, newest first, and keeps its own dedup and filtering
+logic, so profiles with overlapping filters share the same fetches.
+
+Polling is incremental: the highest project ID seen for each job filter is
+persisted as a watermark. Projects at or below it are cut off before they
+are published, and while a whole page is above the watermark the poller
+pages forward (up to ``config.search_max_pages``) so a burst larger than
+one page is not missed.
+
+Projects a pipeline could not finish are queued for a retry (see
+database.add_retries_async): pages dropped because a pipeline fell behind
+here, failed proposal generation, bid attempts and undelivered alerts in
+the pipelines, and the expired claims of a process that died (see
+claims.py). After each successful search, up to
+``config.retry_batch_size`` due retries are fetched by id and handed back
+to their own pipelines, since the watermark has already moved past them.
+The watermark is shared by every process polling the same job filters and
+only moves forward.
+"""
+
+import asyncio
+import time
+from freelancersdk.resources.projects.exceptions import ProjectsNotFoundException
+from freelancersdk.resources.projects.helpers import (
+    create_search_projects_filter, create_get_projects_object, create_get_projects_project_details_object
+)
+import config
+from freelancer_client import search_projects_async, get_projects_async
+from telegram_service import send_auto_telegram_message
+from database import get_watermark_async, set_watermark_async, add_retries_async, take_retries_async
+from poll_scheduler import get_bucket, search_scheduler
+from metrics import counter, histogram
+from tracing import start_trace, use_trace, current_trace, span, finish_trace
+from startup_timing import mark, elapsed
+from profiles import get_profiles
+
+_queues = {}
+_filters = {}
+_first_poll = True
+
+SEARCH_POLLS = counter("freelancer_search_polls_total", "Project search polls by result.", ("result",))
+SEARCH_POLL_SECONDS = histogram("freelancer_search_poll_seconds", "Duration of a project search poll, all pages included.")
+SEARCH_NEW_PROJECTS = counter("freelancer_search_new_projects_total", "Projects above the watermark returned by the search.")
+SEARCH_RETRIED_PROJECTS = counter("freelancer_search_retried_projects_total", "Projects fetched again for a retry, by pipeline.", ("pipeline",))
+
+def active_pipelines():
+    """Return (name, jobs, limit, account) for every pipeline that wants projects now."""
+    pipelines = []
+    for profile in get_profiles():
+        if profile.auto_jobs and not config.auto_paused:
+            pipelines.append((profile.pipeline("auto"), profile.auto_jobs, profile.project_number, profile.account))
+        if profile.semi_auto_jobs and not config.semi_auto_paused:
+            pipelines.append((profile.pipeline("semi_auto"), profile.semi_auto_jobs, profile.project_number_semi_auto, profile.account))
+    return pipelines
+
+def get_queue(name):
+    """Return the batch queue of pipeline ``name``."""
+    if name not in _queues:
+        _queues[name] = asyncio.Queue(maxsize=config.search_queue_size)
+    return _queues[name]
+
+def queue_depths():
+    """Number of search pages waiting for each pipeline."""
+    return {name: queue.qsize() for name, queue in _queues.items()}
+
+async def next_batch(name):
+    """Wait for the next list of projects published to pipeline ``name``."""
+    return await get_queue(name).get()
+
+def _search_filter(jobs):
+    """Search filter for a set of job ids, built once per distinct set."""
+    key = tuple(sorted(jobs))
+    if key not in _filters:
+        _filters[key] = create_search_projects_filter(jobs=list(key))
+    return _filters[key]
+
+def _matches(project, jobs):
+    project_jobs = project.get("jobs")
+    if not project_jobs:
+        # No job details in the response, let the pipeline decide
+        return True
+    return any(job.get("id") in jobs for job in project_jobs)
+
+async def _put(name, account, batch):
+    """Queue ``batch`` for pipeline ``name``, dropping its oldest page if the queue is full."""
+    queue = get_queue(name)
+    dropped = None
+    if queue.full():
+        # The pipeline is behind; the newest page supersedes the oldest
+        dropped = queue.get_nowait()
+    queue.put_nowait(batch)
+    if dropped:
+        print(f"⚠️ {name} pipeline is falling behind, its oldest search page will be retried")
+        await add_retries_async([p.get("id") for p in dropped], name, account)
+
+async def publish(projects, pipelines):
+    """Hand each pipeline the projects matching its job filter."""
+    for name, jobs, _, account in pipelines:
+        jobs = set(jobs)
+        await _put(name, account, [p for p in projects if _matches(p, jobs)])
+
+async def publish_retries(pipelines):
+    """Fetch the due retries of ``pipelines`` and hand each its own projects."""
+    with span("retries_read"):
+        due = await take_retries_async([name for name, _, _, _ in pipelines], config.retry_batch_size)
+    if not due:
+        return
+    project_ids = sorted({int(project_id) for project_id, _ in due})
+    get_bucket().charge()
+    q = create_get_projects_object(
+        project_ids=project_ids,
+        project_details=create_get_projects_project_details_object(
+            full_description=True,
+            jobs=True,
+        ),
+        limit=len(project_ids)
+    )
+    with span("get_projects", projects=len(project_ids)):
+        response = await get_projects_async(q)
+    # Deleted projects are not returned; their retries run out of attempts
+    by_id = {str(p.get("id")): p for p in response.get("projects", [])}
+    for name, _, _, account in pipelines:
+        batch = [by_id[project_id] for project_id, pipeline in due if pipeline == name and project_id in by_id]
+        if batch:
+            batch.sort(key=lambda p: p.get("id", 0), reverse=True)
+            SEARCH_RETRIED_PROJECTS.inc(len(batch), pipeline=name)
+            await _put(name, account, batch)
+
+def _watermark_key(jobs):
+    return "search:" + ",".join(str(job) for job in sorted(jobs))
+
+async def fetch_new_projects(jobs, limit):
+    """Fetch projects newer than the watermark for ``jobs``, newest first.
+
+    Raises the same exceptions as search_projects. The watermark is not
+    advanced here; call set_watermark once the projects are published.
+    """
+    with span("watermark_read"):
+        watermark = await get_watermark_async(_watermark_key(jobs))
+    # Without a watermark there is nothing to page back to
+    max_pages = config.search_max_pages if watermark is not None else 1
+    new_projects = []
+    seen = set()
+    for page in range(max_pages):
+        if page:
+            get_bucket().charge()
+        with span("search_projects", page=page):
+            response = await search_projects_async(
+                query=None,
+                search_filter=_search_filter(jobs),
+                project_details=config.project_detail,
+                limit=limit,
+                offset=page * limit,
+                active_only=True
+            )
+        projects = response.get("projects", [])
+        fresh = [p for p in projects if watermark is None or p.get("id", 0) > watermark]
+        for project in fresh:
+            if project.get("id") not in seen:
+                seen.add(project.get("id"))
+                new_projects.append(project)
+        if len(projects) < limit or len(fresh) < len(projects):
+            break
+    else:
+        if max_pages > 1:
+            print(f"⚠️ More than {max_pages} pages of new projects, older ones were not fetched")
+    new_projects.sort(key=lambda p: p.get("id", 0), reverse=True)
+    return new_projects, watermark
+
+async def _poll(pipelines):
+    """Run one search poll for ``pipelines`` and publish its projects."""
+    global _first_poll
+    jobs = set()
+    for _, pipeline_jobs, _, _ in pipelines:
+        jobs.update(pipeline_jobs)
+    limit = max(pipeline_limit for _, _, pipeline_limit, _ in pipelines)
+
+    scheduler = search_scheduler()
+    await scheduler.wait()
+
+    started = time.monotonic()
+    trace = use_trace(start_trace("search", jobs=sorted(jobs)))
+    try:
+        projects, watermark = await fetch_new_projects(jobs, limit)
+    except ProjectsNotFoundException as e:
+        if str(e) == "You have made too many of these requests":
+            print("You have made too many of these requests")
+            SEARCH_POLLS.inc(result="rate_limited")
+            finish_trace(trace, result="rate_limited")
+            scheduler.record_rate_limited()
+        else:
+            print('Server response: {}'.format(str(e)))
+            SEARCH_POLLS.inc(result="error")
+            finish_trace(trace, result="error")
+            await send_auto_telegram_message(str(e), "api_error", proposal="", seo_url="")
+        await asyncio.sleep(config.sleep_time)
+        return
+    except asyncio.TimeoutError:
+        print("Project search timed out, retrying...")
+        SEARCH_POLLS.inc(result="timeout")
+        finish_trace(trace, result="timeout")
+        await asyncio.sleep(config.sleep_time)
+        return
+    except Exception as e:
+        print(f"Error searching projects: {e}")
+        SEARCH_POLLS.inc(result="error")
+        finish_trace(trace, result="error")
+        await asyncio.sleep(config.sleep_time)
+        return
+
+    SEARCH_POLLS.inc(result="ok")
+    if _first_poll:
+        _first_poll = False
+        mark("first search poll")
+        print(f"First search poll finished {elapsed():.2f}s after start")
+    SEARCH_POLL_SECONDS.observe(time.monotonic() - started)
+    SEARCH_NEW_PROJECTS.inc(len(projects))
+    scheduler.record_poll(len(projects))
+    if projects:
+        with span("publish"):
+            await publish(projects, pipelines)
+        highest = projects[0].get("id", 0)
+        if watermark is None or highest > watermark:
+            with span("watermark_write"):
+                await set_watermark_async(_watermark_key(jobs), highest)
+    try:
+        await publish_retries(pipelines)
+    except Exception as e:
+        # Taken retries come due again after config.retry_delay
+        print(f"Error fetching projects to retry: {e}")
+    finish_trace(trace, result="ok", projects=len(projects))
+
+async def search_poller():
+    """Poll the project search for all pipelines and fan the results out.
+
+    Every pipeline of every profile depends on this one task, so a failed
+    poll is logged and the next one runs; only shutdown ends it.
+    """
+    try:
+        while not config.shutdown_flag:
+            pipelines = active_pipelines()
+            if not pipelines:
+                await asyncio.sleep(config.sleep_time)
+                continue
+            try:
+                await _poll(pipelines)
+            except KeyboardInterrupt:
+                break
+            except Exception as e:
+                # E.g. a database write timeout while publishing; the
+                # watermark did not move, so the next poll fetches the page again
+                print(f"⚠️ Unexpected error in search poller: {e}")
+                finish_trace(current_trace(), result="error", error=str(e))
+                await asyncio.sleep(config.sleep_time)
+    finally:
+        print("[🚨🚨🚨🚨🚨🚨🚨🚨🚨🚨]")
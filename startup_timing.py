@@ -0,0 +1,52 @@
+"""Timing of the import and init steps of a cold start.
+
+main.py wraps its imports and the start of each service in step(), and the
+services config builds on first access record their construction the same
+way. Nested steps are indented in the report, so the cost of a heavy
+dependency shows up under the import that first pulled it in:
+
+    Startup took 1.84s
+      0.000s  import config                      0.031s
+      0.031s  import freelancer_service          0.612s
+      0.052s    init config.session              0.148s
+      ...
+
+Only the standard library is imported here; config imports this module.
+"""
+
+import time
+from contextlib import contextmanager
+
+_started = time.perf_counter()
+_steps = []
+_depth = 0
+
+def elapsed():
+    """Seconds since this module was first imported."""
+    return time.perf_counter() - _started
+
+@contextmanager
+def step(name):
+    """Time a startup step."""
+    global _depth
+    entry = [name, elapsed(), None, _depth]
+    _steps.append(entry)
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        entry[2] = elapsed() - entry[1]
+
+def mark(name):
+    """Record a point in time without a duration, e.g. the first poll."""
+    _steps.append([name, elapsed(), None, _depth])
+
+def report():
+    """The recorded steps as a printable table."""
+    lines = [f"Startup took {elapsed():.2f}s"]
+    for name, offset, duration, depth in _steps:
+        label = "  " * depth + name
+        took = f"{duration:.3f}s" if duration is not None else ""
+        lines.append(f"  {offset:6.3f}s  {label:<36} {took}")
+    return "\n".join(lines)
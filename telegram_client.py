@@ -0,0 +1,66 @@
+"""Async Telegram Bot API client with a shared keep-alive connection pool."""
+
+import asyncio
+import httpx
+import config
+
+_client = None
+
+def get_client():
+    """Return the shared Bot API client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=f"{config.telegram_api_url}/bot{config.telegram_bot_token}/",
+            timeout=httpx.Timeout(config.telegram_timeout, connect=config.telegram_connect_timeout),
+            limits=httpx.Limits(
+                max_connections=config.telegram_pool_size,
+                max_keepalive_connections=config.telegram_pool_size,
+                keepalive_expiry=config.telegram_keepalive_expiry,
+            ),
+        )
+    return _client
+
+async def close_client():
+    """Close the shared client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def retry_after(response):
+    """Read the retry_after hint from a 429 response, in seconds."""
+    try:
+        return float(response.json().get("parameters", {}).get("retry_after", 1))
+    except Exception:
+        return 1.0
+
+async def call_api(method, payload, retry_429=True):
+    """Call a Bot API method, retrying network errors, 429s and 5xx responses.
+
+    With ``retry_429=False`` a 429 is returned to the caller straight away so
+    it can reschedule the message itself using ``retry_after``.
+
+    Returns the httpx response of the last attempt, or None if every attempt
+    failed before a response was received.
+    """
+    response = None
+    for attempt in range(config.telegram_max_retries + 1):
+        delay = config.telegram_retry_backoff * (2 ** attempt)
+        try:
+            response = await get_client().post(method, data=payload)
+        except httpx.TransportError as e:
+            print(f"❌ Telegram request failed ({type(e).__name__}), attempt {attempt + 1}")
+            response = None
+        else:
+            if response.status_code == 200:
+                return response
+            if response.status_code == 429:
+                if not retry_429:
+                    return response
+                delay = retry_after(response)
+            elif response.status_code < 500:
+                return response
+        if attempt < config.telegram_max_retries:
+            await asyncio.sleep(delay)
+    return response
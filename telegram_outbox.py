@@ -0,0 +1,221 @@
+"""Rate-limited outbound queue for Telegram messages.
+
+All senders in telegram_service.py go through this queue. A single worker
+paces messages to Telegram's per-chat limits, reschedules messages that get
+a 429 using ``retry_after``, and merges queued "New Project Alert" messages
+into one digest message when the backlog for a chat grows past
+``config.telegram_digest_threshold``.
+"""
+
+import asyncio
+import time
+from collections import deque
+import config
+from telegram_client import call_api, retry_after
+from metrics import counter, histogram
+
+# Telegram rejects messages longer than this
+MAX_MESSAGE_LENGTH = 4096
+
+TELEGRAM_SENDS = counter("telegram_sends_total", "sendMessage calls by result.", ("result",))
+TELEGRAM_SEND_SECONDS = histogram("telegram_send_seconds", "Duration of sendMessage calls, retries included.")
+TELEGRAM_MESSAGES = counter("telegram_messages_total", "Messages delivered, counting each alert merged into a digest.")
+
+_pending = deque()
+_wakeup = None
+_worker_task = None
+_last_sent = {}
+_sent_window = {}
+
+
+class OutboundMessage:
+    """A queued sendMessage payload and the futures waiting on it."""
+
+    __slots__ = ("payload", "digest_line", "futures")
+
+    def __init__(self, payload, digest_line=None, future=None):
+        self.payload = payload
+        self.digest_line = digest_line
+        self.futures = [future] if future is not None else []
+
+    @property
+    def chat_id(self):
+        return self.payload.get("chat_id")
+
+
+class DigestMessage(OutboundMessage):
+    """Several alerts merged into one message, kept so they can be requeued."""
+
+    __slots__ = ("merged",)
+
+    def __init__(self, payload, merged):
+        super().__init__(payload)
+        self.merged = merged
+        self.futures = [f for m in merged for f in m.futures]
+
+
+def _ensure_worker():
+    global _wakeup, _worker_task
+    if _wakeup is None:
+        _wakeup = asyncio.Event()
+    if _worker_task is None or _worker_task.done():
+        _worker_task = asyncio.get_running_loop().create_task(_worker())
+
+def pending_count():
+    """Number of messages waiting to be sent."""
+    return len(_pending)
+
+async def queue_message(payload, digest_line=None, wait=True):
+    """Queue a sendMessage payload.
+
+    Args:
+        payload (dict): The sendMessage payload.
+        digest_line (str): Short HTML summary used if this message gets merged
+            into a digest. Messages without one are always sent on their own.
+        wait (bool): Wait for delivery and return its result. With False the
+            call returns as soon as the message is queued, with a future
+            that resolves to the delivery result.
+    """
+    _ensure_worker()
+    future = asyncio.get_running_loop().create_future()
+    _pending.append(OutboundMessage(payload, digest_line, future))
+    _wakeup.set()
+    if not wait:
+        return future
+    return await future
+
+def _ready_at(chat_id, now):
+    """Earliest time a message can go to ``chat_id`` without breaking its limits."""
+    ready = _last_sent.get(chat_id, 0) + config.telegram_chat_interval
+    window = _sent_window.get(chat_id)
+    if window:
+        while window and now - window[0] >= 60:
+            window.popleft()
+        if len(window) >= config.telegram_chat_per_minute:
+            ready = max(ready, window[0] + 60)
+    return ready
+
+def _mark_sent(chat_id, now):
+    _last_sent[chat_id] = now
+    _sent_window.setdefault(chat_id, deque()).append(now)
+
+def _next_message(now):
+    """Pop the next message whose chat is ready, or return the wait time."""
+    earliest = None
+    for message in _pending:
+        ready = _ready_at(message.chat_id, now)
+        if ready <= now:
+            break
+        earliest = ready if earliest is None else min(earliest, ready)
+    else:
+        return None, (earliest - now if earliest is not None else None)
+
+    _pending.remove(message)
+    if message.digest_line is None:
+        return message, 0
+
+    backlog = [m for m in _pending if m.chat_id == message.chat_id and m.digest_line is not None]
+    if len(backlog) + 1 <= config.telegram_digest_threshold:
+        return message, 0
+    return _build_digest(message, backlog), 0
+
+def _build_digest(first, backlog):
+    """Merge ``first`` and as many queued alerts for its chat as fit in one message."""
+    header = "🚨 <b>New Project Alerts ({count})</b>\n\n"
+    merged = [first]
+    body = first.digest_line
+    for message in backlog[:config.telegram_digest_max - 1]:
+        candidate = body + "\n\n" + message.digest_line
+        if len(header) + len(candidate) + 8 > MAX_MESSAGE_LENGTH:
+            break
+        body = candidate
+        merged.append(message)
+        _pending.remove(message)
+
+    if len(merged) == 1:
+        return first
+    payload = dict(first.payload)
+    payload["text"] = header.format(count=len(merged)) + body
+    return DigestMessage(payload, merged)
+
+def _resolve(message, result):
+    for future in message.futures:
+        if not future.done():
+            future.set_result(result)
+
+async def _deliver(message):
+    """Send one message. Returns the number of seconds to back off, or 0."""
+    started = time.monotonic()
+    response = await call_api("sendMessage", message.payload, retry_429=False)
+    TELEGRAM_SEND_SECONDS.observe(time.monotonic() - started)
+    if response is not None and response.status_code == 429:
+        TELEGRAM_SENDS.inc(result="rate_limited")
+        delay = retry_after(response)
+        print(f"⏳ Telegram rate limit hit, retrying in {delay}s ({len(_pending) + 1} queued)")
+        # Put the original messages back so a later pass can re-coalesce them
+        originals = message.merged if isinstance(message, DigestMessage) else [message]
+        for original in reversed(originals):
+            _pending.appendleft(original)
+        return delay
+
+    if response is None:
+        print("❌ Failed to send message. No response from Telegram")
+        TELEGRAM_SENDS.inc(result="error")
+        _resolve(message, False)
+    elif response.status_code != 200:
+        print(f"❌ Failed to send message. Status: {response.status_code}, Error: {response.text}")
+        TELEGRAM_SENDS.inc(result="error")
+        _resolve(message, False)
+    else:
+        TELEGRAM_SENDS.inc(result="ok")
+        TELEGRAM_MESSAGES.inc(len(message.merged) if isinstance(message, DigestMessage) else 1)
+        _resolve(message, True)
+    return 0
+
+async def _worker():
+    """Drain the queue, pacing sends per chat."""
+    while True:
+        if not _pending:
+            _wakeup.clear()
+            await _wakeup.wait()
+            continue
+
+        now = time.monotonic()
+        message, wait = _next_message(now)
+        if message is None:
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        _mark_sent(message.chat_id, now)
+        try:
+            backoff = await _deliver(message)
+        except Exception as e:
+            print(f"❌ Failed to send message: {e}")
+            _resolve(message, False)
+            backoff = 0
+        if backoff:
+            _last_sent[message.chat_id] = time.monotonic() + backoff - config.telegram_chat_interval
+
+async def flush_outbox(timeout):
+    """Give queued messages up to ``timeout`` seconds to go out, then stop the worker."""
+    global _worker_task
+    deadline = time.monotonic() + timeout
+    while _pending and _worker_task is not None and not _worker_task.done():
+        if time.monotonic() >= deadline:
+            print(f"⚠️ Dropping {len(_pending)} unsent Telegram message(s) on shutdown")
+            for message in _pending:
+                _resolve(message, False)
+            _pending.clear()
+            break
+        await asyncio.sleep(0.1)
+    if _worker_task is not None:
+        _worker_task.cancel()
+        try:
+            await _worker_task
+        except asyncio.CancelledError:
+            pass
+        _worker_task = None
@@ -1,13 +1,12 @@
-import requests
 import urllib.parse
 import html
 import config
+from telegram_outbox import queue_message
+from profiles import default_profile
 
-# Telegram POST url
-url = f"https://api.telegram.org/bot{config.telegram_bot_token}/sendMessage"
-
-async def send_auto_telegram_message(project_title, msg_type, proposal, seo_url):
-    """Send telegram message based on message type."""
+async def send_auto_telegram_message(project_title, msg_type, proposal, seo_url, profile=None):
+    """Send telegram message based on message type to the profile's chat."""
+    profile = profile or default_profile()
 
     # Escape user-generated text
     safe_proposal = html.escape(str(proposal))
@@ -40,21 +39,21 @@ async def send_auto_telegram_message(project_title, msg_type, proposal, seo_url)
             f"Proposal: {safe_proposal}"
         )
     elif msg_type == "gen_proposal":
-        place_bid_url = f"{config.host_url}/place_bid?project_id={urllib.parse.quote(str(proposal))}"
+        place_bid_url = f"{config.host_url}/place_bid?project_id={urllib.parse.quote(str(proposal))}{profile.query()}"
         message = (
             f"🚨 <b>Proposal generation Failed</b>\n\n"
             f"Action taken: <b> sleeping for {config.sleep_time}</b>\n"
             f"<a href='{place_bid_url}'>✅ Place bid</a>"
         )
     elif msg_type == "error":
-        place_bid_url = f"{config.host_url}/place_bid?project_id={urllib.parse.quote(str(project_title.get('id') if isinstance(project_title, dict) else project_title))}"
+        place_bid_url = f"{config.host_url}/place_bid?project_id={urllib.parse.quote(str(project_title.get('id') if isinstance(project_title, dict) else project_title))}{profile.query()}"
         msg_seo_url = f"https://www.freelancer.com/projects/{safe_seo_url}/details" if seo_url else "https://www.freelancer.com"
-        exch_rate = str(project_title.get('currency_exchange_rate', 1))
 
         error_message_title = "An error occurred" if seo_url == "" else f"Failed to send proposal: <b>{safe_error_message}</b>"
         error_message = "Error message" if seo_url == "" else "Proposal"
 
         if isinstance(project_title, dict):
+            exch_rate = str(project_title.get('currency_exchange_rate', 1))
             title_line = f"{error_message}: <b>{safe_title} ${float(exch_rate) * float(safe_amount)}</b>\n"
         else:
             title_line = f"{error_message}: <b>{safe_title}</b>\n"
@@ -66,51 +65,66 @@ async def send_auto_telegram_message(project_title, msg_type, proposal, seo_url)
             f"Proposal: {safe_proposal}\n"
             f"<a href='{place_bid_url}'>✅ Place bid</a>"
         )
+    elif msg_type == "api_error":
+        # Not about a project: ``project_title`` is the error message
+        message = (
+            f"🚨 <b>Freelancer API error</b>\n\n"
+            f"Error message: <b>{safe_title}</b>"
+        )
     else:
         message = f"⚠️ <b>Unknown message type</b>\n\n"
 
     payload = {
-        "chat_id": config.telegram_chatid,
+        "chat_id": profile.chat_id,
         "text": message,
         "parse_mode": "HTML",
         "disable_web_page_preview": True
     }
 
-    response = requests.post(url, data=payload)
+    await queue_message(payload)
 
-    if response.status_code != 200:
-        print(f"❌ Failed to send message. Status: {response.status_code}, Error: {response.text}")
 
+async def send_semi_auto_telegram_message(project, amount, profile=None):
+    """Queue a semi-auto alert about a ProjectRecord.
 
-async def send_semi_auto_telegram_message(project, amount):
-    """Send telegram message for semi-auto bidding."""
-    project_seo_url = f"https://www.freelancer.com/projects/{html.escape(project['seo_url'])}/details"
+    Returns a future that resolves to True once the alert is delivered, or
+    False if it could not be sent.
+    """
+    profile = profile or default_profile()
+    project_seo_url = f"https://www.freelancer.com/projects/{html.escape(project.seo_url)}/details"
 
     # Escape all dynamic text
-    safe_title = html.escape(str(project['title']))
-    safe_description = project['description']
+    safe_title = html.escape(str(project.title))
+    safe_description = project.description or ""
     if len(safe_description) > 3500:
         safe_description = "[Description removed due to length]"
     else:
         safe_description = html.escape(safe_description)
 
     safe_amount = html.escape(str(amount))
-    safe_submit_date = html.escape(str(project['submit_date']))
-    safe_budget_min = html.escape(str(project['budget_min']))
-    safe_budget_max = html.escape(str(project['budget_max']))
-    safe_exchange_rate = html.escape(str(project['currency_exchange_rate']))
-    safe_bid_avg = html.escape(str(project['bid_avg']))
-    safe_bid_count = html.escape(str(project['bid_count']))
-    type = html.escape(str(project['type']))
-
-    place_bid_url = f"{config.host_url}/place_bid?project_id={urllib.parse.quote(str(project['id']))}"
-    gen_bid_url = f"{config.host_url}/gen_proposal?project_id={urllib.parse.quote(str(project['id']))}"
+    safe_submit_date = html.escape(str(project.submit_date))
+    safe_budget_min = html.escape(str(project.budget_min))
+    safe_budget_max = html.escape(str(project.budget_max))
+    safe_exchange_rate = html.escape(str(project.currency_exchange_rate))
+    safe_bid_avg = html.escape(str(project.bid_avg))
+    safe_bid_count = html.escape(str(project.bid_count))
+    type = html.escape(str(project.type))
+
+    place_bid_url = f"{config.host_url}/place_bid?project_id={urllib.parse.quote(str(project.id))}{profile.query()}"
+    gen_bid_url = f"{config.host_url}/gen_proposal?project_id={urllib.parse.quote(str(project.id))}{profile.query()}"
     try:
         budget_min = float(safe_exchange_rate) * float(safe_budget_min)
         budget_max = float(safe_exchange_rate) * float(safe_budget_max)
         amount     = float(safe_exchange_rate) * float(safe_amount)
         bid_avg    = float(safe_exchange_rate) * float(safe_bid_avg)
 
+        digest_line = (
+            f"<b>{safe_title}</b>\n"
+            f"${amount} {type} (budget ${budget_min} - ${budget_max}, {safe_bid_count} bids)\n"
+            f"<a href='{project_seo_url}'>View</a> | "
+            f"<a href='{place_bid_url}'>✅ Place bid</a> | "
+            f"<a href='{gen_bid_url}'>✅ Generate Proposal</a>"
+        )
         message = (
             f"🚨 <b>New Project Alert [CONVERTED]</b>\n\n"
             f"Project: <b>{safe_title}</b>\n"
@@ -126,6 +140,12 @@ async def send_semi_auto_telegram_message(project, amount):
             f"<a href='{gen_bid_url}'>✅ Generate Proposal</a>"
         )
     except Exception:
+        digest_line = (
+            f"<b>{safe_title}</b>\n"
+            f"{safe_amount} {type} (budget {safe_budget_min} - {safe_budget_max}, {safe_bid_count} bids)\n"
+            f"<a href='{project_seo_url}'>View</a> | "
+            f"<a href='{gen_bid_url}'>✅ Generate Proposal</a>"
+        )
         message = (
             f"🚨 <b>New Project Alert [RAW]</b>\n\n"
             f"Project: <b>{safe_title}</b>\n"
@@ -141,44 +161,38 @@ async def send_semi_auto_telegram_message(project, amount):
         )
 
     payload = {
-        "chat_id": config.telegram_chatid,
+        "chat_id": profile.chat_id,
         "text": message,
         "parse_mode": "HTML",
         "disable_web_page_preview": True
     }
 
-    response = requests.post(url, data=payload)
-
-    if response.status_code != 200:
-        print(f"❌ Failed to send message. Status: {response.status_code}, Error: {response.text}")
-        return False
-    return True
+    # Alerts are queued without waiting so a burst can be merged into a digest;
+    # callers await the future before recording the project as alerted
+    return await queue_message(payload, digest_line=digest_line, wait=False)
 
-async def send_project_followup_alert(data):
-    project_seo_url = f"https://www.freelancer.com/projects/{html.escape(data['seo_url'])}/details"
-    safe_title = html.escape(str(data['title']))
+async def send_project_followup_alert(data, profile=None):
+    profile = profile or default_profile()
+    project_seo_url = f"https://www.freelancer.com/projects/{html.escape(data.seo_url)}/details"
+    safe_title = html.escape(str(data.title))
     message = (
         f"🚨 <b>Project Follow Up Alert</b>\n\n"
         f"Project <b>{safe_title}</b> has been awarded to a freelancer\n"
-        f"Status: <b>{data["status"]}</b>\n\n"
+        f"Status: <b>{data.status}</b>\n\n"
         f"<a href='{project_seo_url}'>View Project on Freelancer</a>\n"
     )
     payload = {
-        "chat_id": config.telegram_chatid,
+        "chat_id": profile.chat_id,
         "text": message,
         "parse_mode": "HTML",
         "disable_web_page_preview": True
     }
 
-    response = requests.post(url, data=payload)
-
-    if response.status_code != 200:
-        print(f"❌ Failed to send message. Status: {response.status_code}, Error: {response.text}")
-        return False
-    return True
+    return await queue_message(payload)
     
-async def send_generated_proposal_message(proposal):
+async def send_generated_proposal_message(proposal, profile=None):
     """Send telegram message for semi-auto bidding."""
+    profile = profile or default_profile()
 
     message = (
         f"✅ <b>Proposal Generated</b>\n\n"
@@ -186,15 +200,10 @@ async def send_generated_proposal_message(proposal):
     )
     
     payload = {
-        "chat_id": config.telegram_chatid,
+        "chat_id": profile.chat_id,
         "text": message,
         "parse_mode": "HTML",
         "disable_web_page_preview": True
     }
 
-    response = requests.post(url, data=payload)
-
-    if response.status_code != 200:
-        print(f"❌ Failed to send message. Status: {response.status_code}, Error: {response.text}")
-        return False
-    return True
+    return await queue_message(payload)
@@ -0,0 +1,67 @@
+import pytest
+import config
+from lang_detect import detect_language
+
+# Short English project titles, some of which used to rank closer to other
+# Latin-script languages
+ENGLISH_TITLES = [
+    "Convert PSD to HTML responsive template",
+    "Scrape data from amazon.com into excel csv",
+    "Build a WordPress website for my small business",
+    "Logo design for a coffee shop brand",
+    "Need a Python developer to fix Django bugs",
+    "Mobile app UI design in Figma",
+    "Data entry from PDF files to Google Sheets",
+    "Shopify store setup and product upload",
+    "React Native developer for food delivery app",
+    "SEO optimization for ecommerce site",
+]
+
+
+def _accepted(text):
+    """The language the offline detector answers with, or None if the LLM is asked."""
+    language, confidence = detect_language(text)
+    if language and confidence >= config.lang_detect_min_confidence:
+        return language
+    return None
+
+
+@pytest.mark.parametrize("title", ENGLISH_TITLES)
+def test_short_english_title_is_english_or_left_to_llm(title):
+    assert _accepted(title) in ("english", None)
+
+
+@pytest.mark.parametrize("text, language", [
+    (
+        "I have a PSD design of a landing page and need it converted to clean, responsive "
+        "HTML and CSS. It must work on mobile and tablets.",
+        "english",
+    ),
+    (
+        "I need a script that collects product names, prices and ratings from a list of Amazon "
+        "search pages and saves them to a CSV file I can open in Excel.",
+        "english",
+    ),
+    (
+        "Necesito un logotipo moderno para mi panadería. Colores cálidos y un estilo sencillo, "
+        "entregar en formato vectorial.",
+        "spanish",
+    ),
+    (
+        "Nous avons besoin d'un traducteur pour traduire des documents techniques de l'anglais "
+        "vers le français.",
+        "french",
+    ),
+])
+def test_description_is_detected(text, language):
+    assert _accepted(text) == language
+
+
+def test_too_few_ngrams_is_not_judged():
+    assert detect_language("Scrape data from amazon.com into excel csv") == (None, 0.0)
+
+
+def test_non_latin_script():
+    language, confidence = detect_language("Нужен сайт для интернет-магазина одежды")
+    assert language == "russian"
+    assert confidence >= config.lang_detect_min_confidence
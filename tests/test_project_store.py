@@ -0,0 +1,33 @@
+import pytest
+from project_store import ProjectStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "store.jsonl")
+
+
+def test_records_survive_compaction_and_reload(path):
+    store = ProjectStore(path)
+    store.put("k:1", {"id": "k:1", "value": 1})
+    store.put_many([("2", {"id": "2", "value": 2}), ("k:1", {"id": "k:1", "value": 3})])
+    store.delete("2")
+    store.compact()
+    assert store.get("k:1") == {"id": "k:1", "value": 3}
+    store.close()
+
+    store = ProjectStore(path)
+    assert store.get("k:1") == {"id": "k:1", "value": 3}
+    assert "2" not in store
+    store.close()
+
+
+def test_key_must_match_record_id(path):
+    store = ProjectStore(path)
+    with pytest.raises(ValueError):
+        store.put("k:1", {"id": "1"})
+    with pytest.raises(ValueError):
+        store.put_many([("1", {"id": "1"}), ("k:1", {"id": "1"})])
+    # Nothing of the rejected batch was written
+    assert len(store) == 0
+    store.close()
@@ -0,0 +1,149 @@
+"""Lightweight tracing of where the time to bid goes.
+
+A trace covers one unit of work (a project through the auto pipeline, a
+semi-auto batch, a /place_bid request) and holds timed spans for its stages.
+Finished traces are kept in a ring buffer of ``config.trace_buffer_size``
+for the /debug/traces endpoint and, if ``config.trace_export_file`` is set,
+appended to that file as JSON lines.
+
+The trace of the running task is kept in a context variable, so code deep in
+the call stack (e.g. proposal generation) adds spans with span() without the
+trace being passed down. Work handed between tasks through a queue carries
+its Trace object along and re-activates it with use_trace(). With tracing
+disabled start_trace() returns None and every span is a no-op.
+"""
+
+import contextvars
+import itertools
+import json
+import time
+from collections import deque
+import config
+
+_current = contextvars.ContextVar("trace", default=None)
+_buffer = None
+_ids = itertools.count(1)
+
+
+class Span:
+    """One timed stage of a trace. Offsets are seconds from the trace start."""
+
+    __slots__ = ("name", "start", "duration", "attrs")
+
+    def __init__(self, name, start, duration, attrs):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.attrs = attrs
+
+    def to_dict(self):
+        span = {"name": self.name, "start": round(self.start, 4), "duration": round(self.duration, 4)}
+        if self.attrs:
+            span["attrs"] = self.attrs
+        return span
+
+
+class _SpanTimer:
+    __slots__ = ("trace", "name", "attrs", "started")
+
+    def __init__(self, trace, name, attrs):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.trace is not None:
+            if exc_type is not None:
+                self.attrs["error"] = exc_type.__name__
+            self.trace.add_span(self.name, self.started, time.monotonic(), **self.attrs)
+        return False
+
+
+class Trace:
+    """Spans recorded for one unit of work."""
+
+    __slots__ = ("id", "name", "attrs", "started", "wall_started", "spans", "duration")
+
+    def __init__(self, name, attrs, started=None):
+        now = time.monotonic()
+        self.id = next(_ids)
+        self.name = name
+        self.attrs = attrs
+        self.started = now if started is None else started
+        self.wall_started = time.time() - (now - self.started)
+        self.spans = []
+        self.duration = None
+
+    def span(self, name, **attrs):
+        """Context manager timing a stage of this trace."""
+        return _SpanTimer(self, name, attrs)
+
+    def add_span(self, name, started, ended, **attrs):
+        """Record a stage timed elsewhere, from two time.monotonic() readings."""
+        self.spans.append(Span(name, started - self.started, ended - started, attrs))
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started": self.wall_started,
+            "duration": round(self.duration, 4) if self.duration is not None else None,
+            "attrs": self.attrs,
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+
+def _get_buffer():
+    global _buffer
+    if _buffer is None:
+        _buffer = deque(maxlen=config.trace_buffer_size)
+    return _buffer
+
+def start_trace(name, started=None, **attrs):
+    """Start a trace, or return None when tracing is disabled.
+
+    ``started`` backdates the trace to an earlier time.monotonic() reading.
+    """
+    if not config.trace_enabled:
+        return None
+    return Trace(name, attrs, started)
+
+def use_trace(trace):
+    """Make ``trace`` (which may be None) the current trace of this task and return it."""
+    _current.set(trace)
+    return trace
+
+def current_trace():
+    return _current.get()
+
+def span(name, **attrs):
+    """Time a stage of the current trace; does nothing without one."""
+    return _SpanTimer(_current.get(), name, attrs)
+
+def finish_trace(trace, **attrs):
+    """Close ``trace`` and store it. Safe to call with None."""
+    if trace is None or trace.duration is not None:
+        return
+    trace.attrs.update(attrs)
+    trace.duration = time.monotonic() - trace.started
+    if _current.get() is trace:
+        _current.set(None)
+    _get_buffer().append(trace)
+    if config.trace_export_file:
+        try:
+            with open(config.trace_export_file, "a") as f:
+                f.write(json.dumps(trace.to_dict(), default=str) + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not export trace: {e}")
+
+def recent_traces(limit=50, name=None):
+    """Finished traces, newest first, optionally only those called ``name``."""
+    traces = [trace for trace in reversed(_get_buffer()) if name is None or trace.name == name]
+    return [trace.to_dict() for trace in traces[:limit]]
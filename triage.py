@@ -0,0 +1,157 @@
+"""Batch triage of a search page before any slow I/O.
+
+triage_projects() takes a whole list of projects from the search API and,
+in one pass, builds each project's record, decides why it would be skipped
+(if at all), converts its budget to USD and computes the bid amount. The
+projects left are scored for relevance (see relevance.py), so biddable ones
+unlike anything the profile wants are dropped as LOW_RELEVANCE. The
+pipelines then write the store once per batch and only send the biddable
+projects down the slow AI and bid path. Pricing, the look-back window, the
+relevance threshold and the ledger account come from the profile the page
+is triaged for.
+"""
+
+import time
+from project_record import ProjectRecord
+from database import existing_project_ids_async
+from claims import claim
+from profiles import default_profile
+from relevance import score_projects
+from utils import get_store
+from metrics import counter
+from tracing import span
+
+# Triage reasons, in the order they are checked
+SEEN = "seen"
+CLAIMED = "claimed"
+STALE = "stale"
+INACTIVE = "inactive"
+NO_BUDGET = "no_budget"
+# Budget fields that could not be read or priced, e.g. an exchange rate of 0
+INVALID = "invalid"
+BELOW_MIN_BUDGET = "below_min_budget"
+HOURLY = "hourly"
+LOW_RELEVANCE = "low_relevance"
+BIDDABLE = "biddable"
+
+# Reasons of the projects that may get a proposal, and so are scored
+SCORED = (BELOW_MIN_BUDGET, HOURLY, BIDDABLE)
+
+PROJECTS_TRIAGED = counter("freelancer_projects_triaged_total", "Projects triaged per pipeline, by skip reason.", ("pipeline", "reason"))
+
+
+class TriageResult:
+    """Outcome of triaging one project."""
+
+    __slots__ = ("data", "reason", "budget_usd", "amount", "relevance")
+
+    def __init__(self, data, reason, budget_usd=None, amount=0):
+        self.data = data
+        self.reason = reason
+        self.budget_usd = budget_usd
+        self.amount = amount
+        # Relevance score, None when not scored
+        self.relevance = None
+
+    @property
+    def id(self):
+        return str(self.data.id)
+
+
+def is_relevant(result, profile=None):
+    """False if the project scored below the profile's relevance threshold."""
+    profile = profile or default_profile()
+    return result.relevance is None or result.relevance >= profile.relevance_threshold
+
+def project_data(project):
+    """Build the project record from a search API project."""
+    return ProjectRecord.from_api(project)
+
+def bid_amount(data, profile=None):
+    """Bid amount in the project's currency for a ProjectRecord."""
+    profile = profile or default_profile()
+    budget_min = data.budget_min
+    budget_max = data.budget_max
+    currency_exchange_rate = data.currency_exchange_rate
+    amount = round(float(budget_max) * float(profile.bid_avg_percent))
+    if str(data.type) == "fixed":
+        if amount < (float(profile.min_budget) / float(currency_exchange_rate)):
+            amount = (float(profile.min_budget) / float(currency_exchange_rate))
+    if amount < float(budget_min):
+        amount = max(round(float(budget_max) * (float(profile.bid_avg_percent) / 2)), budget_min)
+    return amount
+
+def triage_project(data, now, seen, profile=None):
+    """Triage one project. ``seen`` is the set of already processed IDs."""
+    profile = profile or default_profile()
+    if str(data.id) in seen:
+        return TriageResult(data, SEEN)
+
+    # Age from the raw epoch, no ISO round trip
+    if now - (data.time_submitted or 0) >= profile.look_back_hours * 3600:
+        return TriageResult(data, STALE)
+
+    if data.status != "active":
+        return TriageResult(data, INACTIVE)
+
+    budget_min = data.budget_min
+    budget_max = data.budget_max
+    if budget_max is None or budget_min is None:
+        return TriageResult(data, NO_BUDGET)
+
+    budget_usd = float(budget_max) * float(data.currency_exchange_rate)
+    amount = bid_amount(data, profile)
+    if str(data.type) == "fixed":
+        if budget_usd < profile.min_budget:
+            return TriageResult(data, BELOW_MIN_BUDGET, budget_usd, amount)
+    elif profile.only_fixed:
+        return TriageResult(data, HOURLY, budget_usd, amount)
+
+    return TriageResult(data, BIDDABLE, budget_usd, amount)
+
+async def triage_projects(projects, pipeline, now=None, profile=None):
+    """Triage a search page for ``pipeline`` of ``profile``, oldest project first.
+
+    Projects the profile already processed (in the database or the project
+    store) are looked up with one query for the whole page. The remaining
+    projects are claimed for ``pipeline`` in one transaction; those claimed
+    by another process or pipeline come back as CLAIMED. The caller releases
+    the claims (claims.release) once each project is recorded or dropped.
+    Claimed projects that may get a proposal are scored for relevance, and
+    biddable ones below the threshold come back as LOW_RELEVANCE.
+    """
+    profile = profile or default_profile()
+    now = time.time() if now is None else now
+    records = [project_data(project) for project in reversed(projects)]
+    ids = [str(data.id) for data in records]
+    store = get_store()
+    with span("store_lookup", projects=len(ids)):
+        seen = await existing_project_ids_async(ids, profile.account)
+        seen |= {project_id for project_id in ids if profile.key(project_id) in store}
+
+    results = []
+    for data in records:
+        try:
+            results.append(triage_project(data, now, seen, profile))
+        except (TypeError, ValueError, ArithmeticError) as e:
+            print(f"⚠️ Project {data.id} could not be triaged: {e}")
+            results.append(TriageResult(data, INVALID))
+
+    unseen = [result.id for result in results if result.reason != SEEN]
+    if unseen:
+        with span("claim", projects=len(unseen)):
+            claimed = await claim(unseen, pipeline, profile.account)
+        for result in results:
+            if result.reason != SEEN and result.id not in claimed:
+                result.reason = CLAIMED
+    scored = [result for result in results if result.reason in SCORED]
+    if scored and profile.relevance_threshold > 0:
+        with span("relevance", projects=len(scored)):
+            scores = await score_projects([result.data for result in scored], profile)
+        for result, score in zip(scored, scores):
+            result.relevance = score
+            if result.reason == BIDDABLE and not is_relevant(result, profile):
+                result.reason = LOW_RELEVANCE
+    for result in results:
+        PROJECTS_TRIAGED.inc(pipeline=pipeline, reason=result.reason)
+    return results
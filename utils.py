@@ -2,46 +2,101 @@
 
 import asyncio
 import config
-import json
-import os
+from project_store import ProjectStore
+from project_record import ProjectRecord
 
 PROJECTS_FILE = "projects.json"
+PROJECTS_LOG = "projects.jsonl"
+DESCRIPTIONS_LOG = "project_descriptions.jsonl"
+
+_store = None
+_descriptions = None
+
+def get_store():
+    """Return the shared project store, migrating projects.json on first use."""
+    global _store
+    if _store is None:
+        _store = ProjectStore(PROJECTS_LOG, legacy_path=PROJECTS_FILE)
+    return _store
+
+def get_description_store():
+    """Return the store of project descriptions, kept apart from the records."""
+    global _descriptions
+    if _descriptions is None:
+        _descriptions = ProjectStore(DESCRIPTIONS_LOG)
+    return _descriptions
+
+def get_description(project_id):
+    """Return the stored description of a project, or None."""
+    entry = get_description_store().get(project_id)
+    return entry["text"] if entry else None
+
+def _encode(project_id, data, amount):
+    return {"id": project_id, "amount": amount, "row": data.to_row()}
+
+def _decode(stored):
+    """Stored entry -> {"id", "data": ProjectRecord, "amount"}."""
+    if "row" in stored:
+        data = ProjectRecord.from_row(stored["row"])
+    else:
+        data = ProjectRecord.from_legacy(stored["data"])
+    return {"id": stored["id"], "data": data, "amount": stored.get("amount")}
+
+def _put_descriptions(projects):
+    # Keyed by the project id, not the store key: profiles share descriptions
+    get_description_store().put_many(
+        (str(data.id), {"id": str(data.id), "text": data.description}) for _, data, _ in projects
+    )
 
 def load_projects():
-    """Load projects from JSON file."""
-    if not os.path.exists(PROJECTS_FILE):
-        return []
-    with open(PROJECTS_FILE, "r") as f:
-        return json.load(f)
+    """Load all stored projects as {"id", "data", "amount"} dicts."""
+    return [_decode(stored) for stored in get_store().values()]
 
 def save_projects(projects):
-    """Save projects list back to JSON file."""
-    with open(PROJECTS_FILE, "w") as f:
-        json.dump(projects, f, indent=4)
+    """Replace the stored projects with the given list of {"id", "data", "amount"} dicts."""
+    projects = [(project["id"], project["data"], project["amount"]) for project in projects]
+    _put_descriptions(projects)
+    get_store().replace_all([_encode(*project) for project in projects])
 
 def add_project(project_id, data, amount):
-    """Add a project to JSON store."""
-    projects = load_projects()
-    # Avoid duplicates
-    if any(p["id"] == project_id for p in projects):
-        return False
-    projects.append({"id": project_id, "data": data, "amount": amount})
-    save_projects(projects)
-    return True
+    """Add a project (a ProjectRecord) to the store under ``project_id``.
+
+    The key is the bare project id for the default profile and
+    profiles.Profile.key() for the others.
+    """
+    return add_projects([(project_id, data, amount)]) == 1
+
+def add_projects(projects):
+    """Add several (project_id, ProjectRecord, amount) tuples to the store in one write.
+
+    Projects already in the store are left untouched.
+    """
+    store = get_store()
+    records = {}
+    for project_id, data, amount in projects:
+        if project_id not in store:
+            records[project_id] = (project_id, data, amount)
+    if records:
+        # Descriptions first, so a stored record always finds its description
+        _put_descriptions(records.values())
+        store.put_many((project_id, _encode(*project)) for project_id, project in records.items())
+    return len(records)
 
 def delete_project(project_id):
-    """Delete a project by ID."""
-    projects = load_projects()
-    projects = [p for p in projects if p["id"] != project_id]
-    save_projects(projects)
+    """Delete a project by its store key, and its description once no profile stores it."""
+    store = get_store()
+    stored = store.get(project_id)
+    store.delete(project_id)
+    if stored is None:
+        return
+    data_id = str(_decode(stored)["data"].id)
+    if not any(str(_decode(other)["data"].id) == data_id for other in store.values()):
+        get_description_store().delete(data_id)
 
 def get_project(project_id):
-    """Retrieve a project by ID."""
-    projects = load_projects()
-    for p in projects:
-        if p["id"] == project_id:
-            return p
-    return None
+    """Retrieve a project by its store key as {"id", "data": ProjectRecord, "amount"}, or None."""
+    stored = get_store().get(project_id)
+    return _decode(stored) if stored is not None else None
 
 async def interruptible_sleep(hours, check_interval=60, shut_down_flag=lambda: False):
     """